@@ -0,0 +1,76 @@
+"""
+Benchmark auto levels: the histogram added to each decode and the LUT pass per frame.
+
+Times levels_lut on decoded images of a few sizes (work the decode pool
+adds to each prefetch), then apply_levels on canvas frames against a plain
+byte-wise table lookup. Both run off the GUI thread in the tool.
+
+:to use:
+    python benchmarks/bench_auto_levels.py [--repeats 20]
+"""
+
+from __future__ import annotations
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+SOURCE_SIZES = [(1920, 1080), (3840, 2160), (6000, 4000)]
+FRAME_SIZES = [(1600, 1000), (1920, 1080), (3840, 2160)]
+
+
+def _median_ms(fn, repeats: int) -> float:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    import numpy as np
+    from PySide6.QtGui import QGuiApplication, QImage
+    app = QGuiApplication(sys.argv[:1])
+
+    from auto_levels import apply_levels, levels_lut
+
+    rng = np.random.default_rng(0)
+
+    def washed_out(width: int, height: int, fmt: QImage.Format = QImage.Format.Format_RGB32) -> QImage:
+        image = QImage(width, height, fmt)
+        bits = np.frombuffer(image.bits(), dtype=np.uint8, count=image.sizeInBytes())
+        bits[:] = rng.integers(90, 190, bits.size, dtype=np.uint8)
+        if fmt == QImage.Format.Format_RGB32:
+            bits[3::4] = 255
+        return image
+
+    for width, height in SOURCE_SIZES:
+        image = washed_out(width, height)
+        print(f"levels_lut  {width}x{height} source   {_median_ms(lambda: levels_lut(image), args.repeats):7.2f} ms")
+
+    for width, height in FRAME_SIZES:
+        for fmt, label in [(QImage.Format.Format_RGB32, "RGB32"), (QImage.Format.Format_Grayscale8, "gray ")]:
+            frame = washed_out(width, height, fmt)
+            lut = levels_lut(frame)
+            bits = np.frombuffer(frame.bits(), dtype=np.uint8, count=frame.sizeInBytes())
+
+            def bytewise() -> None:
+                bits[:] = lut[bits]
+
+            pairs = _median_ms(lambda: apply_levels(frame, lut), args.repeats)
+            single = _median_ms(bytewise, args.repeats)
+            print(f"apply       {width}x{height} {label}   {pairs:7.2f} ms   byte-wise lookup {single:7.2f} ms")
+    del app
+
+
+if __name__ == "__main__":
+    main()
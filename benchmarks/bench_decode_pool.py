@@ -0,0 +1,96 @@
+"""
+Compare thread-pool and process-pool background decoding.
+
+Decodes a folder of images with each DecodePool mode and reports throughput
+plus how responsive the calling (GUI) thread stays meanwhile, measured as the
+lateness of a 1 ms tick loop running while the decodes are in flight.
+
+:to use:
+    python benchmarks/bench_decode_pool.py /path/to/images [--target 1920x1080] [--rounds 3]
+"""
+
+from __future__ import annotations
+import argparse
+import gc
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtCore import QSize
+from PySide6.QtGui import QGuiApplication
+
+from decode_pool import MODES, DecodePool, live_shared_buffers
+from decoders import DecoderRegistry, parse_size
+
+
+def _run(registry: DecoderRegistry, mode: str, paths: list[str], target: QSize, workers: int) -> dict[str, float]:
+    pool = DecodePool(registry, mode, workers=workers)
+
+    # Warm the workers up so process start-up isn't counted as decode time
+    pool.submit(paths[0], target).result()
+    pool.cancel_pending()
+
+    ticks = []
+    start = time.perf_counter()
+    futures = [pool.submit(path, target) for path in paths]
+    while not all(future.done() for future in futures):
+        tick = time.perf_counter()
+        time.sleep(0.001)
+        ticks.append((time.perf_counter() - tick) * 1000 - 1)
+    elapsed = time.perf_counter() - start
+
+    decoded = [future.result() for future in futures]
+    failures = sum(1 for d in decoded if d is None)
+    del decoded, futures
+    gc.collect()
+    pool.shutdown()
+
+    ticks.sort()
+    return {
+        "images_per_s": len(paths) / elapsed,
+        "wall_ms": elapsed * 1000,
+        "tick_p50_ms": statistics.median(ticks) if ticks else 0.0,
+        "tick_max_ms": ticks[-1] if ticks else 0.0,
+        "failures": failures,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("directory")
+    parser.add_argument("--target", type=parse_size, default=QSize(1920, 1080))
+    parser.add_argument("--rounds", type=int, default=3, help="times each file is decoded")
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+    args = parser.parse_args()
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QGuiApplication(sys.argv[:1])
+
+    registry = DecoderRegistry.with_available_backends()
+    files = [
+        str(p) for p in sorted(Path(args.directory).rglob("*"))
+        if p.is_file() and p.suffix.lower().lstrip(".") in registry.extensions()
+    ]
+    if not files:
+        sys.exit("No supported images found.")
+    print(f"{len(files)} files x {args.rounds} rounds, target {args.target.width()}x{args.target.height()}, "
+          f"{args.workers} workers")
+    for mode in MODES:
+        # A fresh pool per round, since pools deduplicate paths they already have in flight
+        results = [_run(registry, mode, files, args.target, args.workers) for _ in range(args.rounds)]
+        print(
+            f"{mode:<8} {statistics.mean(r['images_per_s'] for r in results):7.1f} img/s   "
+            f"wall {statistics.mean(r['wall_ms'] for r in results):8.1f} ms   "
+            f"tick lateness p50 {statistics.mean(r['tick_p50_ms'] for r in results):5.2f} ms "
+            f"max {max(r['tick_max_ms'] for r in results):6.2f} ms   "
+            f"failures {sum(r['failures'] for r in results)}"
+        )
+    print(f"shared buffers still mapped: {live_shared_buffers()}")
+
+
+if __name__ == "__main__":
+    main()
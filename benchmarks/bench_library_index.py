@@ -0,0 +1,71 @@
+"""
+Benchmark the library filename index.
+
+Builds a LibraryIndex over a synthetic library of relative paths, then times
+substring and glob queries and checks them against a brute-force scan.
+
+:to use:
+    python benchmarks/bench_library_index.py [--paths 300000] [--query "anna standing"]
+"""
+
+from __future__ import annotations
+import argparse
+import fnmatch
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from library_index import GLOB_CHARS, LibraryIndex
+
+MODELS = ["anna", "bruno", "chloé", "dmitri", "emma", "farid", "greta", "hiro"]
+POSES = ["standing", "seated", "reclining", "gesture", "kneeling", "twist"]
+VIEWS = ["front", "back", "side", "three_quarter"]
+QUERIES = ["standing", "emma back", "chlo", "a", "*/seated/*back.jpg", "greta*twist*side*", "pose_00012"]
+
+
+def _brute_force(paths: list[str], query: str) -> list[int]:
+    terms = query.casefold().split()
+    return [
+        i for i, path in enumerate(paths)
+        if all(
+            fnmatch.fnmatchcase(path.casefold(), t) if GLOB_CHARS & set(t) else t in path.casefold()
+            for t in terms
+        )
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--paths", type=int, default=300_000, help="library size")
+    parser.add_argument("--query", action="append", help="query to time (repeatable)")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    paths = sorted(
+        f"{rng.choice(MODELS)}_{i // 750:04d}/{rng.choice(POSES)}/pose_{i:07d}_{rng.choice(VIEWS)}.jpg"
+        for i in range(args.paths)
+    )
+
+    start = time.perf_counter()
+    index = LibraryIndex("/library", paths)
+    build_s = time.perf_counter() - start
+    print(f"{len(paths)} paths indexed in {build_s:.2f} s "
+          f"({index._postings.nbytes / 2**20:.1f} MB of postings, {len(index._keys)} trigrams)")
+
+    for query in args.query or QUERIES:
+        index.search(query)  # warm up
+        start = time.perf_counter()
+        found = index.search(query)
+        search_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        expected = _brute_force(paths, query)
+        scan_ms = (time.perf_counter() - start) * 1000
+        status = "ok" if found.tolist() == expected else "MISMATCH"
+        print(f"{query!r:24} {len(found):8d} matches  {search_ms:7.1f} ms   (scan {scan_ms:7.1f} ms)  {status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark a reference pack against the loose folder it was built from.
+
+Writes a folder of synthetic camera-sized JPEGs, packs it, then compares
+opening the library (folder scan against pack open) and showing an image
+(decoding a loose file reduced to the screen against decoding the pack's
+closest rendition). The pack is opened fresh each round, so its open time
+includes mapping the file and reading the index.
+
+:to use:
+    python benchmarks/bench_reference_pack.py [--images 40] [--image 6000x4000] [--screen 1920x1080]
+"""
+
+from __future__ import annotations
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+EXTENSIONS = {"jpg"}
+
+
+def _size(text: str) -> tuple[int, int]:
+    width, _, height = text.partition("x")
+    return int(width), int(height)
+
+
+def _median_ms(fn, repeats: int) -> float:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--images", type=int, default=40)
+    parser.add_argument("--image", default="6000x4000", help="source image size")
+    parser.add_argument("--screen", default="1920x1080", help="size images are shown at")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    from PySide6.QtCore import QPointF, QSize
+    from PySide6.QtGui import QColor, QGuiApplication, QImage, QLinearGradient, QPainter
+    app = QGuiApplication(sys.argv[:1])
+
+    from decoders import QtDecoder
+    from library_index import full_path, scan_library
+    from reference_pack import ReferencePack, build_pack
+
+    root = tempfile.mkdtemp(prefix="fdt_pack_")
+    source = os.path.join(root, "images")
+    pack_path = os.path.join(root, "images.fdtpack")
+    try:
+        width, height = _size(args.image)
+        for i in range(args.images):
+            # A gradient compresses like a photo more than a flat fill does
+            image = QImage(width, height, QImage.Format.Format_RGB32)
+            gradient = QLinearGradient(QPointF(0, 0), QPointF(width, height))
+            gradient.setColorAt(0, QColor.fromHsv(i * 37 % 360, 120, 220))
+            gradient.setColorAt(1, QColor.fromHsv(i * 71 % 360, 200, 60))
+            painter = QPainter(image)
+            painter.fillRect(image.rect(), gradient)
+            painter.end()
+            folder = os.path.join(source, f"model_{i % 4}")
+            os.makedirs(folder, exist_ok=True)
+            image.save(os.path.join(folder, f"{i:04d}.jpg"), "JPG", 92)
+        folder_mb = sum(os.path.getsize(full_path(source, p)) for p in scan_library(source, EXTENSIONS)) / 2**20
+
+        start = time.perf_counter()
+        build_pack(source, pack_path, EXTENSIONS)
+        print(f"{args.images} {args.image} JPEGs ({folder_mb:.1f} MB) packed in {time.perf_counter() - start:.1f} s "
+              f"({os.path.getsize(pack_path) / 2**20:.1f} MB)")
+
+        def open_pack() -> None:
+            ReferencePack(pack_path).close()
+
+        def open_and_list() -> None:
+            pack = ReferencePack(pack_path)
+            pack.relative_paths()
+            pack.close()
+
+        print(f"folder scan              {_median_ms(lambda: scan_library(source, EXTENSIONS), args.repeats):8.2f} ms")
+        print(f"pack open                {_median_ms(open_pack, args.repeats):8.2f} ms")
+        print(f"pack open + path list    {_median_ms(open_and_list, args.repeats):8.2f} ms")
+
+        screen = QSize(*_size(args.screen))
+        paths = [full_path(source, p) for p in scan_library(source, EXTENSIONS)]
+        decoder = QtDecoder()
+        pack = ReferencePack(pack_path)
+        loose = _median_ms(lambda: [decoder.decode(path, screen) for path in paths], 1) / len(paths)
+        packed = _median_ms(lambda: [pack.decode(i, screen) for i in range(len(pack))], 1) / len(pack)
+        print(f"decode to {args.screen:>9}, loose {loose:8.2f} ms/image")
+        print(f"decode to {args.screen:>9}, pack  {packed:8.2f} ms/image   ({loose / packed:.1f}x)")
+        pack.close()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    del app
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark the cross-session seen-history log.
+
+Writes a synthetic log, then times building the "shown recently" Bloom filter
+and ordering a library so unseen images come first, and measures the filter's
+false-positive rate.
+
+:to use:
+    python benchmarks/bench_seen_history.py [--records 500000] [--library 200000] [--sessions 3]
+"""
+
+from __future__ import annotations
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from seen_history import RECORD_DTYPE, SeenHistory, image_ids
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=500_000, help="records in the synthetic log")
+    parser.add_argument("--library", type=int, default=200_000, help="library paths to order")
+    parser.add_argument("--per-session", type=int, default=50, help="images shown per session")
+    parser.add_argument("--sessions", type=int, default=3, help="recent sessions to keep behind")
+    args = parser.parse_args()
+
+    library = [f"/library/model_{i // 100:05d}/pose_{i:07d}.jpg" for i in range(args.library)]
+    ids = image_ids(library)
+
+    # Sessions of random library images, one record per second
+    rng = np.random.default_rng(0)
+    records = np.empty(args.records, dtype=RECORD_DTYPE)
+    records["time"] = 1_700_000_000 + np.arange(args.records)
+    records["session"] = 1 + np.arange(args.records) // args.per_session
+    records["id"] = ids[rng.integers(0, len(ids), args.records)]
+
+    log_path = os.path.join(tempfile.mkdtemp(prefix="fdt_bench_seen_"), "seen.log")
+    records.tofile(log_path)
+    history = SeenHistory(log_path)
+
+    start = time.perf_counter()
+    recent = history.recent_filter(sessions=args.sessions)
+    filter_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    ordered = history.order_unseen_first(library, sessions=args.sessions)
+    order_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    history.record(library[0])
+    history.close()
+    record_ms = (time.perf_counter() - start) * 1000
+
+    recent_ids = set(records["id"][-args.sessions * args.per_session:].tolist())
+    truly_unseen = np.array([i not in recent_ids for i in ids.tolist()])
+    false_positives = recent.contains(ids[truly_unseen]).mean()
+
+    print(f"log {args.records} records ({os.path.getsize(log_path) / 1e6:.1f} MB), "
+          f"library {args.library} paths, last {args.sessions} sessions = {recent.count} records")
+    print(f"recent filter     {filter_ms:8.2f} ms")
+    print(f"order unseen      {order_ms:8.2f} ms")
+    print(f"append record     {record_ms:8.2f} ms")
+    print(f"false positives   {false_positives * 100:8.3f} %   ({len(ordered) - truly_unseen.sum()} kept behind)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark state-change latency of the Figure Drawing Tool UI.
+
+Times the style transitions that happen during a session (start/stop,
+countdown colour changes, preset switches) including the event processing
+that repolishes and repaints the affected widgets.
+
+:to use:
+    python benchmarks/bench_state_styling.py [--iterations N]
+"""
+
+from __future__ import annotations
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtCore import QSettings
+from PySide6.QtGui import QColor, QImage
+from PySide6.QtWidgets import QApplication
+
+
+def _time_transition(app: QApplication, action: Callable[[], None], iterations: int) -> list[float]:
+    """Run action repeatedly and return per-call latency in milliseconds."""
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        action()
+        app.processEvents()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def _report(name: str, samples: list[float]) -> None:
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{name:<22} median {statistics.median(samples):7.3f} ms   p95 {p95:7.3f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    # Keep the benchmark away from the user's real settings
+    settings_dir = tempfile.mkdtemp(prefix="fdt_bench_settings_")
+    QSettings.setDefaultFormat(QSettings.Format.IniFormat)
+    QSettings.setPath(QSettings.Format.IniFormat, QSettings.Scope.UserScope, settings_dir)
+
+    app = QApplication(sys.argv[:1])
+    os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from figure_drawing_tool import FigureDrawingTool
+
+    # Tiny images so decoding doesn't dominate the start/stop timings
+    image_dir = tempfile.mkdtemp(prefix="fdt_bench_images_")
+    for i in range(4):
+        image = QImage(8, 8, QImage.Format.Format_RGB32)
+        image.fill(QColor(i * 40, 80, 120))
+        image.save(os.path.join(image_dir, f"{i}.png"))
+
+    tool = FigureDrawingTool()
+    tool.image_directory.setText(image_dir)
+    app.processEvents()
+
+    def start_stop() -> None:
+        tool._start()
+        tool._stop()
+
+    colors = iter(["green", "yellow", "red", "default"] * args.iterations)
+
+    def clock_color() -> None:
+        tool._set_clock_color(next(colors))
+
+    presets = iter([0, 2] * args.iterations)
+
+    def preset_switch() -> None:
+        tool.preset_combo.setCurrentIndex(next(presets))
+
+    print(f"{args.iterations} iterations each")
+    _report("start + stop", _time_transition(app, start_stop, args.iterations))
+    _report("clock colour change", _time_transition(app, clock_color, args.iterations))
+    _report("preset custom toggle", _time_transition(app, preset_switch, args.iterations))
+    tool.close()
+
+
+if __name__ == "__main__":
+    main()
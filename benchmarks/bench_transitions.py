@@ -0,0 +1,115 @@
+"""
+Benchmark image switches on the canvas, with and without a prepared frame.
+
+Shows a sequence of large decoded images on a canvas widget (offscreen) and
+times the GUI thread's work per switch: set_image plus the first paint,
+once with the next frame rendered ahead by the FrameScaler and once the old
+way, scaling in the first paint. Then times every painted frame of the
+crossfade and slide transitions against the display's frame budget.
+
+:to use:
+    python benchmarks/bench_transitions.py [--size 1600x1000] [--image 6000x4000] [--switches 10]
+"""
+
+from __future__ import annotations
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+FRAME_BUDGET_MS = 1000 / 60
+
+
+def _size(text: str) -> tuple[int, int]:
+    width, _, height = text.partition("x")
+    return int(width), int(height)
+
+
+def _summary(times_ms: list[float]) -> str:
+    times_ms = sorted(times_ms)
+    p95 = times_ms[min(len(times_ms) - 1, int(len(times_ms) * 0.95))]
+    return f"median {statistics.median(times_ms):6.2f} ms   p95 {p95:6.2f} ms   max {times_ms[-1]:6.2f} ms"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", default="1600x1000", help="canvas size")
+    parser.add_argument("--image", default="6000x4000", help="decoded image size")
+    parser.add_argument("--switches", type=int, default=10)
+    args = parser.parse_args()
+
+    from PySide6.QtGui import QColor, QImage
+    from PySide6.QtWidgets import QApplication
+    app = QApplication(sys.argv[:1])
+
+    from decode_pool import DecodedImage
+    from figure_drawing_tool import Label
+    from transitions import TRANSITION_CROSSFADE, TRANSITION_CUT, TRANSITION_SLIDE, FrameScaler
+
+    canvas = Label("")
+    canvas.resize(*_size(args.size))
+    scaler = FrameScaler()
+    scaler.ready.connect(canvas.on_frame_ready)
+
+    width, height = _size(args.image)
+    paths = []
+    for i in range(args.switches + 1):
+        image = QImage(width, height, QImage.Format.Format_RGB32)
+        image.fill(QColor.fromHsv(i * 47 % 360, 140, 190))
+        paths.append(f"image_{i}")
+        canvas.preload(paths[-1], DecodedImage(image))
+    canvas.set_image(paths[0])
+    canvas.show()
+    app.processEvents()  # exposed, so repaint() paints
+
+    def wait_for_frame(path: str) -> None:
+        deadline = time.monotonic() + 10
+        while (canvas._back is None or canvas._back.path != path) and time.monotonic() < deadline:
+            app.processEvents()
+            time.sleep(0.001)
+
+    def switch(path: str) -> float:
+        start = time.perf_counter()
+        canvas.set_image(path)
+        canvas.repaint()
+        return (time.perf_counter() - start) * 1000
+
+    print(f"{args.image} images on a {args.size} canvas, {args.switches} switches")
+    canvas.transition = TRANSITION_CUT
+    for label, prepared in [("scaled in first paint", False), ("prepared frame swap", True)]:
+        canvas.frame_scaler = scaler if prepared else None
+        times = []
+        for path in paths[1:]:
+            canvas.prepare_next(path)
+            if prepared:
+                wait_for_frame(path)
+            times.append(switch(path))
+        print(f"{label:24} {_summary(times)}")
+        paths.reverse()
+
+    canvas.frame_scaler = scaler
+    for transition in (TRANSITION_CROSSFADE, TRANSITION_SLIDE):
+        canvas.transition = transition
+        frame_times = []
+        for path in paths[1:]:
+            canvas.prepare_next(path)
+            wait_for_frame(path)
+            canvas.set_image(path)
+            while canvas._outgoing is not None:
+                app.processEvents()
+                start = time.perf_counter()
+                canvas.repaint()
+                frame_times.append((time.perf_counter() - start) * 1000)
+        over = sum(t > FRAME_BUDGET_MS for t in frame_times)
+        print(f"{transition + ' frames':24} {_summary(frame_times)}   {over} of {len(frame_times)} over "
+              f"{FRAME_BUDGET_MS:.1f} ms")
+        paths.reverse()
+    scaler.shutdown()
+
+
+if __name__ == "__main__":
+    main()
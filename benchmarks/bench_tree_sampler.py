@@ -0,0 +1,104 @@
+"""
+Benchmark sampling a short session from a large folder tree.
+
+Creates a synthetic library of empty image files (models of very different
+sizes, each with pose subfolders), then compares a full scan and shuffle
+with drawing a session through TreeSampler: with no counts saved yet, with
+saved counts, and in balanced mode. Reports time and folders listed, and how
+the draws spread over the models compared with their sizes.
+
+:to use:
+    python benchmarks/bench_tree_sampler.py [--files 100000] [--session 10]
+"""
+
+from __future__ import annotations
+import argparse
+import collections
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from library_index import scan_library
+from tree_sampler import DirectoryCounts, TreeSampler
+
+POSES = ["standing", "seated", "reclining", "gesture", "kneeling", "twist"]
+EXTENSIONS = {"jpg", "png"}
+
+
+def _make_tree(root: str, files: int, models: int, rng: random.Random) -> dict[str, int]:
+    """Empty image files spread over models by a long-tailed distribution; returns files per model."""
+    weights = [1 / (i + 1) for i in range(models)]
+    sizes = collections.Counter(rng.choices(range(models), weights, k=files))
+    for model, size in sizes.items():
+        for pose in POSES:
+            os.makedirs(os.path.join(root, f"model_{model:03d}", pose))
+        for i in range(size):
+            path = os.path.join(root, f"model_{model:03d}", POSES[i % len(POSES)], f"{i:06d}.jpg")
+            open(path, "wb").close()
+    return {f"model_{model:03d}": size for model, size in sizes.items()}
+
+
+def _model(root: str, path: str) -> str:
+    return os.path.relpath(path, root).split(os.sep)[0]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=100_000, help="images in the library")
+    parser.add_argument("--models", type=int, default=200, help="top-level subfolders")
+    parser.add_argument("--session", type=int, default=10, help="images per session")
+    parser.add_argument("--sessions", type=int, default=300, help="sessions drawn to measure the spread")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    root = tempfile.mkdtemp(prefix="fdt_tree_")
+    cache_path = os.path.join(tempfile.mkdtemp(prefix="fdt_counts_"), "counts.json")
+    try:
+        start = time.perf_counter()
+        sizes = _make_tree(root, args.files, args.models, rng)
+        print(f"{args.files} files in {len(sizes)} models created in {time.perf_counter() - start:.1f} s")
+
+        start = time.perf_counter()
+        paths = scan_library(root, EXTENSIONS)
+        rng.shuffle(paths)
+        print(f"full scan + shuffle        {(time.perf_counter() - start) * 1000:8.1f} ms  "
+              f"{1 + len(sizes) * (1 + len(POSES)):6d} folders listed")
+
+        for label, balanced in [("sample, no saved counts", False), ("sample, saved counts", False),
+                                ("balanced, saved counts", True)]:
+            counts = DirectoryCounts(root, EXTENSIONS, cache_path)
+            start = time.perf_counter()
+            session = TreeSampler(counts, balanced=balanced, rng=rng).sample(args.session)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            print(f"{label:26} {elapsed_ms:8.1f} ms  {counts.folders_listed:6d} folders listed  "
+                  f"{len(set(session))} images from {len({_model(root, p) for p in session})} models")
+            if not counts.complete:
+                start = time.perf_counter()
+                counts.count_all()  # in the tool this runs in the background
+                print(f"  background count         {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+        # Share of draws going to the largest models, against their share of the files
+        counts = DirectoryCounts(root, EXTENSIONS, cache_path)
+        largest = sorted(sizes, key=sizes.get, reverse=True)[:5]
+        for balanced in (False, True):
+            drawn = collections.Counter()
+            for _ in range(args.sessions):
+                for path in TreeSampler(counts, balanced=balanced, rng=rng).sample(args.session):
+                    drawn[_model(root, path)] += 1
+            total = sum(drawn.values())
+            shares = "  ".join(
+                f"{sizes[m] / args.files:5.1%}->{drawn[m] / total:5.1%}" for m in largest
+            )
+            print(f"{'balanced' if balanced else 'weighted':9} largest models, files->draws: {shares}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+        shutil.rmtree(os.path.dirname(cache_path), ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark the value-study filters.
+
+Times each filter on a synthetic image at a typical display-decoded size,
+and a cached lookup, which is what switching filters costs once computed.
+
+:to use:
+    python benchmarks/bench_value_filters.py [--width 1032] [--height 1440] [--repeat 5]
+"""
+
+from __future__ import annotations
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QColor, QGuiApplication, QImage, QLinearGradient, QPainter
+
+from decode_pool import DecodedImage
+from value_filters import FILTERS, FilterEngine
+
+
+def _make_image(width: int, height: int) -> QImage:
+    """Gradient with a few shapes, so every filter has edges and tones to find."""
+    image = QImage(width, height, QImage.Format.Format_RGB32)
+    painter = QPainter(image)
+    gradient = QLinearGradient(0, 0, width, height)
+    gradient.setColorAt(0, QColor(30, 20, 10))
+    gradient.setColorAt(1, QColor(240, 220, 200))
+    painter.fillRect(image.rect(), gradient)
+    painter.setPen(Qt.PenStyle.NoPen)
+    for i in range(12):
+        painter.setBrush(QColor.fromHsv(i * 30, 160, 40 + i * 17))
+        painter.drawEllipse(i * width // 14, i * height // 14, width // 4, height // 5)
+    painter.end()
+    return image
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--width", type=int, default=1032)
+    parser.add_argument("--height", type=int, default=1440)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QGuiApplication(sys.argv[:1])
+    image = _make_image(args.width, args.height)
+
+    print(f"{args.width}x{args.height} RGB32, median of {args.repeat}")
+    for value_filter in FILTERS.values():
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            result = value_filter.apply(image)
+            times.append((time.perf_counter() - start) * 1000)
+        print(f"{value_filter.name:<10} {statistics.median(times):8.2f} ms   "
+              f"-> {result.width()}x{result.height()} {result.format().name}")
+
+    # Switching between computed filters is a cache lookup
+    engine = FilterEngine()
+    source = DecodedImage(image)
+    engine.warm("bench", source, list(FILTERS))
+    while any(engine.get("bench", name) is None for name in FILTERS):
+        app.processEvents()
+        time.sleep(0.005)
+    start = time.perf_counter()
+    for _ in range(1000):
+        for name in FILTERS:
+            engine.request("bench", source, name)
+    lookup_us = (time.perf_counter() - start) * 1e6 / (1000 * len(FILTERS))
+    engine.shutdown()
+    print(f"{'cached':<10} {lookup_us:8.2f} us per switch")
+
+
+if __name__ == "__main__":
+    main()
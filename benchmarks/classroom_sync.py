@@ -0,0 +1,232 @@
+"""
+Measure how closely classroom followers switch with their controller.
+
+Starts one leading and several following Figure Drawing Tool processes on
+this machine (offscreen, each with its own settings), all on a shared
+generated image folder. The controller runs a fast schedule and is driven
+through next, previous and pause/resume; each follower's clock is skewed by
+a random offset of up to --skew-s, which the ping exchange has to measure.
+Every process logs its image switches on the machine's monotonic clock, and
+each controller switch is matched with the followers' switches to the same
+image. Timed switches (at a deadline followers know in advance) and manual
+ones (which followers learn of from a datagram) are reported apart, along
+with how far each follower's measured clock offset is from its real skew.
+
+Processes on one machine share its cores: on a single core they take turns
+at every switch, which adds a tail of tens of ms that followers on their
+own machines don't have.
+
+Exits with status 1 if a process raises, if a follower misses a switch, or
+if it switches more than --max-error-ms (timed) or --max-manual-ms (manual)
+away from the controller.
+
+:to use:
+    python benchmarks/classroom_sync.py [--followers 4] [--schedule "12x2s"] [--skew-s 5]
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# (seconds after the start, action) the controller performs
+SCRIPT = [(5.3, "next"), (7.1, "previous"), (9.4, "pause"), (10.9, "pause"), (13.2, "next")]
+ROOM = "sync-test"
+
+
+def _make_images(directory: str, count: int) -> None:
+    from PySide6.QtGui import QColor, QImage
+    for i in range(count):
+        image = QImage(640, 480, QImage.Format.Format_RGB32)
+        image.fill(QColor.fromHsv(i * 37 % 360, 120, 200))
+        image.save(os.path.join(directory, f"pose_{i:03d}.jpg"), quality=85)
+
+
+def _run_child(args: argparse.Namespace) -> None:
+    """Run one tool process, printing a JSON line per image switch.
+
+    Exits with status 1 if anything raised, which Qt would otherwise only print.
+    """
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    raised = []
+
+    def excepthook(*exc_info) -> None:
+        raised.append(exc_info)
+        sys.__excepthook__(*exc_info)
+
+    sys.excepthook = excepthook
+    from PySide6.QtCore import QSettings, QTimer
+    from PySide6.QtWidgets import QApplication
+
+    settings_dir = tempfile.mkdtemp(prefix="fdt_classroom_settings_")
+    QSettings.setDefaultFormat(QSettings.Format.IniFormat)
+    QSettings.setPath(QSettings.Format.IniFormat, QSettings.Scope.UserScope, settings_dir)
+    os.environ["XDG_CONFIG_HOME"] = settings_dir
+
+    app = QApplication(sys.argv[:1])
+    os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from clock import Clock
+    from figure_drawing_tool import FigureDrawingTool
+    from schedule import Schedule
+
+    class SkewedClock(Clock):
+        """The real clock, read with an offset as if on another machine."""
+
+        def monotonic(self) -> float:
+            return time.monotonic() + args.skew
+
+    tool = FigureDrawingTool(clock=SkewedClock())
+    tool.show()
+    tool.image_directory.setText(args.images)
+    tool._load_image_list()
+
+    show_image = tool._show_image
+    manual = [False]
+
+    def logged_show_image(image_path: str, *args) -> None:
+        event = {"t": time.monotonic(), "path": os.path.basename(image_path), "manual": manual[0]}
+        print(json.dumps(event), flush=True)
+        show_image(image_path, *args)
+
+    def run_manually(action) -> None:
+        manual[0] = True
+        action()
+        manual[0] = False
+
+    tool._show_image = logged_show_image
+
+    if args.role == "lead":
+        schedule = Schedule.parse("Sync", args.schedule)
+        tool.preset_combo.addItem(schedule.label(), schedule)
+        tool.preset_combo.setCurrentIndex(tool.preset_combo.count() - 1)
+        tool.lead_classroom(ROOM, args.port)
+        actions = {"next": tool._next, "previous": tool._previous, "pause": tool._toggle_pause}
+        # Give followers a moment to join and measure the clock offset first
+        QTimer.singleShot(1000, lambda: run_manually(tool._start))
+        for at, action in SCRIPT:
+            QTimer.singleShot(round((1 + at) * 1000), lambda action=actions[action]: run_manually(action))
+    else:
+        tool.follow_classroom(ROOM, args.port)
+
+    def finish() -> None:
+        if tool.classroom_follower is not None:
+            # The controller's clock reads `skew` behind ours
+            offset = tool.classroom_follower.offset
+            print(json.dumps({"offset_error": offset.offset + args.skew, "round_trip": offset.round_trip}), flush=True)
+        app.quit()  # closes the window, which leaves the classroom
+
+    QTimer.singleShot(round(args.duration * 1000), finish)
+    app.exec()
+    sys.exit(1 if raised else 0)
+
+
+def _events(lines: list[str]) -> list[dict]:
+    events = []
+    for line in lines:
+        try:
+            events.append(json.loads(line))
+        except ValueError:
+            continue
+    return events
+
+
+def _summary(errors: list[float]) -> str:
+    if not errors:
+        return "none"
+    errors = sorted(errors)
+    p95 = errors[min(len(errors) - 1, int(len(errors) * 0.95))]
+    return f"median {statistics.median(errors):6.2f} ms   p95 {p95:6.2f} ms   max {errors[-1]:6.2f} ms"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--followers", type=int, default=4)
+    parser.add_argument("--schedule", default="12x2s", help="controller's schedule spec")
+    parser.add_argument("--skew-s", type=float, default=5.0, help="largest follower clock offset")
+    parser.add_argument("--port", type=int, default=45455, help="classroom UDP port")
+    parser.add_argument("--max-error-ms", type=float, default=30, help="limit for timed switches")
+    parser.add_argument("--max-manual-ms", type=float, default=250, help="limit for manual switches")
+    parser.add_argument("--seed", type=int, default=1)
+    # Used by the child processes
+    parser.add_argument("--role", choices=["lead", "follow"], help=argparse.SUPPRESS)
+    parser.add_argument("--images", help=argparse.SUPPRESS)
+    parser.add_argument("--skew", type=float, default=0.0, help=argparse.SUPPRESS)
+    parser.add_argument("--duration", type=float, default=0.0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.role:
+        _run_child(args)
+        return
+
+    from schedule import Schedule
+    duration = 1 + Schedule.parse("Sync", args.schedule).total_seconds + 3 + 2  # + pause, + slack
+    image_dir = tempfile.mkdtemp(prefix="fdt_classroom_images_")
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtGui import QGuiApplication
+    app = QGuiApplication(sys.argv[:1])  # for image writing
+    _make_images(image_dir, 40)
+    del app
+
+    rng = random.Random(args.seed)
+    command = [sys.executable, os.path.abspath(__file__), "--images", image_dir, "--port", str(args.port)]
+    followers = [
+        subprocess.Popen(
+            command + ["--role", "follow", "--duration", str(duration + 1),
+                       "--skew", str(rng.uniform(-args.skew_s, args.skew_s))],
+            stdout=subprocess.PIPE, text=True
+        )
+        for _ in range(args.followers)
+    ]
+    time.sleep(2)  # followers import Qt and join before the controller starts
+    leader = subprocess.Popen(
+        command + ["--role", "lead", "--duration", str(duration), "--schedule", args.schedule],
+        stdout=subprocess.PIPE, text=True
+    )
+    lead_events = _events(leader.communicate()[0].splitlines())
+    follower_events = [_events(p.communicate()[0].splitlines()) for p in followers]
+
+    timed: list[float] = []
+    manual: list[float] = []
+    missed = 0
+    for switch in (e for e in lead_events if "path" in e):
+        for events in follower_events:
+            nearest = min((abs(e["t"] - switch["t"]) for e in events if e.get("path") == switch["path"]), default=None)
+            if nearest is None or nearest > 1.0:
+                missed += 1
+            else:
+                (manual if switch["manual"] else timed).append(nearest * 1000)
+    offsets = [e for events in follower_events for e in events if "offset_error" in e]
+
+    print(f"{len(timed) // max(args.followers, 1)} timed and {len(manual) // max(args.followers, 1)} manual "
+          f"controller switches, {args.followers} followers, clocks skewed up to {args.skew_s:.1f} s")
+    print(f"timed switches   {_summary(timed)}")
+    print(f"manual switches  {_summary(manual)}")
+    print(f"clock offset     {_summary([abs(e['offset_error']) * 1000 for e in offsets])}")
+    print(f"ping round trip  {_summary([(e['round_trip'] or 0) * 1000 for e in offsets])}")
+    print(f"missed switches  {missed}")
+
+    failed = False
+    crashed = sum(p.returncode != 0 for p in [leader, *followers])
+    if crashed:
+        print(f"FAIL: {crashed} of the tool processes raised (see their tracebacks above)")
+        failed = True
+    if missed or len(offsets) < args.followers:
+        print("FAIL: a follower missed switches or didn't measure the controller's clock")
+        failed = True
+    if timed and max(timed) > args.max_error_ms:
+        print(f"FAIL: a timed switch was {max(timed):.1f} ms off (limit {args.max_error_ms} ms)")
+        failed = True
+    if manual and max(manual) > args.max_manual_ms:
+        print(f"FAIL: a manual switch was {max(manual):.1f} ms off (limit {args.max_manual_ms} ms)")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""
+Soak test the Figure Drawing Tool on an accelerated virtual clock.
+
+Drives a real FigureDrawingTool (offscreen) through thousands of image
+cycles with scripted input: timer expiries, next/previous, flips, grayscale,
+resizes, pause/resume, idle hibernation and restarts. Time is simulated, so
+hours of session run in seconds. Samples RSS, live QPixmap/QImage wrappers
+and decoded images, plus how far image switches land from their deadlines.
+
+Exits with status 1 if memory grows by more than --max-growth-mb after the
+warm-up, or a timer-driven switch misses its deadline by more than
+--max-deadline-error-ms.
+
+:to use:
+    python benchmarks/soak.py [--cycles 2000] [--images DIR] [--schedule "10x30s, 5x1m"]
+                              [--decode-mode thread|process] [--seed 1]
+"""
+
+from __future__ import annotations
+import argparse
+import gc
+import math
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtCore import QSettings
+from PySide6.QtGui import QColor, QImage, QPainter, QPixmap
+from PySide6.QtWidgets import QApplication
+
+# Relative weights of the scripted actions
+ACTIONS = {
+    "elapse": 60,
+    "next": 10,
+    "previous": 8,
+    "flip_h": 4,
+    "flip_v": 3,
+    "grayscale": 4,
+    "resize": 5,
+    "pause": 4,
+    "idle": 1,
+    "restart": 1,
+}
+IDLE_MS = 6 * 60 * 1000  # longer than the tool's idle hibernation delay
+
+
+def _rss_mb() -> float:
+    """Current resident set size in MB (peak size where current isn't available)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (2**20 if sys.platform == "darwin" else 2**10)
+
+
+def _live_wrappers() -> tuple[int, int]:
+    """Number of live QPixmap and QImage Python wrappers."""
+    pixmaps = images = 0
+    for obj in gc.get_objects():
+        if isinstance(obj, QPixmap):
+            pixmaps += 1
+        elif isinstance(obj, QImage):
+            images += 1
+    return pixmaps, images
+
+
+def _make_images(directory: str, count: int, rng: random.Random) -> None:
+    """Write count JPEGs of assorted sizes and orientations."""
+    for i in range(count):
+        width, height = rng.choice([(1600, 1200), (1200, 1600), (800, 600), (2400, 1000)])
+        image = QImage(width, height, QImage.Format.Format_RGB32)
+        image.fill(QColor.fromHsv(i * 37 % 360, 120, 200))
+        painter = QPainter(image)
+        painter.fillRect(width // 4, height // 4, width // 2, height // 2, QColor.fromHsv(i * 53 % 360, 200, 90))
+        painter.end()
+        image.save(os.path.join(directory, f"soak_{i:03d}.jpg"), quality=85)
+
+
+class SoakRun:
+    """Scripted session on a virtual clock, with metrics."""
+
+    def __init__(self, app: QApplication, tool, clock, rng: random.Random) -> None:
+        self.app = app
+        self.tool = tool
+        self.clock = clock
+        self.rng = rng
+        self.cycles = 0
+        self.deadline_errors: list[float] = []
+        self.countdown_drift: list[int] = []
+        self.samples: list[dict[str, float]] = []
+        self._shown_at: Optional[int] = None
+        self._paused_ms = 0
+        self._expected_ms = 0
+        self._image_key: Optional[tuple[int, int]] = None
+
+    def _settle(self) -> None:
+        """Deliver queued signals and paint, as the event loop would."""
+        self.app.processEvents()
+        self.tool.canvas.repaint()
+
+    def _track_switch(self, timer_driven: bool) -> None:
+        """Note image changes and how late timer-driven ones were."""
+        tool = self.tool
+        key = (len(tool.image_history), tool.history_index)
+        if key == self._image_key or not tool.is_running:
+            if not tool.is_running:
+                self._image_key = None
+            return
+        if timer_driven and self._shown_at is not None:
+            on_screen = self.clock.now_ms - self._shown_at - self._paused_ms
+            self.deadline_errors.append(on_screen - self._expected_ms)
+        self._image_key = key
+        self._shown_at = self.clock.now_ms
+        self._paused_ms = 0
+        self._expected_ms = tool.elapse_time_seconds * 1000
+        self.cycles += 1
+
+    def _check_countdown(self) -> None:
+        """Compare the countdown display with the image timer it mirrors."""
+        tool = self.tool
+        if tool.is_running and not tool.is_paused and tool.image_timer and tool.image_timer.isActive():
+            actual = math.ceil(tool.image_timer.remainingTime() / 1000)
+            self.countdown_drift.append(abs(tool.remaining_seconds - actual))
+
+    def _pause_for(self, msec: int) -> None:
+        self.tool._toggle_pause()
+        self.clock.advance(msec)
+        self._settle()
+        self.tool._toggle_pause()
+        self._paused_ms += msec
+
+    def step(self) -> None:
+        """Run one scripted action."""
+        tool = self.tool
+        if not tool.is_running:
+            tool._restart()
+            tool._start()
+            self._settle()
+            self._track_switch(timer_driven=False)
+            return
+
+        action = self.rng.choices(list(ACTIONS), weights=list(ACTIONS.values()))[0]
+        timer_driven = False
+        if action == "elapse":
+            # Jump to just past the image deadline, firing countdown ticks on the way
+            self.clock.advance(tool.image_timer.deadline() - self.clock.now_ms)
+            timer_driven = True
+        elif action == "next":
+            tool._next()
+        elif action == "previous":
+            tool._previous()
+        elif action == "flip_h":
+            tool._toggle_flip_h()
+        elif action == "flip_v":
+            tool._toggle_flip_v()
+        elif action == "grayscale":
+            tool._toggle_grayscale()
+        elif action == "resize":
+            tool.resize(self.rng.randint(400, 1400), self.rng.randint(500, 1000))
+        elif action == "pause":
+            self.clock.advance(self.rng.randint(0, 5000))
+            self._pause_for(self.rng.randint(500, 20000))
+        elif action == "idle":
+            self._pause_for(IDLE_MS)
+        elif action == "restart":
+            tool._restart()
+            tool._start()
+        self._settle()
+        self._track_switch(timer_driven)
+        self._check_countdown()
+
+    def sample(self) -> dict[str, float]:
+        from decode_pool import live_shared_buffers
+        pixmaps, images = _live_wrappers()
+        sample = {
+            "cycles": self.cycles,
+            "virtual_h": self.clock.now_ms / 3.6e6,
+            "rss_mb": _rss_mb(),
+            "pixmaps": pixmaps,
+            "images": images,
+            "cache_mb": self.tool.resource_governor.total_bytes() / 2**20,
+            "shared": live_shared_buffers(),
+        }
+        self.samples.append(sample)
+        return sample
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cycles", type=int, default=2000, help="image switches to run")
+    parser.add_argument("--images", help="image folder (default: generated JPEGs)")
+    parser.add_argument("--image-count", type=int, default=40, help="images to generate")
+    parser.add_argument("--schedule", help='schedule spec to follow, e.g. "10x30s, 5x1m" (default: 30 s each)')
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--decode-mode", choices=["thread", "process"], default="thread")
+    parser.add_argument("--sample-every", type=int, default=200, help="cycles between samples")
+    parser.add_argument("--warmup", type=int, default=300, help="cycles before the memory baseline")
+    parser.add_argument("--max-growth-mb", type=float, default=64)
+    parser.add_argument("--max-deadline-error-ms", type=float, default=50)
+    args = parser.parse_args()
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    # Keep the run away from the user's settings, seen-history log and schedules
+    settings_dir = tempfile.mkdtemp(prefix="fdt_soak_settings_")
+    QSettings.setDefaultFormat(QSettings.Format.IniFormat)
+    QSettings.setPath(QSettings.Format.IniFormat, QSettings.Scope.UserScope, settings_dir)
+    os.environ["XDG_CONFIG_HOME"] = settings_dir  # config_path() files, on Linux
+
+    app = QApplication(sys.argv[:1])
+    os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from clock import VirtualClock
+    from figure_drawing_tool import FigureDrawingTool
+    from schedule import Schedule
+
+    QSettings(FigureDrawingTool.SETTINGS_ORG, FigureDrawingTool.SETTINGS_APP).setValue("decode_mode", args.decode_mode)
+
+    rng = random.Random(args.seed)
+    image_dir = args.images
+    if not image_dir:
+        image_dir = tempfile.mkdtemp(prefix="fdt_soak_images_")
+        _make_images(image_dir, args.image_count, rng)
+
+    clock = VirtualClock()
+    tool = FigureDrawingTool(clock=clock)
+    tool.show()
+    tool.image_directory.setText(image_dir)
+    tool._load_image_list()
+    if args.schedule:
+        schedule = Schedule.parse("Soak", args.schedule)
+        tool.preset_combo.addItem(schedule.label(), schedule)
+        tool.preset_combo.setCurrentIndex(tool.preset_combo.count() - 1)
+    else:
+        tool.preset_combo.setCurrentIndex(1)  # 30 sec
+
+    run = SoakRun(app, tool, clock, rng)
+    print(f"{'cycles':>7} {'virtual h':>9} {'rss MB':>8} {'pixmaps':>7} {'images':>6} {'cache MB':>8} {'shm':>4}")
+    started = time.perf_counter()
+    next_sample = 0
+    baseline: Optional[dict[str, float]] = None
+    while run.cycles < args.cycles:
+        run.step()
+        if run.cycles >= next_sample:
+            gc.collect()
+            s = run.sample()
+            print(f"{s['cycles']:7d} {s['virtual_h']:9.2f} {s['rss_mb']:8.1f} {s['pixmaps']:7d} "
+                  f"{s['images']:6d} {s['cache_mb']:8.1f} {s['shared']:4d}")
+            if baseline is None and run.cycles >= args.warmup:
+                baseline = s
+            next_sample += args.sample_every
+    elapsed = time.perf_counter() - started
+    tool.close()
+    gc.collect()
+    final = run.sample()
+
+    errors = sorted(abs(e) for e in run.deadline_errors) or [0.0]
+    drift = run.countdown_drift or [0]
+    growth = final["rss_mb"] - (baseline or run.samples[0])["rss_mb"]
+    print(f"\n{run.cycles} cycles, {clock.now_ms / 3.6e6:.1f} virtual hours in {elapsed:.1f} s")
+    print(f"deadline error   median {statistics.median(errors):.1f} ms   max {errors[-1]:.1f} ms   "
+          f"({len(run.deadline_errors)} timer-driven switches)")
+    print(f"countdown drift  max {max(drift)} s   mean {statistics.mean(drift):.3f} s")
+    print(f"rss growth after warm-up {growth:+.1f} MB")
+
+    failed = False
+    if growth > args.max_growth_mb:
+        print(f"FAIL: memory grew {growth:.1f} MB (limit {args.max_growth_mb} MB)")
+        failed = True
+    if errors[-1] > args.max_deadline_error_ms:
+        print(f"FAIL: a switch missed its deadline by {errors[-1]:.0f} ms (limit {args.max_deadline_error_ms} ms)")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
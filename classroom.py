@@ -0,0 +1,328 @@
+"""
+Classroom mode for the Figure Drawing Tool: one instance drives many.
+
+The controller multicasts its session state on the local network as small
+JSON datagrams: the seed its image order was shuffled with, the library
+filter, the schedule, the position in the sequence and the time the image
+on screen ends. Followers with the same image folder rebuild the same order
+from the seed, so they prefetch ahead on their own and a switch costs one
+datagram and no image transfer. Followers ping the controller to measure
+the offset between the two clocks and switch at the controller's deadline,
+converted to their own clock, rather than when a datagram happens to
+arrive. The state is resent every HEARTBEAT_MS, which recovers lost
+datagrams and lets latecomers join a running session.
+
+Several followers can run on one machine (they share the multicast port),
+so a whole class can be tried out locally; see benchmarks/classroom_sync.py.
+
+:to use:
+    controller = ClassroomController("room 2", clock)
+    controller.start()
+    controller.publish({"seed": seed, "position": 0, ...})
+
+    follower = ClassroomFollower("room 2", clock)
+    follower.state_received.connect(follow)
+    follower.start()
+"""
+
+from __future__ import annotations
+import hashlib
+import json
+import random
+from typing import Optional
+
+from PySide6.QtCore import QObject, QTimer, Signal
+from PySide6.QtNetwork import QAbstractSocket, QHostAddress, QNetworkDatagram, QUdpSocket
+
+from clock import Clock
+
+PROTOCOL_VERSION = 1
+# Administratively scoped multicast group: stays on the local network
+DEFAULT_GROUP = "239.255.42.99"
+DEFAULT_PORT = 45454
+HEARTBEAT_MS = 1000
+# Followers measure the clock offset quickly on joining, then keep it fresh
+PING_BURST = 8
+PING_BURST_MS = 50
+PING_INTERVAL_MS = 2000
+# Offset is taken from the fastest of the recent round trips
+OFFSET_SAMPLES = 16
+# A follower counts as present while it has pinged this recently
+FOLLOWER_TIMEOUT_S = 3 * PING_INTERVAL_MS / 1000
+MAX_DATAGRAM_BYTES = 8192
+
+
+def session_order(relative_paths: list[str], seed: int) -> list[str]:
+    """Image order of a classroom session, the same on every machine.
+
+    Paths are sorted before shuffling, so the order depends only on the set
+    of relative paths and the seed, not on how the folder was listed.
+    """
+    order = sorted(relative_paths)
+    random.Random(seed).shuffle(order)
+    return order
+
+
+def library_fingerprint(relative_paths: list[str]) -> str:
+    """Short hash of a set of relative paths, to check followers see the same images."""
+    digest = hashlib.blake2b(digest_size=8)
+    for path in sorted(relative_paths):
+        digest.update(path.encode("utf-8") + b"\n")
+    return digest.hexdigest()
+
+
+class ClockOffset:
+    """Offset of a remote clock from the local one, from ping round trips.
+
+    A round trip bounds the offset to within half its duration, so the
+    estimate comes from the fastest recent round trip: the one least
+    disturbed by scheduling and network delays.
+    """
+
+    def __init__(self) -> None:
+        self._samples: list[tuple[float, float]] = []  # (round trip, offset)
+        # Used until the first round trip, e.g. from a message's send time
+        self.provisional: Optional[float] = None
+
+    def add_sample(self, sent: float, remote: float, received: float) -> None:
+        """Record a ping sent and its reply received (local times) and the remote time in the reply."""
+        self._samples.append((received - sent, remote - (sent + received) / 2))
+        del self._samples[:-OFFSET_SAMPLES]
+
+    def clear(self) -> None:
+        self._samples.clear()
+        self.provisional = None
+
+    @property
+    def measured(self) -> bool:
+        return bool(self._samples)
+
+    @property
+    def offset(self) -> float:
+        """Seconds to subtract from a remote time to get the local time."""
+        if self._samples:
+            return min(self._samples)[1]
+        return self.provisional or 0.0
+
+    @property
+    def round_trip(self) -> Optional[float]:
+        """Fastest recent round trip in seconds, None before the first."""
+        return min(self._samples)[0] if self._samples else None
+
+
+def _decode(datagram: QNetworkDatagram) -> Optional[dict]:
+    """JSON object in a datagram of this protocol, None for anything else."""
+    data = bytes(datagram.data().data())
+    if len(data) > MAX_DATAGRAM_BYTES:
+        return None
+    try:
+        message = json.loads(data)
+    except ValueError:
+        return None
+    if not isinstance(message, dict) or message.get("v") != PROTOCOL_VERSION:
+        return None
+    return message
+
+
+def _encode(message: dict) -> bytes:
+    return json.dumps({"v": PROTOCOL_VERSION, **message}, separators=(",", ":")).encode("utf-8")
+
+
+class ClassroomController(QObject):
+    """Multicasts a session's state to followers and answers their clock pings.
+
+    Args:
+        room: Name followers join; several classes can share a network
+        clock: Time source the state's deadlines are given in
+        group: Multicast group address
+        port: Multicast port
+        parent: Qt parent object
+    """
+
+    followers_changed = Signal(int)  # number of followers pinging
+
+    def __init__(
+        self, room: str, clock: Clock, group: str = DEFAULT_GROUP, port: int = DEFAULT_PORT,
+        parent: Optional[QObject] = None
+    ) -> None:
+        super().__init__(parent)
+        self.room = room
+        self.clock = clock
+        self.group = QHostAddress(group)
+        self.port = port
+        self._state: Optional[dict] = None
+        self._sequence = 0
+        self._followers: dict[tuple[str, int], float] = {}  # address -> last ping
+        self._reported_followers = 0
+
+        self._socket = QUdpSocket(self)
+        self._socket.readyRead.connect(self._on_ready_read)
+        self._heartbeat = QTimer(self)
+        self._heartbeat.setInterval(HEARTBEAT_MS)
+        self._heartbeat.timeout.connect(self._send)
+
+    def start(self) -> bool:
+        """Open the socket; False if it can't be opened."""
+        if not self._socket.bind(QHostAddress(QHostAddress.SpecialAddress.AnyIPv4), 0):
+            return False
+        self._socket.setSocketOption(QAbstractSocket.SocketOption.MulticastTtlOption, 1)
+        self._socket.setSocketOption(QAbstractSocket.SocketOption.MulticastLoopbackOption, 1)
+        self._heartbeat.start()
+        return True
+
+    def stop(self) -> None:
+        """Tell followers the session is over and close the socket."""
+        if self._state is not None and self._state.get("running"):
+            self.publish({**self._state, "running": False})
+        self._heartbeat.stop()
+        self._socket.close()
+
+    def publish(self, state: dict) -> None:
+        """Send a new session state now, and keep resending it until the next one."""
+        self._state = state
+        self._send()
+        self._heartbeat.start()  # next heartbeat a full interval after this
+
+    def _send(self) -> None:
+        if self._state is None:
+            return
+        self._sequence += 1
+        message = {
+            **self._state, "type": "state", "room": self.room, "seq": self._sequence,
+            "port": self._socket.localPort(), "sent": self.clock.monotonic(),
+        }
+        self._socket.writeDatagram(_encode(message), self.group, self.port)
+        self._update_followers()
+
+    def _on_ready_read(self) -> None:
+        while self._socket.hasPendingDatagrams():
+            datagram = self._socket.receiveDatagram()
+            message = _decode(datagram)
+            if message is None or message.get("type") != "ping" or message.get("room") != self.room:
+                continue
+            # Reply at once: the follower takes our time as the midpoint of its round trip
+            reply = {"type": "pong", "room": self.room, "t0": message.get("t0"), "t1": self.clock.monotonic()}
+            self._socket.writeDatagram(_encode(reply), datagram.senderAddress(), datagram.senderPort())
+            self._followers[(datagram.senderAddress().toString(), datagram.senderPort())] = self.clock.monotonic()
+            self._update_followers()
+
+    def _update_followers(self) -> None:
+        """Forget followers that stopped pinging and report the count when it changes."""
+        cutoff = self.clock.monotonic() - FOLLOWER_TIMEOUT_S
+        self._followers = {key: seen for key, seen in self._followers.items() if seen >= cutoff}
+        if len(self._followers) != self._reported_followers:
+            self._reported_followers = len(self._followers)
+            self.followers_changed.emit(self._reported_followers)
+
+
+class ClassroomFollower(QObject):
+    """Receives a controller's session state, with deadlines on the local clock.
+
+    Args:
+        room: Name of the class to follow
+        clock: Time source the converted deadlines are given in
+        group: Multicast group address
+        port: Multicast port
+        parent: Qt parent object
+    """
+
+    # State dict from the controller; "deadline" is converted to the local clock
+    state_received = Signal(object)
+
+    def __init__(
+        self, room: str, clock: Clock, group: str = DEFAULT_GROUP, port: int = DEFAULT_PORT,
+        parent: Optional[QObject] = None
+    ) -> None:
+        super().__init__(parent)
+        self.room = room
+        self.clock = clock
+        self.group = QHostAddress(group)
+        self.port = port
+        self.offset = ClockOffset()
+        self._controller: Optional[tuple[QHostAddress, int]] = None
+        self._last_sequence = 0
+        self._pings_sent = 0
+
+        # The multicast port is shared by every follower on the machine, so
+        # pings go out from (and replies come back to) a socket of our own
+        self._group_socket = QUdpSocket(self)
+        self._group_socket.readyRead.connect(self._on_state_ready)
+        self._ping_socket = QUdpSocket(self)
+        self._ping_socket.readyRead.connect(self._on_pong_ready)
+        self._ping_timer = QTimer(self)
+        self._ping_timer.timeout.connect(self._ping)
+
+    def start(self) -> bool:
+        """Join the multicast group; False if the sockets can't be opened."""
+        any_ipv4 = QHostAddress(QHostAddress.SpecialAddress.AnyIPv4)
+        shared = QAbstractSocket.BindFlag.ShareAddress | QAbstractSocket.BindFlag.ReuseAddressHint
+        if not self._group_socket.bind(any_ipv4, self.port, shared):
+            return False
+        if not self._group_socket.joinMulticastGroup(self.group):
+            self._group_socket.close()
+            return False
+        return self._ping_socket.bind(any_ipv4, 0)
+
+    def stop(self) -> None:
+        self._ping_timer.stop()
+        self._group_socket.close()
+        self._ping_socket.close()
+
+    def to_local(self, remote_time: float) -> float:
+        """Local clock time of a time on the controller's clock."""
+        return remote_time - self.offset.offset
+
+    def _on_state_ready(self) -> None:
+        while self._group_socket.hasPendingDatagrams():
+            datagram = self._group_socket.receiveDatagram()
+            received = self.clock.monotonic()
+            message = _decode(datagram)
+            if message is None or message.get("type") != "state" or message.get("room") != self.room:
+                continue
+            try:
+                self._on_state(message, datagram.senderAddress(), int(message["port"]), received)
+            except (KeyError, TypeError, ValueError):
+                continue  # malformed state
+
+    def _on_state(self, state: dict, address: QHostAddress, port: int, received: float) -> None:
+        controller = (address, port)
+        if controller != self._controller:
+            # A new controller (or the same one restarted): start measuring its clock
+            self._controller = controller
+            self._last_sequence = 0
+            self.offset.clear()
+            self._pings_sent = 0
+            self._ping()
+        if int(state["seq"]) <= self._last_sequence:
+            return  # arrived out of order, superseded already
+        self._last_sequence = int(state["seq"])
+
+        if not self.offset.measured:
+            # Until a ping comes back, assume the datagram took no time
+            self.offset.provisional = float(state["sent"]) - received
+        if state.get("deadline") is not None:
+            state["deadline"] = self.to_local(float(state["deadline"]))
+        self.state_received.emit(state)
+
+    def _ping(self) -> None:
+        if self._controller is None:
+            return
+        address, port = self._controller
+        message = {"type": "ping", "room": self.room, "t0": self.clock.monotonic()}
+        self._ping_socket.writeDatagram(_encode(message), address, port)
+        self._pings_sent += 1
+        self._ping_timer.start(PING_BURST_MS if self._pings_sent < PING_BURST else PING_INTERVAL_MS)
+
+    def _on_pong_ready(self) -> None:
+        while self._ping_socket.hasPendingDatagrams():
+            datagram = self._ping_socket.receiveDatagram()
+            received = self.clock.monotonic()
+            message = _decode(datagram)
+            if message is None or message.get("type") != "pong" or message.get("room") != self.room:
+                continue
+            try:
+                sent, remote = float(message["t0"]), float(message["t1"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if sent <= received:
+                self.offset.add_sample(sent, remote, received)
@@ -0,0 +1,130 @@
+"""
+Time sources for the Figure Drawing Tool.
+
+The tool reads time and creates its timers through a Clock. The default
+Clock uses QTimer and time.monotonic; VirtualClock replaces both with a
+simulated clock that only moves when advanced, so long sessions can be
+replayed in seconds (see benchmarks/soak.py).
+"""
+
+from __future__ import annotations
+import itertools
+import time
+import weakref
+from typing import Optional
+
+from PySide6.QtCore import QObject, Qt, QTimer, Signal
+
+
+class Clock:
+    """Real time and Qt timers."""
+
+    def monotonic(self) -> float:
+        """Seconds on a clock that never goes backwards."""
+        return time.monotonic()
+
+    def create_timer(self, parent: Optional[QObject] = None) -> QTimer:
+        """Create a timer driven by this clock."""
+        return QTimer(parent)
+
+
+class VirtualTimer(QObject):
+    """The subset of the QTimer API the tool uses, driven by a VirtualClock."""
+
+    timeout = Signal()
+
+    def __init__(self, clock: VirtualClock, parent: Optional[QObject] = None) -> None:
+        super().__init__(parent)
+        self._clock = clock
+        self._interval = 0
+        self._single_shot = False
+        self._deadline: Optional[int] = None
+        self._sequence = 0
+
+    def setInterval(self, msec: int) -> None:
+        self._interval = msec
+
+    def interval(self) -> int:
+        return self._interval
+
+    def setSingleShot(self, single_shot: bool) -> None:
+        self._single_shot = single_shot
+
+    def isSingleShot(self) -> bool:
+        return self._single_shot
+
+    def setTimerType(self, timer_type: Qt.TimerType) -> None:
+        pass  # virtual timers fire exactly on time
+
+    def start(self, msec: Optional[int] = None) -> None:
+        if msec is not None:
+            self._interval = msec
+        self._deadline = self._clock.now_ms + self._interval
+        self._sequence = next(self._clock.sequence)
+
+    def stop(self) -> None:
+        self._deadline = None
+
+    def isActive(self) -> bool:
+        return self._deadline is not None
+
+    def remainingTime(self) -> int:
+        if self._deadline is None:
+            return -1
+        return max(0, self._deadline - self._clock.now_ms)
+
+    def deadline(self) -> Optional[int]:
+        """Virtual time in ms the timer fires at, None if stopped."""
+        return self._deadline
+
+    def _fire(self) -> None:
+        if self._single_shot:
+            self._deadline = None
+        else:
+            self._deadline += max(self._interval, 1)
+        self.timeout.emit()
+
+
+class VirtualClock(Clock):
+    """Simulated time that only moves when advanced.
+
+    Timers fire in deadline order, in the order they were started when
+    deadlines tie, as they would in real time with a responsive event loop.
+    """
+
+    def __init__(self) -> None:
+        self.now_ms = 0
+        self.sequence = itertools.count()
+        self._timers: weakref.WeakSet[VirtualTimer] = weakref.WeakSet()
+
+    def monotonic(self) -> float:
+        return self.now_ms / 1000
+
+    def create_timer(self, parent: Optional[QObject] = None) -> VirtualTimer:
+        timer = VirtualTimer(self, parent)
+        self._timers.add(timer)
+        return timer
+
+    def next_deadline(self) -> Optional[int]:
+        """Earliest deadline of any active timer, None if none is active."""
+        deadlines = [t.deadline() for t in self._timers if t.isActive()]
+        return min(deadlines) if deadlines else None
+
+    def advance(self, msec: int) -> int:
+        """Move time forward, firing every timer that comes due on the way.
+
+        Returns:
+            Number of timeouts fired
+        """
+        target = self.now_ms + msec
+        fired = 0
+        while True:
+            due = [t for t in self._timers if t.isActive() and t.deadline() <= target]
+            if not due:
+                break
+            timer = min(due, key=lambda t: (t.deadline(), t._sequence))
+            self.now_ms = timer.deadline()
+            timer._fire()
+            fired += 1
+        self.now_ms = target
+        return fired
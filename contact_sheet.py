@@ -0,0 +1,202 @@
+"""
+Contact sheet export for the Figure Drawing Tool.
+
+Renders the images of a session into a grid image or a multi-page PDF with
+timing annotations. Images are decoded and downscaled in parallel on a worker
+pool and streamed into the output one tile at a time, so full-size images are
+never held in memory together.
+"""
+
+from __future__ import annotations
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, Optional, Sequence
+
+from PySide6.QtCore import QMarginsF, QRect, QSize, Qt
+from PySide6.QtGui import (
+    QColor, QFont, QImage, QImageReader, QPageLayout, QPageSize, QPainter, QPdfWriter
+)
+
+from reference_pack import decode_member, is_pack_member
+
+DEFAULT_COLUMNS = 5
+DEFAULT_TILE_SIZE = 256
+LABEL_HEIGHT = 36
+SPACING = 8
+PDF_RESOLUTION = 150
+
+BACKGROUND_COLOR = QColor(27, 28, 30)
+TILE_COLOR = QColor(5, 5, 5)
+TEXT_COLOR = QColor(202, 207, 210)
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    """Format seconds as M:SS, or an empty string when unknown."""
+    if seconds is None:
+        return ""
+    seconds = int(round(seconds))
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+
+def load_thumbnail(path: str, size: int) -> QImage:
+    """Decode an image directly at thumbnail size.
+
+    Uses QImageReader's scaled decode so formats that support it (JPEG) never
+    materialize the full-resolution image. Safe to call from worker threads.
+    """
+    if is_pack_member(path):
+        return decode_member(path, QSize(size, size))
+    reader = QImageReader(path)
+    reader.setAutoTransform(True)
+    source_size = reader.size()
+    if source_size.isValid():
+        reader.setScaledSize(source_size.scaled(size, size, Qt.AspectRatioMode.KeepAspectRatio))
+    image = reader.read()
+    if not image.isNull() and max(image.width(), image.height()) > size:
+        # Reader couldn't size the image up front; downscale after decoding
+        image = image.scaled(
+            size, size, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation
+        )
+    return image
+
+
+def iter_thumbnails(paths: Sequence[str], size: int, workers: Optional[int] = None) -> Iterator[QImage]:
+    """Yield thumbnails in order, decoding ahead on a worker pool.
+
+    At most ``2 * workers`` decoded thumbnails are in flight at a time.
+    """
+    workers = workers or min(8, os.cpu_count() or 1)
+    window = workers * 2
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="contact-sheet") as executor:
+        in_flight: deque = deque()
+        path_iter = iter(paths)
+        for path in path_iter:
+            in_flight.append(executor.submit(load_thumbnail, path, size))
+            if len(in_flight) >= window:
+                break
+        while in_flight:
+            yield in_flight.popleft().result()
+            next_path = next(path_iter, None)
+            if next_path is not None:
+                in_flight.append(executor.submit(load_thumbnail, next_path, size))
+
+
+def _draw_tile(
+    painter: QPainter, rect: QRect, label_height: int,
+    image: QImage, number: int, path: str, seconds: Optional[float]
+) -> None:
+    """Draw one thumbnail with its annotation into rect."""
+    image_rect = QRect(rect.x(), rect.y(), rect.width(), rect.height() - label_height)
+    painter.fillRect(image_rect, TILE_COLOR)
+    if not image.isNull():
+        scaled = image.size().scaled(image_rect.size(), Qt.AspectRatioMode.KeepAspectRatio)
+        x = image_rect.x() + (image_rect.width() - scaled.width()) // 2
+        y = image_rect.y() + (image_rect.height() - scaled.height()) // 2
+        painter.drawImage(QRect(x, y, scaled.width(), scaled.height()), image)
+
+    label_rect = QRect(rect.x(), image_rect.bottom() + 1, rect.width(), label_height)
+    name = painter.fontMetrics().elidedText(
+        os.path.basename(path), Qt.TextElideMode.ElideMiddle, rect.width()
+    )
+    duration = format_duration(seconds)
+    text = f"#{number}  {duration}\n{name}" if duration else f"#{number}\n{name}"
+    painter.setPen(TEXT_COLOR)
+    painter.drawText(label_rect, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop, text)
+
+
+def _export_image(
+    entries: Sequence[tuple[str, Optional[float]]], output_path: str,
+    columns: int, tile_size: int, workers: Optional[int]
+) -> None:
+    """Render entries into a single grid image."""
+    rows = (len(entries) + columns - 1) // columns
+    cell_w = tile_size + SPACING
+    cell_h = tile_size + LABEL_HEIGHT + SPACING
+    sheet = QImage(QSize(columns * cell_w + SPACING, rows * cell_h + SPACING), QImage.Format.Format_RGB32)
+    sheet.fill(BACKGROUND_COLOR)
+
+    painter = QPainter(sheet)
+    painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+    painter.setFont(QFont(painter.font().family(), 9))
+    thumbs = iter_thumbnails([path for path, _ in entries], tile_size, workers)
+    for i, (thumb, (path, seconds)) in enumerate(zip(thumbs, entries)):
+        row, col = divmod(i, columns)
+        rect = QRect(SPACING + col * cell_w, SPACING + row * cell_h, tile_size, tile_size + LABEL_HEIGHT)
+        _draw_tile(painter, rect, LABEL_HEIGHT, thumb, i + 1, path, seconds)
+    painter.end()
+
+    if not sheet.save(output_path):
+        raise OSError(f"Could not write contact sheet to {output_path}")
+
+
+def _export_pdf(
+    entries: Sequence[tuple[str, Optional[float]]], output_path: str,
+    columns: int, tile_size: int, workers: Optional[int]
+) -> None:
+    """Render entries onto as many A4 pages as needed."""
+    writer = QPdfWriter(output_path)
+    writer.setResolution(PDF_RESOLUTION)
+    writer.setPageSize(QPageSize(QPageSize.PageSizeId.A4))
+    writer.setPageMargins(QMarginsF(10, 10, 10, 10), QPageLayout.Unit.Millimeter)
+
+    painter = QPainter()
+    if not painter.begin(writer):
+        raise OSError(f"Could not write contact sheet to {output_path}")
+    painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+    painter.setFont(QFont(painter.font().family(), 7))
+
+    page = painter.viewport()
+    cell_w = page.width() // columns
+    label_height = painter.fontMetrics().height() * 2 + SPACING
+    cell_h = cell_w - SPACING + label_height
+    rows_per_page = max(1, page.height() // cell_h)
+    per_page = rows_per_page * columns
+
+    try:
+        # Decode at the on-page tile size (capped) rather than full resolution
+        decode_size = min(tile_size * 2, cell_w)
+        thumbs = iter_thumbnails([path for path, _ in entries], decode_size, workers)
+        for i, (thumb, (path, seconds)) in enumerate(zip(thumbs, entries)):
+            if i and i % per_page == 0:
+                writer.newPage()
+            row, col = divmod(i % per_page, columns)
+            rect = QRect(col * cell_w, row * cell_h, cell_w - SPACING, cell_h - SPACING)
+            _draw_tile(painter, rect, label_height, thumb, i + 1, path, seconds)
+    finally:
+        painter.end()
+
+
+def export_contact_sheet(
+    entries: Sequence[tuple[str, Optional[float]]],
+    output_path: str,
+    columns: int = DEFAULT_COLUMNS,
+    tile_size: int = DEFAULT_TILE_SIZE,
+    workers: Optional[int] = None,
+) -> str:
+    """Export a contact sheet of the given images.
+
+    Args:
+        entries: (image path, seconds shown) pairs in session order
+        output_path: Destination file; ".pdf" writes a multi-page PDF,
+            any other suffix writes a single grid image
+        columns: Number of tiles per row
+        tile_size: Thumbnail edge length in pixels
+        workers: Decode worker count (defaults to CPU count, capped at 8)
+
+    Returns:
+        The output path for convenience
+
+    Raises:
+        ValueError: If there are no entries, or columns or tile_size is below 1
+        OSError: If the output file can't be written
+    """
+    if not entries:
+        raise ValueError("No images to export")
+    if columns < 1 or tile_size < 1:
+        raise ValueError(f"Columns and tile size must be at least 1, not {columns} and {tile_size}")
+    if output_path.lower().endswith(".pdf"):
+        _export_pdf(entries, output_path, columns, tile_size, workers)
+    else:
+        _export_image(entries, output_path, columns, tile_size, workers)
+    return output_path
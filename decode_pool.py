@@ -0,0 +1,311 @@
+"""
+Background decoding for the Figure Drawing Tool.
+
+DecodePool decodes upcoming images off the GUI thread, either on a thread
+pool or on a process pool. Process workers write pixels into
+multiprocessing.shared_memory buffers that the GUI side wraps as QImages
+without copying. Each decode also computes the image's auto-levels table
+(see auto_levels.py), so it's ready whenever the view is switched on.
+
+A worker keeps its handle on a buffer open until the GUI process has
+attached: on Windows a buffer is freed when its last handle closes, so
+closing it on return would free it before the GUI could map it. The GUI
+sets the byte after the pixels once it has attached, and a thread in the
+worker closes the handles whose byte is set.
+"""
+
+from __future__ import annotations
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import weakref
+from concurrent.futures import BrokenExecutor, CancelledError, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+from typing import Optional
+
+import numpy as np
+from PySide6.QtCore import QObject, QSize, Signal
+from PySide6.QtGui import QImage
+
+from auto_levels import levels_lut
+from decoders import DecoderRegistry
+from resource_governor import image_bytes
+
+MODE_THREAD = "thread"
+MODE_PROCESS = "process"
+MODES = (MODE_THREAD, MODE_PROCESS)
+
+# Weight of the newest sample in the moving average of decode times
+DECODE_TIME_SMOOTHING = 0.3
+# How often a worker checks whether the GUI has attached to its buffers, and
+# how long it keeps a buffer the GUI never attaches to (a cancelled pool)
+ATTACH_POLL_S = 0.02
+ATTACH_TIMEOUT_S = 60.0
+
+_live_shared_lock = threading.Lock()
+_live_shared_buffers = 0
+
+
+def live_shared_buffers() -> int:
+    """Number of shared-memory pixel buffers currently mapped in this process."""
+    return _live_shared_buffers
+
+
+def to_display_format(image: QImage) -> QImage:
+    """Convert to a format QPainter draws without per-paint conversion."""
+    if image.format() in (
+        QImage.Format.Format_RGB32, QImage.Format.Format_ARGB32_Premultiplied, QImage.Format.Format_Grayscale8
+    ):
+        return image
+    if image.hasAlphaChannel():
+        return image.convertToFormat(QImage.Format.Format_ARGB32_Premultiplied)
+    return image.convertToFormat(QImage.Format.Format_RGB32)
+
+
+def _release_shared_memory(box: list, shm: shared_memory.SharedMemory) -> None:
+    """Drop the QImage wrapping a shared buffer, then unmap and unlink the buffer."""
+    global _live_shared_buffers
+    box.clear()  # the QImage must go before the memory it points into
+    shm.close()
+    try:
+        shm.unlink()
+    except FileNotFoundError:
+        pass
+    with _live_shared_lock:
+        _live_shared_buffers -= 1
+
+
+class DecodedImage:
+    """A decoded image plus whatever keeps its pixels alive.
+
+    Keep a reference to the DecodedImage rather than only its ``image``: for
+    shared-memory images the pixels are released as soon as the DecodedImage
+    is garbage collected.
+
+    Args:
+        image: Decoded pixels
+        shm: Shared buffer holding the pixels, released with the DecodedImage
+        levels: Auto-levels table computed with the decode, if it was
+    """
+
+    def __init__(
+        self, image: QImage, shm: Optional[shared_memory.SharedMemory] = None, levels: Optional[np.ndarray] = None
+    ) -> None:
+        self._box = [image]
+        self._levels = levels
+        self.shared = shm is not None
+        if shm is not None:
+            global _live_shared_buffers
+            with _live_shared_lock:
+                _live_shared_buffers += 1
+            weakref.finalize(self, _release_shared_memory, self._box, shm)
+
+    @property
+    def image(self) -> QImage:
+        return self._box[0]
+
+    @property
+    def nbytes(self) -> int:
+        return image_bytes(self.image)
+
+    @property
+    def levels(self) -> np.ndarray:
+        """Auto-levels lookup table of the image, computed on first use if the decode didn't."""
+        if self._levels is None:
+            self._levels = levels_lut(self.image)
+        return self._levels
+
+
+# Process worker state and entry points (module level so they can be pickled)
+_worker_registry: Optional[DecoderRegistry] = None
+# Buffers handed to the GUI process: name -> (buffer, offset of its attached byte, deadline)
+_worker_buffers: dict[str, tuple[shared_memory.SharedMemory, int, float]] = {}
+_worker_buffers_changed = threading.Condition()
+
+
+def _init_worker(selection_json: str) -> None:
+    global _worker_registry
+    _worker_registry = DecoderRegistry.with_available_backends()
+    _worker_registry.load_selection_json(selection_json)
+    threading.Thread(target=_close_attached_buffers, name="shared-buffers", daemon=True).start()
+
+
+def _close_attached_buffers() -> None:
+    """Close the worker's handles on buffers the GUI has attached to (runs in the worker)."""
+    while True:
+        with _worker_buffers_changed:
+            while not _worker_buffers:
+                _worker_buffers_changed.wait()
+            now = time.monotonic()
+            for name, (shm, attached_offset, deadline) in list(_worker_buffers.items()):
+                attached = shm.buf[attached_offset] != 0
+                if attached or now > deadline:
+                    del _worker_buffers[name]
+                    shm.close()
+                    if not attached:
+                        try:
+                            shm.unlink()  # nobody else will
+                        except FileNotFoundError:
+                            pass
+        time.sleep(ATTACH_POLL_S)
+
+
+def _decode_to_shared_memory(
+    path: str, width: int, height: int
+) -> tuple[float, Optional[tuple[str, int, int, int, int, bytes]]]:
+    """Decode in a worker process and copy the pixels into a new shared buffer.
+
+    Returns:
+        (decode seconds, (buffer name, width, height, bytes per line, QImage
+        format, auto-levels table) or None)
+    """
+    start = time.perf_counter()
+    target = QSize(width, height) if width and height else None
+    image = _worker_registry.decode(path, target)
+    if image.isNull():
+        return time.perf_counter() - start, None
+    image = to_display_format(image)
+
+    size = image.sizeInBytes()
+    shm = shared_memory.SharedMemory(create=True, size=size + 1)  # + the attached byte
+    shm.buf[:size] = image.constBits()
+    shm.buf[size] = 0
+    name = shm.name
+    # Kept open until the GUI process has attached; it owns the buffer from then on
+    with _worker_buffers_changed:
+        _worker_buffers[name] = (shm, size, time.monotonic() + ATTACH_TIMEOUT_S)
+        _worker_buffers_changed.notify()
+    levels = levels_lut(image).tobytes()
+    elapsed = time.perf_counter() - start
+    return elapsed, (name, image.width(), image.height(), image.bytesPerLine(), image.format().value, levels)
+
+
+def _attach_shared_image(result: Optional[tuple[str, int, int, int, int, bytes]]) -> Optional[DecodedImage]:
+    """Wrap a worker's shared buffer as a QImage without copying the pixels."""
+    if result is None:
+        return None
+    name, width, height, bytes_per_line, fmt, levels = result
+    shm = shared_memory.SharedMemory(name=name)
+    shm.buf[bytes_per_line * height] = 1  # attached: the worker may close its handle
+    image = QImage(shm.buf, width, height, bytes_per_line, QImage.Format(fmt))
+    return DecodedImage(image, shm, np.frombuffer(levels, dtype=np.uint8))
+
+
+class DecodePool(QObject):
+    """Decodes images in the background and delivers them through ``decoded``.
+
+    Args:
+        registry: Decoder registry to decode with
+        mode: MODE_THREAD (default) or MODE_PROCESS
+        workers: Worker count (defaults to CPU count, capped at 4)
+        parent: Qt parent object
+    """
+
+    decoded = Signal(str, object)  # path, DecodedImage or None on failure
+
+    def __init__(
+        self,
+        registry: DecoderRegistry,
+        mode: str = MODE_THREAD,
+        workers: Optional[int] = None,
+        parent: Optional[QObject] = None,
+    ) -> None:
+        super().__init__(parent)
+        self.registry = registry
+        self.mode = mode if mode in MODES else MODE_THREAD
+        workers = workers or min(4, os.cpu_count() or 1)
+        if self.mode == MODE_PROCESS:
+            # spawn, never fork: forking a process that runs Qt is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(registry.selection_json(),),
+            )
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="decode")
+        self._pending: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._decode_seconds = 0.0
+
+    @property
+    def decode_seconds(self) -> float:
+        """Moving average of recent decode times, 0 before the first decode."""
+        return self._decode_seconds
+
+    def _record_decode_time(self, seconds: float) -> None:
+        with self._lock:
+            if self._decode_seconds:
+                seconds = DECODE_TIME_SMOOTHING * seconds + (1 - DECODE_TIME_SMOOTHING) * self._decode_seconds
+            self._decode_seconds = seconds
+
+    def is_pending(self, path: str) -> bool:
+        """Whether a decode for path has been submitted and not delivered yet."""
+        with self._lock:
+            return path in self._pending
+
+    def submit(self, path: str, target_size: Optional[QSize] = None) -> Future:
+        """Start decoding path (once) and return a future of its DecodedImage."""
+        with self._lock:
+            future = self._pending.get(path)
+            if future is not None:
+                return future
+            future = Future()
+            self._pending[path] = future
+
+        if self.mode == MODE_PROCESS:
+            width, height = (target_size.width(), target_size.height()) if target_size else (0, 0)
+            inner = self._executor.submit(_decode_to_shared_memory, path, width, height)
+            inner.add_done_callback(lambda f: self._finish(path, future, f, _attach_shared_image))
+        else:
+            inner = self._executor.submit(self._decode_in_thread, path, target_size)
+            inner.add_done_callback(lambda f: self._finish(path, future, f, None))
+        return future
+
+    def _decode_in_thread(self, path: str, target_size: Optional[QSize]) -> tuple[float, Optional[DecodedImage]]:
+        start = time.perf_counter()
+        image = self.registry.decode(path, target_size)
+        decoded = None
+        if not image.isNull():
+            image = to_display_format(image)
+            decoded = DecodedImage(image, levels=levels_lut(image))
+        return time.perf_counter() - start, decoded
+
+    def _finish(self, path: str, future: Future, inner: Future, convert) -> None:
+        """Resolve the outer future and notify listeners (runs off the GUI thread)."""
+        try:
+            seconds, result = inner.result()
+            self._record_decode_time(seconds)
+            if convert is not None:
+                result = convert(result)
+        except (BrokenExecutor, CancelledError):
+            result = None  # pool shut down; the image is decoded when shown
+        except Exception as e:  # no prefetch; the image is decoded when shown
+            print(f"Background decode of {path} failed: {e!r}", file=sys.stderr)
+            result = None
+        with self._lock:
+            if self._pending.get(path) is future:
+                del self._pending[path]
+        future.set_result(result)
+        try:
+            self.decoded.emit(path, result)  # queued to the receiver's thread
+        except RuntimeError:
+            pass  # pool already deleted during shutdown
+
+    def wait(self, path: str, timeout: Optional[float] = None) -> Optional[DecodedImage]:
+        """Block until a pending decode of path finishes; None if none is pending."""
+        with self._lock:
+            future = self._pending.get(path)
+        return future.result(timeout) if future is not None else None
+
+    def cancel_pending(self) -> None:
+        """Forget pending decodes; ones already running still finish."""
+        with self._lock:
+            self._pending.clear()
+
+    def shutdown(self) -> None:
+        """Stop the workers without waiting for running decodes."""
+        self.cancel_pending()
+        self._executor.shutdown(wait=False, cancel_futures=True)
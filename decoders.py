@@ -0,0 +1,375 @@
+"""
+Pluggable image decoder backends for the Figure Drawing Tool.
+
+Each backend decodes a file into a QImage, optionally reduced to fit a target
+size. A DecoderRegistry picks a backend per file format and reduction factor
+from micro-benchmark results, falling back to Qt's image plugins.
+
+:to use (offline benchmark):
+    python decoders.py /path/to/images [--target 1920x1080] [--save]
+"""
+
+from __future__ import annotations
+import abc
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Iterable, Optional
+
+from PySide6.QtCore import QSize, Qt
+from PySide6.QtGui import QImage, QImageIOHandler, QImageReader
+
+from reference_pack import decode_member, is_pack_member
+
+# optional
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+    ImageOps = None
+
+MAX_REDUCTION = 8
+
+
+def scale_bucket(source_size: QSize, target_size: Optional[QSize]) -> int:
+    """Power-of-two reduction factor (1 to MAX_REDUCTION) a decode to target allows."""
+    if target_size is None or not source_size.isValid() or target_size.isEmpty():
+        return 1
+    reduction = max(
+        source_size.width() / target_size.width(),
+        source_size.height() / target_size.height()
+    )
+    factor = 1
+    while factor < MAX_REDUCTION and reduction >= factor * 2:
+        factor *= 2
+    return factor
+
+
+def parse_size(text: str) -> QSize:
+    """A size given as "WIDTHxHEIGHT", e.g. "1920x1080"."""
+    width, height = text.lower().split("x")
+    return QSize(int(width), int(height))
+
+
+def file_extension(path: str) -> str:
+    """Lower-case file extension without the dot."""
+    return os.path.splitext(path)[1].lower().lstrip(".")
+
+
+class DecoderBackend(abc.ABC):
+    """Base class for decoder backends. Implementations must be thread-safe."""
+
+    name = "base"
+
+    def available(self) -> bool:
+        """Whether the backend's dependencies are installed."""
+        return True
+
+    @abc.abstractmethod
+    def extensions(self) -> set[str]:
+        """File extensions this backend can read."""
+
+    @abc.abstractmethod
+    def decode(self, path: str, target_size: Optional[QSize] = None) -> QImage:
+        """Decode path, reduced to fit target_size if given (never enlarged).
+
+        Returns a null QImage if the file can't be decoded.
+        """
+
+    @abc.abstractmethod
+    def readable(self, path: str) -> bool:
+        """Whether path has an image header this backend can read, without decoding it."""
+
+
+class QtDecoder(DecoderBackend):
+    """Decodes through Qt's image plugins (QImageReader)."""
+
+    name = "qt"
+
+    def extensions(self) -> set[str]:
+        return {bytes(fmt).decode().lower() for fmt in QImageReader.supportedImageFormats()}
+
+    def decode(self, path: str, target_size: Optional[QSize] = None) -> QImage:
+        reader = QImageReader(path)
+        reader.setAutoTransform(True)
+        if target_size is not None:
+            source_size = reader.size()
+            if reader.transformation() & QImageIOHandler.Transformation.TransformationRotate90:
+                source_size = source_size.transposed()
+            if source_size.isValid() and (
+                source_size.width() > target_size.width() or source_size.height() > target_size.height()
+            ):
+                scaled = source_size.scaled(target_size, Qt.AspectRatioMode.KeepAspectRatio)
+                if reader.transformation() & QImageIOHandler.Transformation.TransformationRotate90:
+                    scaled = scaled.transposed()
+                reader.setScaledSize(scaled)
+        return reader.read()
+
+    def readable(self, path: str) -> bool:
+        reader = QImageReader(path)
+        return reader.canRead() and reader.size().isValid()
+
+
+class PillowDecoder(DecoderBackend):
+    """Decodes through Pillow, using JPEG draft mode for DCT-domain reduction."""
+
+    name = "pillow"
+
+    # EXIF orientations that swap width and height
+    _TRANSPOSED_ORIENTATIONS = {5, 6, 7, 8}
+
+    # Registered formats that only identify files or need external tools
+    _STUB_FORMATS = {"BUFR", "GRIB", "HDF5", "MPEG", "EPS", "WMF"}
+
+    def available(self) -> bool:
+        return Image is not None
+
+    def extensions(self) -> set[str]:
+        if Image is None:
+            return set()
+        Image.init()
+        return {
+            ext.lower().lstrip(".") for ext, fmt in Image.registered_extensions().items()
+            if fmt in Image.OPEN and fmt not in self._STUB_FORMATS
+        }
+
+    def decode(self, path: str, target_size: Optional[QSize] = None) -> QImage:
+        try:
+            with Image.open(path) as img:
+                if target_size is not None:
+                    box = (target_size.width(), target_size.height())
+                    if img.getexif().get(0x0112, 1) in self._TRANSPOSED_ORIENTATIONS:
+                        box = box[::-1]
+                    scale = min(box[0] / img.width, box[1] / img.height)
+                    if scale < 1:
+                        # JPEG draft mode decodes in the DCT domain at 1/2..1/8 scale
+                        img.draft(img.mode, (int(img.width * scale), int(img.height * scale)))
+                        img.thumbnail(box, Image.Resampling.BILINEAR, reducing_gap=None)
+                img = ImageOps.exif_transpose(img)
+                return self._to_qimage(img)
+        except (OSError, ValueError, Image.DecompressionBombError):
+            return QImage()
+
+    def readable(self, path: str) -> bool:
+        try:
+            with Image.open(path) as img:  # reads the header only
+                return img.width > 0 and img.height > 0
+        except (OSError, ValueError, Image.DecompressionBombError):
+            return False
+
+    @staticmethod
+    def _to_qimage(img: "Image.Image") -> QImage:
+        """Convert a Pillow image to a QImage that owns its pixels."""
+        if img.mode == "L":
+            fmt, channels = QImage.Format.Format_Grayscale8, 1
+        elif img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info:
+            img, fmt, channels = img.convert("RGBA"), QImage.Format.Format_RGBA8888, 4
+        else:
+            img, fmt, channels = img.convert("RGB"), QImage.Format.Format_RGB888, 3
+        data = img.tobytes()
+        image = QImage(data, img.width, img.height, img.width * channels, fmt)
+        return image.copy()  # detach from the Python-owned buffer
+
+
+BACKEND_CLASSES: list[type[DecoderBackend]] = [QtDecoder, PillowDecoder]
+
+
+class DecoderRegistry:
+    """Chooses a decoder backend per (format, reduction factor).
+
+    The selection maps keys like "jpg:4" to backend names. Missing entries fall
+    back to the first registered backend that can read the format. It is
+    replaced, never changed in place, so the GUI thread can read it while
+    calibrate runs on a worker thread.
+    """
+
+    def __init__(self, backends: Iterable[DecoderBackend]) -> None:
+        self.backends: dict[str, DecoderBackend] = {b.name: b for b in backends if b.available()}
+        self._extensions = {name: b.extensions() for name, b in self.backends.items()}
+        self.selection: dict[str, str] = {}
+        self._selection_lock = threading.Lock()  # serializes updates, not reads
+
+    @classmethod
+    def with_available_backends(cls) -> DecoderRegistry:
+        """Create a registry with every backend whose dependencies are installed."""
+        return cls(backend_class() for backend_class in BACKEND_CLASSES)
+
+    def extensions(self) -> set[str]:
+        """Every file extension some installed backend can read."""
+        return set().union(*self._extensions.values())
+
+    def backends_for(self, ext: str) -> list[DecoderBackend]:
+        """Backends that can read the given extension, in registration order."""
+        return [self.backends[name] for name, exts in self._extensions.items() if ext in exts]
+
+    def backend_for(self, ext: str, bucket: int) -> Optional[DecoderBackend]:
+        """Backend selected for a format and reduction factor."""
+        selected = self.backends.get(self.selection.get(f"{ext}:{bucket}", ""))
+        if selected is not None and ext in self._extensions[selected.name]:
+            return selected
+        candidates = self.backends_for(ext)
+        return candidates[0] if candidates else None
+
+    def decode(self, path: str, target_size: Optional[QSize] = None) -> QImage:
+        """Decode with the selected backend, reduced to fit target_size if given."""
+        if is_pack_member(path):
+            return decode_member(path, target_size)  # already encoded for the screen
+        ext = file_extension(path)
+        bucket = scale_bucket(QImageReader(path).size(), target_size) if target_size is not None else 1
+        backend = self.backend_for(ext, bucket)
+        if backend is None:
+            return QImage()
+        image = backend.decode(path, target_size)
+        if image.isNull() and backend.name != QtDecoder.name and QtDecoder.name in self.backends:
+            image = self.backends[QtDecoder.name].decode(path, target_size)
+        return image
+
+    def readable(self, path: str) -> bool:
+        """Whether the backend selected for a full-size decode can read the file's header."""
+        if is_pack_member(path):
+            return True  # checked when the pack was built
+        backend = self.backend_for(file_extension(path), 1)
+        return backend is not None and backend.readable(path)
+
+    def benchmark(
+        self, paths: Iterable[str], target_size: Optional[QSize] = None, repeats: int = 3
+    ) -> dict[str, dict[str, float]]:
+        """Time every capable backend on each file.
+
+        Returns:
+            {"ext:bucket": {backend name: best decode time in seconds}}, with
+            times averaged over the files in each group
+        """
+        totals: dict[str, dict[str, list[float]]] = defaultdict(lambda: defaultdict(list))
+        for path in paths:
+            ext = file_extension(path)
+            key = self._selection_key(path, target_size)
+            for backend in self.backends_for(ext):
+                best = float("inf")
+                for _ in range(repeats):
+                    start = time.perf_counter()
+                    image = backend.decode(path, target_size)
+                    elapsed = time.perf_counter() - start
+                    if image.isNull():
+                        break
+                    best = min(best, elapsed)
+                totals[key][backend.name].append(best)
+        return {
+            key: {name: sum(times) / len(times) for name, times in by_backend.items()}
+            for key, by_backend in totals.items()
+        }
+
+    def calibrate(
+        self, paths: Iterable[str], target_size: Optional[QSize] = None, repeats: int = 2
+    ) -> dict[str, dict[str, float]]:
+        """Benchmark paths and select the fastest backend for each group."""
+        results = self.benchmark(paths, target_size, repeats)
+        fastest = {}
+        for key, times in results.items():
+            finite = {name: t for name, t in times.items() if t != float("inf")}
+            if finite:
+                fastest[key] = min(finite, key=finite.get)
+        self._update_selection(fastest)
+        return results
+
+    def _update_selection(self, changes: dict[str, str]) -> None:
+        with self._selection_lock:
+            self.selection = {**self.selection, **changes}
+
+    @staticmethod
+    def _selection_key(path: str, target_size: Optional[QSize]) -> str:
+        """The "ext:bucket" a decode of path to target_size is selected by."""
+        return f"{file_extension(path)}:{scale_bucket(QImageReader(path).size(), target_size)}"
+
+    def needs_calibration(
+        self, paths: Iterable[str], target_size: Optional[QSize] = None, per_key: int = 2
+    ) -> list[str]:
+        """Files to benchmark for the format and reduction buckets they decode at that have no selection yet.
+
+        Reads the header of each file with more than one capable backend, so
+        pass a sample of a large library, and call it off the GUI thread.
+
+        Args:
+            paths: Candidate files
+            target_size: Size they are decoded to, as for calibrate
+            per_key: Most files returned per "ext:bucket"
+        """
+        selection = self.selection
+        contested = {}
+        samples: dict[str, list[str]] = defaultdict(list)
+        for path in paths:
+            ext = file_extension(path)
+            if ext not in contested:
+                contested[ext] = len(self.backends_for(ext)) > 1
+            if not contested[ext] or is_pack_member(path):
+                continue
+            key = self._selection_key(path, target_size)
+            if key not in selection and len(samples[key]) < per_key:
+                samples[key].append(path)
+        return [path for group in samples.values() for path in group]
+
+    def calibrate_missing(self, paths: Iterable[str], target_size: Optional[QSize] = None, per_key: int = 2) -> None:
+        """Calibrate the buckets needs_calibration finds among paths; meant for a background thread."""
+        samples = self.needs_calibration(paths, target_size, per_key)
+        if samples:
+            self.calibrate(samples, target_size)
+
+    def selection_json(self) -> str:
+        """Serialize the selection for QSettings."""
+        return json.dumps(self.selection, sort_keys=True)
+
+    def load_selection_json(self, data: str) -> None:
+        """Restore a selection saved with selection_json, ignoring bad data."""
+        try:
+            selection = json.loads(data) if data else {}
+        except ValueError:
+            return
+        if isinstance(selection, dict):
+            self._update_selection({str(k): str(v) for k, v in selection.items()})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark decoder backends on a folder of images")
+    parser.add_argument("directory")
+    parser.add_argument("--target", type=parse_size, default=QSize(1920, 1080),
+                        help="target canvas size, e.g. 1920x1080 (default)")
+    parser.add_argument("--full", action="store_true", help="benchmark full-size decodes instead")
+    parser.add_argument("--limit", type=int, default=5, help="files sampled per format")
+    parser.add_argument("--save", action="store_true", help="store the fastest backends in the app settings")
+    args = parser.parse_args()
+
+    from PySide6.QtCore import QSettings
+    from PySide6.QtGui import QGuiApplication
+    from figure_drawing_tool import FigureDrawingTool
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QGuiApplication(sys.argv[:1])
+
+    registry = DecoderRegistry.with_available_backends()
+    per_format: dict[str, list[str]] = defaultdict(list)
+    for file_path in sorted(Path(args.directory).rglob("*")):
+        ext = file_extension(str(file_path))
+        if file_path.is_file() and ext in registry.extensions() and len(per_format[ext]) < args.limit:
+            per_format[ext].append(str(file_path))
+
+    target = None if args.full else args.target
+    results = registry.calibrate([p for paths in per_format.values() for p in paths], target)
+    print(f"backends: {', '.join(registry.backends)}   target: {'full size' if target is None else f'{target.width()}x{target.height()}'}")
+    for key in sorted(results):
+        times = "   ".join(f"{name} {t * 1000:8.2f} ms" for name, t in sorted(results[key].items()))
+        print(f"{key:<10} {times}   -> {registry.selection.get(key, '-')}")
+
+    if args.save:
+        settings = QSettings(FigureDrawingTool.SETTINGS_ORG, FigureDrawingTool.SETTINGS_APP)
+        stored = DecoderRegistry([])
+        stored.load_selection_json(settings.value("decoder_selection", ""))
+        stored.selection.update(registry.selection)
+        settings.setValue("decoder_selection", stored.selection_json())
+
+
+if __name__ == "__main__":
+    main()
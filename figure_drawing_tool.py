@@ -11,30 +11,64 @@
 
 :to use:
     python figure_drawing_tool.py
+    python figure_drawing_tool.py --tray  # closing keeps it in the system tray, until --no-tray
+    python figure_drawing_tool.py --plan --dir /path/to/images --schedule Class --seed 7
+    python figure_drawing_tool.py --profile-library --dir /path/to/images --subfolders
 """
 
 # built-in
 from __future__ import annotations
 import os
 import sys
+import json
+import hashlib
+import math
 import random
+import argparse
 import tempfile
-from pathlib import Path
-from typing import Optional
+import threading
+import multiprocessing
+from concurrent.futures import Future
+from typing import Callable, Optional
 
 # third-party
+import numpy as np
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
     QPushButton, QSpinBox, QLCDNumber, QSizePolicy,
-    QFileDialog, QMessageBox, QApplication, QFrame, QCheckBox, QComboBox
+    QFileDialog, QMessageBox, QApplication, QFrame, QCheckBox, QComboBox, QMenu, QSystemTrayIcon
+)
+from PySide6.QtCore import (
+    Qt, QTimer, QFile, QSize, QSettings, QEvent, QStandardPaths, QVariantAnimation, QEasingCurve, Signal
 )
-from PySide6.QtCore import Qt, QTimer, QFile, QSize, QSettings
 from PySide6.QtGui import (
-    QPixmap, QPainter, QImageReader, QPaintEvent, QResizeEvent,
-    QKeySequence, QShortcut, QTransform, QMouseEvent, QCloseEvent
+    QIcon, QImage, QPainter, QPaintEvent, QResizeEvent, QHideEvent, QShowEvent,
+    QKeySequence, QShortcut, QMouseEvent, QCloseEvent, QGuiApplication, QScreen, QActionGroup
 )
 
 from icons import create_icon, create_pixmap, save_icon
+from http_source import HttpImageSource, is_url
+from contact_sheet import DEFAULT_COLUMNS, DEFAULT_TILE_SIZE, export_contact_sheet, format_duration
+from resource_governor import LruCache, ResourceGovernor, image_bytes
+from decoders import DecoderRegistry, parse_size
+from decode_pool import MODE_THREAD, DecodedImage, DecodePool
+from value_filters import FILTERS, FilterEngine
+from auto_levels import apply_levels
+from transitions import (
+    DEFAULT_TRANSITION_MS, TRANSITION_CUT, TRANSITIONS, FrameJob, FrameScaler, frame_origin, paint_transition,
+    process_image, scale_frame
+)
+from filmstrip import Filmstrip, FilmstripModel
+from library_index import LibraryIndex, full_path
+from library_browser import LibraryBrowser
+from single_instance import InstanceServer, send_to_running_instance
+from classroom import DEFAULT_PORT, ClassroomController, ClassroomFollower, library_fingerprint, session_order
+from schedule import DEFAULT_SCHEDULES, MAX_PREFETCH_DEPTH, Schedule, format_seconds, load_schedules, prefetch_depth
+from seen_history import SeenHistory, image_ids
+from tree_sampler import DirectoryCounts, TreeSampler
+from reference_pack import PACK_EXTENSION, PackError, is_pack, list_images
+from library_profile import profile_library
+from clock import Clock
 
 
 def resource_path(relative_path: str) -> str:
@@ -44,57 +78,229 @@ def resource_path(relative_path: str) -> str:
     return os.path.join(os.path.abspath("."), relative_path)
 
 
+def config_path(file_name: str) -> str:
+    """Path of a file in the user's config folder for the tool."""
+    config_dir = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.GenericConfigLocation)
+    return os.path.join(config_dir, FigureDrawingTool.SETTINGS_APP, file_name)
+
+
+def available_schedules() -> list[Schedule]:
+    """The built-in schedules and those in the user's schedule file.
+
+    Raises:
+        OSError: If the schedule file can't be read
+        ValueError: If the schedule file is malformed
+    """
+    schedules = list(DEFAULT_SCHEDULES)
+    path = config_path(FigureDrawingTool.SCHEDULE_FILE_NAME)
+    if os.path.isfile(path):
+        schedules.extend(load_schedules(path))
+    return schedules
+
+
+def resolve_schedule(text: str) -> Schedule:
+    """A schedule by name, or one parsed from a spec like "10x30s, 5x1m".
+
+    Raises:
+        ValueError: If the text names no schedule and isn't a valid spec
+    """
+    try:
+        schedules = available_schedules()
+    except (OSError, ValueError):
+        schedules = list(DEFAULT_SCHEDULES)
+    for schedule in schedules:
+        if schedule.name.casefold() == text.strip().casefold():
+            return schedule
+    return Schedule.parse("Command line", text)
+
+
+def set_style_state(widget: QWidget, name: str, value: str) -> None:
+    """Switch a dynamic property used by dark.qss selectors and repolish only that widget."""
+    if widget.property(name) == value:
+        return
+    widget.setProperty(name, value)
+    widget.style().unpolish(widget)
+    widget.style().polish(widget)
+
+
+def load_session_log() -> list[tuple[str, Optional[float]]]:
+    """Load the (image path, seconds shown) log of the last saved session."""
+    settings = QSettings(FigureDrawingTool.SETTINGS_ORG, FigureDrawingTool.SETTINGS_APP)
+    data = settings.value("last_session", "")
+    if not data:
+        return []
+    try:
+        return [(path, seconds) for path, seconds in json.loads(data)]
+    except (ValueError, TypeError):
+        return []
+
+
 class FigureDrawingTool(QWidget):
+    # Downloads finishing on the HTTP source's threads, delivered to the GUI thread
+    _http_fetched = Signal(str, str)  # image URL, local path ("" on failure)
+    _http_manifest_loaded = Signal(str, object)  # manifest URL, list of image URLs or the exception
+    _contact_sheet_saved = Signal(str, str)  # output path, error message ("" on success)
+
     # Constants
     DEFAULT_WIDTH = 420
     DEFAULT_HEIGHT = 700
     MIN_WIDTH = 400
     MIN_HEIGHT = 300
     CLOCK_UPDATE_INTERVAL_MS = 1000
-    MAX_HISTORY_SIZE = 50
+    MAX_HISTORY_SIZE = 1000  # paths only; the filmstrip loads thumbnails on demand
+    HTTP_PREFETCH_COUNT = 3
+    DEFAULT_CACHE_BUDGET_MB = 256
+    # Fixed time presets: (label, (minutes, seconds))
+    INTERVAL_PRESETS = [
+        ("30 sec", (0, 30)), ("1 min", (1, 0)), ("2 min", (2, 0)), ("5 min", (5, 0)),
+        ("10 min", (10, 0)), ("15 min", (15, 0)), ("20 min", (20, 0)),
+    ]
+    IDLE_HIBERNATE_MS = 5 * 60 * 1000
+    DECODER_CALIBRATION_SAMPLES = 2  # files per format and reduction
+    DECODER_CALIBRATION_CANDIDATES = 200  # headers read to find them
+    SCHEDULE_FILE_NAME = "schedules.json"
+    SEEN_HISTORY_FILE_NAME = "seen.log"
+    DEFAULT_SEEN_SESSIONS = 3
+    CLASSROOM_TOLERANCE_MS = 2  # followers re-aim their image timer when further off
+    CLASSROOM_STALE_MS = 100  # heartbeat for the image a follower has just moved past
+    # Sampling modes: shuffle every image, or draw from the folder tree (see tree_sampler.py)
+    SAMPLE_ALL = "all"
+    SAMPLE_WEIGHTED = "weighted"
+    SAMPLE_BALANCED = "balanced"
+    SAMPLING_MODES = [
+        (SAMPLE_ALL, "Shuffle every image"),
+        (SAMPLE_WEIGHTED, "Sample the folder tree"),
+        (SAMPLE_BALANCED, "Sample evenly across subfolders"),
+    ]
+    SAMPLE_BATCH = 20  # images drawn at a time when sampling
     SETTINGS_ORG = "FigureDrawingTool"
     SETTINGS_APP = "FigureDrawingTool"
 
-    def __init__(self) -> None:
+    # Icons referenced from dark.qss as @placeholder@ urls: (icon name, size)
+    STYLESHEET_ICONS = {
+        "combo_arrow_down": ("chevron_down", 16),
+        "spinbox_arrow_up": ("chevron_up", 12),
+        "spinbox_arrow_down": ("chevron_down", 12),
+    }
+
+    def __init__(self, clock: Optional[Clock] = None) -> None:
         super().__init__()
 
+        # Time source for timers and view spans (a virtual clock in soak runs)
+        self.time_source: Clock = clock or Clock()
+
         # Initialize timer references to None (fixes attribute errors)
         self.image_timer: Optional[QTimer] = None
         self.clock_timer: Optional[QTimer] = None
         self.elapse_time_seconds: int = 0
         self.remaining_seconds: int = 0
+        self._paused_remaining_ms: int = -1  # image timer left at pause, to the ms
+        self._image_deadline: Optional[float] = None  # time_source time the image timer is due
+
+        # Timed sequence the running session follows, None for a fixed interval
+        self.schedule: Optional[Schedule] = None
+
+        # Memory budget for image caches, and hibernation while minimized/idle
+        self.resource_governor = ResourceGovernor(self.DEFAULT_CACHE_BUDGET_MB * 1024 * 1024)
+        self._hibernating: bool = False
+        self._clock_suspended: bool = False
+        self.idle_timer = self.time_source.create_timer(self)
+        self.idle_timer.setSingleShot(True)
+        self.idle_timer.setInterval(self.IDLE_HIBERNATE_MS)
+        self.idle_timer.timeout.connect(self._hibernate)
 
         # Image management
         self.image_list: list[str] = []
         self.image_index: int = 0
         self.current_image_path: Optional[str] = None
+        self._http_source: Optional[HttpImageSource] = None
+        self._manifest_pending: Optional[str] = None  # manifest URL being downloaded
+        self._start_when_loaded: bool = False  # Start was pressed while it was
+        self._http_fetched.connect(self._on_http_image_fetched)
+        self._http_manifest_loaded.connect(self._on_http_manifest_loaded)
+        self._contact_sheet_saved.connect(self._on_contact_sheet_saved)
 
         # Image history for Previous button
         self.image_history: list[str] = []
         self.history_index: int = -1
 
+        # Images shown in earlier sessions, kept behind fresh ones when shuffling
+        self.seen_history = SeenHistory(config_path(self.SEEN_HISTORY_FILE_NAME))
+        self.seen_sessions: int = self.DEFAULT_SEEN_SESSIONS
+        self.seen_days: float = 0
+
+        # Seconds each image has been on screen, for the contact sheet
+        self.image_view_seconds: dict[str, float] = {}
+        self._view_started: Optional[float] = None
+
         # State tracking
         self.is_running: bool = False
         self.is_paused: bool = False
         self.is_flipped_h: bool = False
         self.is_flipped_v: bool = False
-
-        # Get supported image formats
-        self.supported_extensions: set[str] = {
-            bytes(fmt).decode().lower()
-            for fmt in QImageReader.supportedImageFormats()
-        }
+        self.value_filter: Optional[str] = None
+
+        # Decoder backends; supported formats are whatever any of them can read
+        self.decoders = DecoderRegistry.with_available_backends()
+        self.supported_extensions: set[str] = self.decoders.extensions()
+        self.decode_mode: str = MODE_THREAD
+        self.decode_pool: Optional[DecodePool] = None
+        self._prefetch_depth: int = 0
+
+        # Scanned image folder, with its filename index built when first filtered
+        self._library_root: Optional[str] = None
+        self._library_paths: list[str] = []
+        self._library: Optional[LibraryIndex] = None
+        self.library_filter: str = ""
+        self.library_browser: Optional[LibraryBrowser] = None
+
+        # Sampling draws a session from the folder tree instead of scanning all of it
+        self.sampling_mode: str = self.SAMPLE_ALL
+        self._tree_counts: Optional[DirectoryCounts] = None
+        self._sampler: Optional[TreeSampler] = None
+
+        # System tray icon while kept running between uses (see stay_in_tray)
+        self.keep_in_tray: bool = False
+        self._tray: Optional[QSystemTrayIcon] = None
+        self._quitting: bool = False
+        self._warm_path: Optional[str] = None  # first image of the next session, decoded while stowed
+
+        # Classroom mode: drive other instances, or follow one (see classroom.py)
+        self.classroom_controller: Optional[ClassroomController] = None
+        self.classroom_follower: Optional[ClassroomFollower] = None
+        self._classroom_seed: Optional[int] = None  # seed of the image order, shared with followers
+        self._classroom_library: str = ""  # fingerprint of the images in that order
+        self._classroom_timing: Optional[tuple[Optional[Schedule], int]] = None  # the controller's, when following
+        self._classroom_rejected_seed: Optional[int] = None
+        self._classroom_publish_timer = QTimer(self)
+        self._classroom_publish_timer.setSingleShot(True)  # once the current change has settled
+        self._classroom_publish_timer.timeout.connect(self._publish_classroom_state)
 
         self._build_ui()
         self._setup_shortcuts()
         self._load_settings()
+        self.idle_timer.start()
+
+        # Upcoming images decode in the background (threads, or processes
+        # handing pixels over in shared memory) and are preloaded into the canvas
+        self.decode_pool = DecodePool(self.decoders, self.decode_mode, parent=self)
+        self.decode_pool.decoded.connect(self._on_image_decoded)
+        self.canvas.decode_pool = self.decode_pool
+
+        # Value-study filters run on their own worker and are cached per image
+        self.filter_engine = FilterEngine(self.resource_governor, parent=self)
+        self.filter_engine.ready.connect(self.canvas.on_filter_ready)
+        self.canvas.filter_engine = self.filter_engine
+
+        # The next image's frame is scaled on its own worker, so the switch only swaps frames
+        self.frame_scaler = FrameScaler(parent=self)
+        self.frame_scaler.ready.connect(self.canvas.on_frame_ready)
+        self.canvas.frame_scaler = self.frame_scaler
 
     def _build_ui(self) -> None:
         """Build the user interface."""
-        # Load stylesheet
-        style_sheet_file = QFile(resource_path('dark.qss'))
-        style_sheet_file.open(QFile.OpenModeFlag.ReadOnly)
-        self.setStyleSheet(str(style_sheet_file.readAll(), encoding='utf-8'))
+        # Load stylesheet once; state changes switch dynamic properties instead
+        self.setStyleSheet(self._load_stylesheet())
 
         # Window setup
         self.setWindowTitle("Figure Drawing Tool")
@@ -120,6 +326,18 @@ class FigureDrawingTool(QWidget):
 
         self.show()
 
+    def _load_stylesheet(self) -> str:
+        """Read dark.qss and fill in the paths of the generated icons it uses."""
+        style_sheet_file = QFile(resource_path('dark.qss'))
+        style_sheet_file.open(QFile.OpenModeFlag.ReadOnly)
+        style_sheet = str(style_sheet_file.readAll(), encoding='utf-8')
+
+        for placeholder, (icon_name, size) in self.STYLESHEET_ICONS.items():
+            icon_path = os.path.join(tempfile.gettempdir(), f"{placeholder}.png")
+            save_icon(icon_name, icon_path, size=size)
+            style_sheet = style_sheet.replace(f"@{placeholder}@", icon_path.replace("\\", "/"))
+        return style_sheet
+
     def _build_directory_row(self) -> None:
         """Build the image directory selection row."""
         layout = QHBoxLayout()
@@ -131,22 +349,46 @@ class FigureDrawingTool(QWidget):
         self.image_label.setToolTip("Image Directory")
 
         self.image_directory = QLineEdit()
-        self.image_directory.setPlaceholderText("Select image folder...")
-        self.image_directory.setStyleSheet("background-color: #090909;")
+        self.image_directory.setObjectName("imageDirectory")
+        self.image_directory.setPlaceholderText("Select image folder, reference pack or manifest URL...")
 
         self.browse_button = QPushButton(create_icon("folder_search"), "")
-        self.browse_button.setToolTip("Browse for folder")
+        self.browse_button.setToolTip("Browse for folder (Shift: reference pack)")
         self.browse_button.setFixedSize(28, 28)  # Icon is 24px, add padding
         self.browse_button.clicked.connect(self._browse_directory)
 
+        self.library_button = QPushButton(create_icon("list_search"), "")
+        self.library_button.setToolTip("Filter the library (L)")
+        self.library_button.setFixedSize(28, 28)
+        self.library_button.clicked.connect(self._show_library_browser)
+
         self.subfolders_checkbox = QCheckBox("Subfolders")
         self.subfolders_checkbox.setToolTip("Include images from subdirectories")
         self.subfolders_checkbox.stateChanged.connect(self._on_subfolder_changed)
 
+        self.sampling_button = QPushButton(create_icon("arrows_shuffle"), "")
+        self.sampling_button.setObjectName("samplingButton")
+        self.sampling_button.setCheckable(True)
+        self.sampling_button.setToolTip("Shuffle every image, or sample a few folders of a large library")
+        self.sampling_button.setFixedSize(28, 28)
+        sampling_menu = QMenu(self.sampling_button)
+        sampling_group = QActionGroup(sampling_menu)
+        self.sampling_actions = {}
+        for mode, label in self.SAMPLING_MODES:
+            action = sampling_menu.addAction(label)
+            action.setCheckable(True)
+            action.setActionGroup(sampling_group)
+            action.triggered.connect(lambda checked, mode=mode: self._set_sampling_mode(mode))
+            self.sampling_actions[mode] = action
+        self.sampling_actions[self.SAMPLE_ALL].setChecked(True)
+        self.sampling_button.setMenu(sampling_menu)
+
         layout.addWidget(self.image_label)
         layout.addWidget(self.image_directory)
         layout.addWidget(self.browse_button)
+        layout.addWidget(self.library_button)
         layout.addWidget(self.subfolders_checkbox)
+        layout.addWidget(self.sampling_button)
 
     def _build_time_settings_row(self) -> None:
         """Build the time settings row with preset dropdown and custom minute/second spinboxes."""
@@ -167,31 +409,11 @@ class FigureDrawingTool(QWidget):
         # Preset dropdown
         self.preset_combo = QComboBox()
         self.preset_combo.addItem("Custom", (None, None))
-        self.preset_combo.addItem("30 sec", (0, 30))
-        self.preset_combo.addItem("1 min", (1, 0))
-        self.preset_combo.addItem("2 min", (2, 0))
-        self.preset_combo.addItem("5 min", (5, 0))
-        self.preset_combo.addItem("10 min", (10, 0))
-        self.preset_combo.addItem("15 min", (15, 0))
-        self.preset_combo.addItem("20 min", (20, 0))
+        for label, (minutes, seconds) in self.INTERVAL_PRESETS:
+            self.preset_combo.addItem(label, (minutes, seconds))
+        self._add_schedule_presets()
         self.preset_combo.setCurrentIndex(2)  # Default to 1 min
         self.preset_combo.currentIndexChanged.connect(self._on_preset_changed)
-
-        # Apply custom dropdown arrow icon
-        arrow_path = os.path.join(tempfile.gettempdir(), "chevron_down.png")
-        save_icon("chevron_down", arrow_path, size=16)
-        arrow_path_css = arrow_path.replace("\\", "/")
-        self.preset_combo.setStyleSheet(f"""
-            QComboBox::down-arrow {{
-                image: url({arrow_path_css});
-                width: 12px;
-                height: 12px;
-            }}
-            QComboBox::drop-down {{
-                border: none;
-                padding-right: 8px;
-            }}
-        """)
         time_input_layout.addWidget(self.preset_combo)
 
         # Custom time spinboxes (disabled by default since preset is not "Custom")
@@ -201,19 +423,6 @@ class FigureDrawingTool(QWidget):
         # Also match the folder line edit height
         self.image_directory.setFixedHeight(spinbox_height)
 
-        # Generate spinbox arrow icons
-        arrow_up_path = os.path.join(tempfile.gettempdir(), "spinbox_arrow_up.png")
-        arrow_down_path = os.path.join(tempfile.gettempdir(), "spinbox_arrow_down.png")
-        save_icon("chevron_up", arrow_up_path, color="#cacfd2", size=12)
-        save_icon("chevron_down", arrow_down_path, color="#cacfd2", size=12)
-        arrow_up_css = arrow_up_path.replace("\\", "/")
-        arrow_down_css = arrow_down_path.replace("\\", "/")
-
-        spinbox_style = f"""
-            QSpinBox::up-arrow {{ image: url({arrow_up_css}); }}
-            QSpinBox::down-arrow {{ image: url({arrow_down_css}); }}
-        """
-
         self.minutes_spinbox = QSpinBox()
         self.minutes_spinbox.setRange(0, 59)
         self.minutes_spinbox.setValue(1)
@@ -221,7 +430,7 @@ class FigureDrawingTool(QWidget):
         self.minutes_spinbox.setEnabled(False)
         self.minutes_spinbox.setFixedHeight(spinbox_height)
         self.minutes_spinbox.setFixedWidth(85)
-        self.minutes_spinbox.setStyleSheet(spinbox_style)
+        self.minutes_spinbox.setProperty("custom", "false")
         time_input_layout.addWidget(self.minutes_spinbox)
 
         self.seconds_spinbox = QSpinBox()
@@ -231,12 +440,9 @@ class FigureDrawingTool(QWidget):
         self.seconds_spinbox.setEnabled(False)
         self.seconds_spinbox.setFixedHeight(spinbox_height)
         self.seconds_spinbox.setFixedWidth(85)
-        self.seconds_spinbox.setStyleSheet(spinbox_style)
+        self.seconds_spinbox.setProperty("custom", "false")
         time_input_layout.addWidget(self.seconds_spinbox)
 
-        # Store the base spinbox style with arrows for later use
-        self._spinbox_arrow_style = spinbox_style
-
         # Image counter (center)
         self.image_counter_label = QLabel("")
         self.image_counter_label.setObjectName("imageCounter")
@@ -250,9 +456,24 @@ class FigureDrawingTool(QWidget):
 
         self.clock = QLCDNumber()
         self.clock.setDigitCount(5)
+        self.clock.setProperty("level", "default")
         self.clock.display("00:00")
         clock_layout.addWidget(self.clock)
 
+    def _add_schedule_presets(self) -> None:
+        """Add the built-in and user-defined schedules after the fixed presets."""
+        try:
+            schedules = available_schedules()
+        except (OSError, ValueError) as e:
+            schedules = list(DEFAULT_SCHEDULES)
+            # Warn once the window is up rather than while building it
+            message = f"Could not load {config_path(self.SCHEDULE_FILE_NAME)}:\n{e}"  # e is unbound after except
+            QTimer.singleShot(0, lambda: self._show_warning("Warning!", message))
+
+        self.preset_combo.insertSeparator(self.preset_combo.count())
+        for schedule in schedules:
+            self.preset_combo.addItem(schedule.label(), schedule)
+
     def _on_preset_changed(self, index: int) -> None:
         """Handle preset dropdown selection."""
         is_custom = (index == 0)  # "Custom" is at index 0
@@ -266,7 +487,12 @@ class FigureDrawingTool(QWidget):
         self._apply_spinbox_styling()
 
         data = self.preset_combo.currentData()
-        if data and data[0] is not None:
+        if isinstance(data, Schedule):
+            # Show the first phase's interval
+            minutes, seconds = divmod(data.seconds_for(0), 60)
+            self.minutes_spinbox.setValue(min(minutes, self.minutes_spinbox.maximum()))
+            self.seconds_spinbox.setValue(seconds)
+        elif data and data[0] is not None:
             minutes, seconds = data
             self.minutes_spinbox.setValue(minutes)
             self.seconds_spinbox.setValue(seconds)
@@ -274,22 +500,15 @@ class FigureDrawingTool(QWidget):
     def _apply_spinbox_styling(self) -> None:
         """Apply appropriate styling to spinboxes based on enabled state.
 
-        When enabled (Custom preset): dark background (#090909)
+        When enabled (Custom preset): QSpinBox[custom="true"] dark background
         When disabled: uses QSS disabled state (gradient)
-        Always includes arrow icons.
         """
         is_custom = (self.preset_combo.currentIndex() == 0)
         is_enabled = is_custom and not self.is_running
 
-        if is_enabled:
-            # Enabled: dark background for text area + arrow icons
-            spinbox_style = self._spinbox_arrow_style + " QSpinBox { background-color: #090909; }"
-            self.minutes_spinbox.setStyleSheet(spinbox_style)
-            self.seconds_spinbox.setStyleSheet(spinbox_style)
-        else:
-            # Disabled: just arrow icons, let QSS handle disabled appearance
-            self.minutes_spinbox.setStyleSheet(self._spinbox_arrow_style)
-            self.seconds_spinbox.setStyleSheet(self._spinbox_arrow_style)
+        custom = "true" if is_enabled else "false"
+        set_style_state(self.minutes_spinbox, "custom", custom)
+        set_style_state(self.seconds_spinbox, "custom", custom)
 
     def _toggle_flip_h(self) -> None:
         """Toggle horizontal flip."""
@@ -305,6 +524,30 @@ class FigureDrawingTool(QWidget):
         """Toggle grayscale mode."""
         self.canvas.set_grayscale(self.grayscale_button.isChecked())
 
+    def _toggle_auto_levels(self) -> None:
+        """Toggle auto levels."""
+        self.canvas.set_auto_levels(self.auto_levels_button.isChecked())
+
+    def _set_value_filter(self, name: Optional[str]) -> None:
+        """Show a value-study filter (a FILTERS name), or None for the plain image."""
+        self.value_filter = name
+        self.value_study_button.setChecked(name is not None)
+        self.value_study_actions[name].setChecked(True)
+        self.canvas.set_value_filter(name)
+
+    def _set_transition(self, name: str) -> None:
+        """Switch images with a cut, crossfade or slide (a TRANSITIONS name)."""
+        if name not in self.transition_actions:
+            name = TRANSITION_CUT
+        self.canvas.transition = name
+        self.transition_button.setChecked(name != TRANSITION_CUT)
+        self.transition_actions[name].setChecked(True)
+
+    def _cycle_value_filter(self) -> None:
+        """Keyboard shortcut handler: step through the value-study filters, then off."""
+        names: list[Optional[str]] = [None, *FILTERS]
+        self._set_value_filter(names[(names.index(self.value_filter) + 1) % len(names)])
+
     def _shortcut_flip_h(self) -> None:
         """Keyboard shortcut handler for horizontal flip."""
         self.flip_h_button.setChecked(not self.flip_h_button.isChecked())
@@ -320,6 +563,22 @@ class FigureDrawingTool(QWidget):
         self.grayscale_button.setChecked(not self.grayscale_button.isChecked())
         self._toggle_grayscale()
 
+    def _shortcut_auto_levels(self) -> None:
+        """Keyboard shortcut handler for auto levels."""
+        self.auto_levels_button.setChecked(not self.auto_levels_button.isChecked())
+        self._toggle_auto_levels()
+
+    def _set_sampling_mode(self, mode: str) -> None:
+        """Shuffle every image (SAMPLE_ALL), or sample the folder tree; reloads the folder."""
+        if mode not in self.sampling_actions:
+            mode = self.SAMPLE_ALL
+        changed = mode != self.sampling_mode
+        self.sampling_mode = mode
+        self.sampling_button.setChecked(mode != self.SAMPLE_ALL)
+        self.sampling_actions[mode].setChecked(True)
+        if changed and self.image_directory.text() and not self.is_running:
+            self._load_image_list()
+
     def _on_subfolder_changed(self) -> None:
         """Handle subfolder checkbox change - reload images."""
         if self.image_directory.text():
@@ -328,18 +587,18 @@ class FigureDrawingTool(QWidget):
     def _create_h_divider(self) -> QFrame:
         """Create a horizontal divider line."""
         divider = QFrame()
+        divider.setObjectName("divider")
         divider.setFrameShape(QFrame.Shape.HLine)
         divider.setFrameShadow(QFrame.Shadow.Sunken)
-        divider.setStyleSheet("background-color: rgb(60, 60, 60); border: none; margin: 0;")
         divider.setFixedHeight(2)
         return divider
 
     def _create_v_divider(self) -> QFrame:
         """Create a vertical divider line."""
         divider = QFrame()
+        divider.setObjectName("divider")
         divider.setFrameShape(QFrame.Shape.VLine)
         divider.setFrameShadow(QFrame.Shadow.Sunken)
-        divider.setStyleSheet("background-color: rgb(60, 60, 60); border: none; margin: 0;")
         divider.setFixedWidth(2)
         return divider
 
@@ -349,16 +608,26 @@ class FigureDrawingTool(QWidget):
         self.main_layout.addWidget(self._create_h_divider())
 
         self.start_image = resource_path('start_image.jpg')
-        self.canvas = Label(self.start_image)
+        self.canvas = Label(self.start_image, self.resource_governor, self.decoders)
+        self.canvas.setObjectName("canvas")
         self.canvas.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Ignored)
         self.canvas.setMinimumSize(100, 50)  # Allow canvas to shrink when window is small
-        self.canvas.setStyleSheet("background-color: #050505; margin: 0; border-radius: 0;")
 
         self.image_layout = QVBoxLayout()
         self.image_layout.setContentsMargins(0, 0, 0, 0)
         self.main_layout.addLayout(self.image_layout, 1)  # stretch factor of 1
         self.image_layout.addWidget(self.canvas)
 
+        # Thumbnails of the session so far and the images coming up; shown once there's history
+        self.filmstrip_model = FilmstripModel(
+            self.decoders, self._cached_local_path, self.resource_governor, parent=self
+        )
+        self.filmstrip = Filmstrip(self.filmstrip_model)
+        self.filmstrip.setObjectName("filmstrip")
+        self.filmstrip.history_selected.connect(self._go_to_history)
+        self.filmstrip.hide()
+        self.image_layout.addWidget(self.filmstrip)
+
     def _build_player_controls(self) -> None:
         """Build the playback control buttons with image manipulation controls."""
         # Horizontal divider above controls
@@ -423,6 +692,58 @@ class FigureDrawingTool(QWidget):
         self.grayscale_button.clicked.connect(self._toggle_grayscale)
         controls_layout.addWidget(self.grayscale_button)
 
+        self.auto_levels_button = QPushButton(create_icon("chart_histogram"), "")
+        self.auto_levels_button.setCheckable(True)
+        self.auto_levels_button.setToolTip("Stretch to full contrast (A)")
+        self.auto_levels_button.setFixedSize(icon_button_size, icon_button_size)
+        self.auto_levels_button.clicked.connect(self._toggle_auto_levels)
+        controls_layout.addWidget(self.auto_levels_button)
+
+        self.value_study_button = QPushButton(create_icon("adjustments_horizontal"), "")
+        self.value_study_button.setObjectName("valueStudyButton")
+        self.value_study_button.setCheckable(True)
+        self.value_study_button.setToolTip("Value study (N)")
+        self.value_study_button.setFixedSize(icon_button_size, icon_button_size)
+        value_study_menu = QMenu(self.value_study_button)
+        value_study_group = QActionGroup(value_study_menu)
+        self.value_study_actions = {}
+        for name, label in [(None, "Off"), *((f.name, f.label) for f in FILTERS.values())]:
+            action = value_study_menu.addAction(label)
+            action.setCheckable(True)
+            action.setActionGroup(value_study_group)
+            action.triggered.connect(lambda checked, name=name: self._set_value_filter(name))
+            self.value_study_actions[name] = action
+        self.value_study_actions[None].setChecked(True)
+        self.value_study_button.setMenu(value_study_menu)
+        controls_layout.addWidget(self.value_study_button)
+
+        self.transition_button = QPushButton(create_icon("transition_right"), "")
+        self.transition_button.setObjectName("transitionButton")
+        self.transition_button.setCheckable(True)
+        self.transition_button.setToolTip("Transition between images")
+        self.transition_button.setFixedSize(icon_button_size, icon_button_size)
+        transition_menu = QMenu(self.transition_button)
+        transition_group = QActionGroup(transition_menu)
+        self.transition_actions = {}
+        for name, label in TRANSITIONS:
+            action = transition_menu.addAction(label)
+            action.setCheckable(True)
+            action.setActionGroup(transition_group)
+            action.triggered.connect(lambda checked, name=name: self._set_transition(name))
+            self.transition_actions[name] = action
+        self.transition_actions[TRANSITION_CUT].setChecked(True)
+        self.transition_button.setMenu(transition_menu)
+        controls_layout.addWidget(self.transition_button)
+
+        # Visual separator between image controls and session export
+        controls_layout.addWidget(self._create_v_divider())
+
+        self.export_button = QPushButton(create_icon("layout_grid"), "")
+        self.export_button.setToolTip("Save contact sheet of session (E)")
+        self.export_button.setFixedSize(icon_button_size, icon_button_size)
+        self.export_button.clicked.connect(self._export_contact_sheet)
+        controls_layout.addWidget(self.export_button)
+
         # Row 2: Primary Play/Stop button + Reset button
         play_layout = QHBoxLayout()
         self.main_layout.addLayout(play_layout)
@@ -434,9 +755,10 @@ class FigureDrawingTool(QWidget):
         reload_icon = create_icon("refresh")
 
         self.start_stop_button = QPushButton(play_icon, "Start")
+        self.start_stop_button.setObjectName("startStopButton")
         self.start_stop_button.setToolTip("Start/Stop session (Space)")
         self.start_stop_button.setFixedHeight(play_button_height)
-        self.start_stop_button.setStyleSheet("background-color: #4a9f4a; color: #ffffff;")  # Green with white text
+        self.start_stop_button.setProperty("state", "stopped")  # Green with white text
         self.start_stop_button.clicked.connect(self._on_start_stop)
         self._play_icon = play_icon
         self._stop_icon = stop_icon
@@ -450,48 +772,365 @@ class FigureDrawingTool(QWidget):
         play_layout.addWidget(self.restart_button)
 
     def _browse_directory(self) -> None:
-        """Open directory browser and load images."""
-        path = QFileDialog.getExistingDirectory(self, "Select Image Directory")
+        """Open directory browser (or a file browser for packs, with Shift) and load images."""
+        if QApplication.keyboardModifiers() & Qt.KeyboardModifier.ShiftModifier:
+            path, _ = QFileDialog.getOpenFileName(
+                self, "Select Reference Pack", "", f"Reference packs (*.{PACK_EXTENSION})"
+            )
+        else:
+            path = QFileDialog.getExistingDirectory(self, "Select Image Directory")
         if path:
             self.image_directory.setText(path)
+            self._classroom_rejected_seed = None  # may match the class now
             self._load_image_list()
 
     def _load_image_list(self) -> None:
         """Load and shuffle the list of images from the selected directory."""
         directory = self.image_directory.text()
-        if not directory or not os.path.isdir(directory):
+        if directory and is_url(directory):
+            self._load_http_image_list(directory)
+            return
+
+        if not directory or not (os.path.isdir(directory) or is_pack(directory)):
             self.image_list = []
+            self._library_root = None
+            self._sampler = None
             return
 
-        self.image_list = []
-        dir_path = Path(directory)
-
-        # Use recursive glob if subfolders checkbox is checked
-        if self.subfolders_checkbox.isChecked():
-            for file_path in dir_path.rglob('*'):
-                if file_path.is_file():
-                    ext = file_path.suffix.lower().lstrip('.')
-                    if ext in self.supported_extensions:
-                        self.image_list.append(str(file_path))
-        else:
-            for file_path in dir_path.iterdir():
-                if file_path.is_file():
-                    ext = file_path.suffix.lower().lstrip('.')
-                    if ext in self.supported_extensions:
-                        self.image_list.append(str(file_path))
+        if self._sampling_applies() and os.path.isdir(directory):
+            self._load_sample(directory)
+            return
+
+        self._scan_library(directory)
+        self._set_session_images(self._library_matches())
+        self._calibrate_decoders()
+        if self.library_browser is not None:
+            self.library_browser.set_library(self._library_index(), self.library_filter)
+
+    def _scan_library(self, directory: str) -> None:
+        """List every image in the folder or pack (recursively if the subfolders checkbox is checked)."""
+        try:
+            relative_paths = list_images(directory, self.supported_extensions, self.subfolders_checkbox.isChecked())
+        except (OSError, PackError) as e:
+            relative_paths = []
+            self._show_warning("Warning!", f"Could not open reference pack:\n{e}")
+        if directory != self._library_root or relative_paths != self._library_paths:
+            self._library_root = directory
+            self._library_paths = relative_paths
+            self._library = None  # re-indexed when a filter needs it
+
+    def _sampling_applies(self) -> bool:
+        """Whether the next session is sampled from the folder tree rather than shuffled whole.
+
+        A library filter needs every filename, and a classroom needs the
+        whole list to repeat its order on other machines.
+        """
+        return (
+            self.sampling_mode != self.SAMPLE_ALL and not self.library_filter
+            and self.classroom_controller is None and self.classroom_follower is None
+        )
+
+    def _load_sample(self, directory: str) -> None:
+        """Draw the start of a session from the folder tree, listing only the folders drawn from."""
+        if self._tree_counts is None or self._tree_counts.root != directory:
+            if self._tree_counts is not None:
+                self._tree_counts.save()
+            digest = hashlib.blake2b(os.path.normcase(directory).encode("utf-8"), digest_size=8).hexdigest()
+            self._tree_counts = DirectoryCounts(
+                directory, self.supported_extensions, config_path(f"folder_counts_{digest}.json")
+            )
+        self._sampler = TreeSampler(
+            self._tree_counts, balanced=self.sampling_mode == self.SAMPLE_BALANCED,
+            recursive=self.subfolders_checkbox.isChecked(), seen=self._recently_seen()
+        )
+        # The folder isn't scanned; the library browser scans it when opened
+        self._library_root = None
+        self._library_paths = []
+        self._library = None
 
+        self.image_index = 0
+        self.image_list = self._sampler.sample(self.SAMPLE_BATCH)
+        self._tree_counts.save()
+        self._calibrate_decoders()
+
+        # Count the rest of the tree for better weights next time
+        counts = self._tree_counts
+        if not counts.complete and not counts.counting:
+            counts.counting = True
+            threading.Thread(target=counts.count_all, name="folder-count", daemon=True).start()
+
+    def _recently_seen(self) -> Optional[Callable[[list[str]], np.ndarray]]:
+        """Test for images shown in recent sessions, for the sampler to draw others first."""
+        if self.seen_sessions <= 0 and self.seen_days <= 0:
+            return None
+        try:
+            recent = self.seen_history.recent_filter(self.seen_sessions, self.seen_days)
+        except (OSError, ValueError):
+            return None
+        if recent.count == 0:
+            return None
+        return lambda paths: recent.contains(image_ids(paths))
+
+    def _top_up_sample(self) -> None:
+        """Draw more images when a sampled session nears the end of those drawn so far."""
+        if self._sampler is None or len(self.image_list) - self.image_index > MAX_PREFETCH_DEPTH:
+            return
+        end = self.image_index + self.SAMPLE_BATCH
+        if self.schedule is not None:
+            end = min(end, self.schedule.total_images)
+        if end > len(self.image_list):
+            self.image_list.extend(self._sampler.sample(end - len(self.image_list)))
+
+    def _library_index(self) -> Optional[LibraryIndex]:
+        """Filename index of the scanned folder, built on first use."""
+        if self._library is None and self._library_root is not None:
+            self._library = LibraryIndex(self._library_root, self._library_paths)
+        return self._library
+
+    def _library_matches(self) -> list[str]:
+        """Paths of the scanned images that pass the library filter."""
+        if self._library_root is None:
+            return []
+        if not self.library_filter:
+            return [full_path(self._library_root, path) for path in self._library_paths]
+        index = self._library_index()
+        return index.paths_for(index.search(self.library_filter))
+
+    def _library_relative_matches(self) -> list[str]:
+        """Relative paths of the scanned images that pass the library filter."""
+        if self._library_root is None:
+            return []
+        if not self.library_filter:
+            return self._library_paths
+        index = self._library_index()
+        return [index.relative_path(i) for i in index.search(self.library_filter).tolist()]
+
+    def _set_session_images(self, image_paths: list[str]) -> None:
+        """Use these images for the next session, shuffled, unseen ones first.
+
+        A classroom controller instead shuffles by a fresh seed, which its
+        followers repeat on their copies of the folder.
+        """
+        self.image_index = 0
+        self._sampler = None
+        if self.classroom_controller is not None and self._library_root is not None:
+            self._set_classroom_images(random.getrandbits(32))
+            return
+        self.image_list = image_paths
         random.shuffle(self.image_list)
+        self._put_unseen_first()
+
+    def _set_classroom_images(self, seed: int) -> None:
+        """Order the filtered library by a classroom seed, the same on every machine."""
+        relative_paths = self._library_relative_matches()
+        self._classroom_seed = seed
+        self._classroom_library = library_fingerprint(relative_paths)
+        self.image_list = [full_path(self._library_root, path) for path in session_order(relative_paths, seed)]
+        self.image_index = 0
+        self._classroom_state_changed()  # followers get ready before the session starts
+
+    def _show_library_browser(self) -> None:
+        """Open the library browser on the scanned folder."""
+        if self.is_running:
+            return
+        if self.library_browser is None:
+            self.library_browser = LibraryBrowser(self)
+            self.library_browser.filter_changed.connect(self._on_library_filter_changed)
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        try:
+            directory = self.image_directory.text()
+            if self._library_root is None and directory and not is_url(directory) and (
+                os.path.isdir(directory) or is_pack(directory)
+            ):
+                self._scan_library(directory)  # sampled so far
+            self.library_browser.set_library(self._library_index(), self.library_filter)
+        finally:
+            QApplication.restoreOverrideCursor()
+        self.library_browser.show()
+        self.library_browser.raise_()
+        self.library_browser.activateWindow()
+
+    def _on_library_filter_changed(self, query: str, matches: np.ndarray) -> None:
+        """Make the browser's filter result the session's image set."""
+        if self.is_running or self._library is None:
+            return
+        self.library_filter = query
+        self._set_session_images(self._library.paths_for(matches))
+        self._update_image_counter()
+
+    def _put_unseen_first(self) -> None:
+        """Move images shown in recent sessions behind the rest of the shuffled list."""
+        try:
+            self.image_list = self.seen_history.order_unseen_first(
+                self.image_list, self.seen_sessions, self.seen_days
+            )
+        except (OSError, ValueError):
+            pass  # an unreadable history just means a plain shuffle
+
+    def _calibrate_decoders(self) -> None:
+        """Benchmark decoder backends in the background for formats and reductions not calibrated yet."""
+        # The list is shuffled, so its head is a fair sample of the library's image sizes
+        candidates = self.image_list[:self.DECODER_CALIBRATION_CANDIDATES]
+        if not candidates:
+            return
+        threading.Thread(
+            target=self.decoders.calibrate_missing,
+            args=(candidates, self.canvas.decode_size(), self.DECODER_CALIBRATION_SAMPLES),
+            name="decoder-calibration", daemon=True
+        ).start()
+
+    def _load_http_image_list(self, manifest_url: str) -> None:
+        """Start downloading an HTTP manifest; _on_http_manifest_loaded shuffles its image URLs."""
+        if self._http_source is None or self._http_source.manifest_url != manifest_url:
+            if self._http_source:
+                self._http_source.close()
+            self._http_source = HttpImageSource(manifest_url, on_fetched=self._deliver_http_image)
+            self._manifest_pending = None
+
+        # The library browser filters local folders only
+        self._library_root = None
+        self._library = None
+        if self.library_browser is not None:
+            self.library_browser.set_library(None, self.library_filter)
+
+        self.image_list = []
         self.image_index = 0
+        if self._manifest_pending == manifest_url:
+            return
+        self._manifest_pending = manifest_url
+        self._http_source.load_manifest_async(self.supported_extensions).add_done_callback(
+            lambda future: self._deliver_http_manifest(manifest_url, future)
+        )
+
+    def _deliver_http_manifest(self, manifest_url: str, future: Future) -> None:
+        """Hand a downloaded manifest to the GUI thread (runs on a download thread)."""
+        if future.cancelled():
+            return
+        result = future.exception() or future.result()
+        try:
+            self._http_manifest_loaded.emit(manifest_url, result)
+        except RuntimeError:
+            pass  # window already deleted during shutdown
+
+    def _on_http_manifest_loaded(self, manifest_url: str, result: object) -> None:
+        """Shuffle a manifest's images into the next session, if it is still the one chosen."""
+        if manifest_url != self._manifest_pending:
+            return  # another folder or manifest was chosen meanwhile
+        self._manifest_pending = None
+        start = self._start_when_loaded
+        self._start_when_loaded = False
+        if isinstance(result, Exception):
+            self._show_warning("Warning!", f"Could not load image manifest:\n{result}")
+            return
+
+        self._set_session_images(result)
+        self._http_source.prefetch(self.image_list[:self.HTTP_PREFETCH_COUNT])
+        if start:
+            self._start()
+        elif not self.is_running:
+            self._warm_next_session()
+
+    def _deliver_http_image(self, url: str, local_path: Optional[str]) -> None:
+        """Hand a finished download to the GUI thread (runs on a download thread)."""
+        try:
+            self._http_fetched.emit(url, local_path or "")
+        except RuntimeError:
+            pass  # window already deleted during shutdown
+
+    def _on_http_image_fetched(self, url: str, local_path: str) -> None:
+        """Swap a downloaded image in for its placeholder, and decode downloads coming up next."""
+        if url == self.current_image_path:
+            if local_path:
+                self.canvas.set_image(local_path)
+            else:
+                self.canvas.set_image("", placeholder="Could not download this image")
+        if self.is_running:
+            self._prepare_upcoming()
+
+    def _resolve_image(self, image_path: str) -> Optional[str]:
+        """Local path for an image; None while a URL-backed image is still downloading.
+
+        Never blocks on the network: the download is started, and the image
+        is shown by _on_http_image_fetched when it finishes.
+        """
+        if self._http_source is None or not is_url(image_path):
+            return image_path
+
+        # Keep the next few images downloading while this one is on screen
+        upcoming = self.image_list[self.image_index:self.image_index + self.HTTP_PREFETCH_COUNT]
+        self._http_source.prefetch(upcoming)
+        local_path = self._http_source.cached_path(image_path)
+        if local_path is None:
+            self._http_source.fetch_async(image_path)
+        return local_path
+
+    def _prefetch_decodes(self) -> None:
+        """Start background decodes of the next few images in the sequence."""
+        if self.decode_pool is None:
+            return
+        target = self.canvas.decode_size()
+
+        # Deep through short phases, shallow through long poses
+        self._prefetch_depth = prefetch_depth(
+            self._interval_for, self.image_index, self.remaining_seconds, self.decode_pool.decode_seconds
+        )
+        for image_path in self._upcoming_images():
+            # Only decode downloads that have finished; never block on the network here
+            local_path = self._cached_local_path(image_path)
+            if local_path:
+                self.decode_pool.submit(local_path, target)
+
+    def _upcoming_images(self) -> list[str]:
+        """The images after the current one that are being prefetched."""
+        end = min(self.image_index + self._prefetch_depth, self._session_length())
+        return self.image_list[self.image_index:end]
+
+    def _cached_local_path(self, image_path: str) -> Optional[str]:
+        """Local file for an image, None for a URL that hasn't been downloaded yet."""
+        if not is_url(image_path):
+            return image_path
+        return self._http_source.cached_path(image_path) if self._http_source else None
+
+    def _on_image_decoded(self, image_path: str, decoded: Optional[DecodedImage]) -> None:
+        """Hand a background-decoded image to the canvas cache."""
+        if decoded is None:
+            return
+        if (self.is_running and not self._hibernating) or image_path == self._warm_path:
+            self.canvas.preload(image_path, decoded)
+            # Have the active value filter ready by the time the image is shown
+            if self.value_filter is not None:
+                self.filter_engine.warm(image_path, decoded, [self.value_filter])
+
+    def _session_length(self) -> int:
+        """Number of images the session shows: the whole list, or as many as the schedule runs.
+
+        A sampled session with a schedule counts on drawing as many as it runs.
+        """
+        if self.schedule is not None:
+            if self._sampler is not None:
+                return self.schedule.total_images
+            return min(len(self.image_list), self.schedule.total_images)
+        return len(self.image_list)
+
+    def _interval_for(self, position: int) -> Optional[int]:
+        """Seconds the image at a 0-based session position is shown, None past the end."""
+        if position >= self._session_length():
+            return None
+        if self.schedule is not None:
+            return self.schedule.seconds_for(position)
+        return self.elapse_time_seconds
 
     def _get_next_image(self) -> Optional[str]:
         """Get the next image from the shuffled list.
 
-        Returns None when all images have been shown (no looping).
+        Returns None when all images (or all the schedule's images) have been
+        shown (no looping).
         """
+        self._top_up_sample()
         if not self.image_list:
             return None
 
-        if self.image_index >= len(self.image_list):
+        if self.image_index >= min(self._session_length(), len(self.image_list)):
             # All images have been shown - don't loop
             return None
 
@@ -505,10 +1144,15 @@ class FigureDrawingTool(QWidget):
         self.prev_button.setEnabled(running and len(self.image_history) > 1)
         self.pause_button.setEnabled(running)
         self.browse_button.setEnabled(not running)
+        self.library_button.setEnabled(not running)
+        if self.library_browser is not None:
+            self.library_browser.setEnabled(not running)
         self.image_directory.setEnabled(not running)
         self.image_label.setEnabled(not running)
         self.preset_combo.setEnabled(not running)
         self.subfolders_checkbox.setEnabled(not running)
+        self.sampling_button.setEnabled(not running)
+        self.export_button.setEnabled(not running)
 
         # Spinboxes depend on both running state AND preset selection
         # Only enabled when NOT running AND "Custom" preset is selected
@@ -535,20 +1179,29 @@ class FigureDrawingTool(QWidget):
         # Load images if not already loaded
         if not self.image_list:
             self._load_image_list()
+            if self._manifest_pending is not None:
+                self._start_when_loaded = True  # _on_http_manifest_loaded starts the session
+                return
             if not self.image_list:
                 self._show_warning("Warning!", "No supported images found in the selected directory.")
                 return
 
+        # A fresh session (not a resume after stop) gets its own history number
+        if not self.image_history:
+            self.seen_history.begin_session()
+
         self.is_running = True
         self.is_paused = False
+        self.idle_timer.stop()
+        self._wake()
         self._toggle_controls(running=True)
         self.start_stop_button.setIcon(self._stop_icon)
         self.start_stop_button.setText("Stop")
-        self.start_stop_button.setStyleSheet("background-color: #c0392b; color: #ffffff;")  # Red with white text
+        set_style_state(self.start_stop_button, "state", "running")  # Red with white text
         self.pause_button.setIcon(self._pause_icon)
 
-        # Calculate total time in seconds
-        self.elapse_time_seconds = (self.minutes_spinbox.value() * 60) + self.seconds_spinbox.value()
+        # Calculate total time in seconds, or follow the selected schedule's phases
+        self.schedule, self.elapse_time_seconds = self._session_timing()
         if self.elapse_time_seconds == 0:
             self.elapse_time_seconds = 60  # Default to 1 minute if 0
 
@@ -560,16 +1213,31 @@ class FigureDrawingTool(QWidget):
         # Show first image
         self._cycle_images()
 
-        # Create and start image timer
-        self.image_timer = QTimer()
-        self.image_timer.timeout.connect(self._cycle_images)
+        # Create and start image timer; a coarse timer may fire 5% late,
+        # seconds on a long pose and out of step with a classroom
+        self.image_timer = self.time_source.create_timer()
+        self.image_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.image_timer.timeout.connect(self._on_image_timeout)
         self.image_timer.start(self.elapse_time_seconds * 1000)
+        self._image_deadline = self.time_source.monotonic() + self.elapse_time_seconds
 
         # Create and start countdown timer
-        self.clock_timer = QTimer()
+        self.clock_timer = self.time_source.create_timer()
         self.clock_timer.timeout.connect(self._update_countdown)
         self.clock_timer.start(self.CLOCK_UPDATE_INTERVAL_MS)
 
+    def _session_timing(self) -> tuple[Optional[Schedule], int]:
+        """Schedule (None for a fixed interval) and first interval in seconds for a new session.
+
+        Taken from the time preset, or from the controller when following a classroom.
+        """
+        if self._classroom_timing is not None:
+            return self._classroom_timing
+        data = self.preset_combo.currentData()
+        if isinstance(data, Schedule):
+            return data, data.seconds_for(0)
+        return None, (self.minutes_spinbox.value() * 60) + self.seconds_spinbox.value()
+
     def _stop(self) -> None:
         """Stop the image cycling session."""
         self.is_running = False
@@ -577,7 +1245,7 @@ class FigureDrawingTool(QWidget):
         self._toggle_controls(running=False)
         self.start_stop_button.setIcon(self._play_icon)
         self.start_stop_button.setText("Start")
-        self.start_stop_button.setStyleSheet("background-color: #4a9f4a; color: #ffffff;")  # Green with white text
+        set_style_state(self.start_stop_button, "state", "stopped")  # Green with white text
         self.pause_button.setIcon(self._pause_icon)
 
         if self.image_timer:
@@ -585,7 +1253,11 @@ class FigureDrawingTool(QWidget):
         if self.clock_timer:
             self.clock_timer.stop()
 
+        self._end_view_span()
+        self._save_session_log()
         self._reset_countdown()
+        self.idle_timer.start()
+        self._classroom_state_changed()
 
     def _toggle_pause(self) -> None:
         """Toggle pause state - freezes timer and image."""
@@ -596,18 +1268,26 @@ class FigureDrawingTool(QWidget):
             # Resume
             self.is_paused = False
             self.pause_button.setIcon(self._pause_icon)
-            if self.image_timer:
-                self.image_timer.start(self.remaining_seconds * 1000)
-            if self.clock_timer:
-                self.clock_timer.start(self.CLOCK_UPDATE_INTERVAL_MS)
+            self._view_started = self.time_source.monotonic()
+            self.idle_timer.stop()
+            self._wake()
+            # The countdown only has whole seconds; resume the image to the ms
+            if self._paused_remaining_ms > 0:
+                self._start_timers(self._paused_remaining_ms)
+            else:
+                self._start_timers(self.remaining_seconds * 1000)
         else:
             # Pause
             self.is_paused = True
             self.pause_button.setIcon(self._resume_icon)
+            self._end_view_span()
+            self.idle_timer.start()
             if self.image_timer:
+                self._paused_remaining_ms = self.image_timer.remainingTime()
                 self.image_timer.stop()
             if self.clock_timer:
                 self.clock_timer.stop()
+        self._classroom_state_changed()
 
     def _restart(self) -> None:
         """Reset the session to initial state."""
@@ -621,24 +1301,94 @@ class FigureDrawingTool(QWidget):
         self._toggle_controls(running=False)
         self.start_stop_button.setIcon(self._play_icon)
         self.start_stop_button.setText("Start")
-        self.start_stop_button.setStyleSheet("background-color: #4a9f4a; color: #ffffff;")  # Green with white text
+        set_style_state(self.start_stop_button, "state", "stopped")  # Green with white text
         self.pause_button.setIcon(self._pause_icon)
         self._reset_countdown()
 
         # Reset to start image
         self.canvas.set_image(self.start_image)
 
-        # Reset image list and history for fresh shuffle on next start
+        # Keep the finished session exportable, then reset image list and
+        # history for fresh shuffle on next start
+        self._end_view_span()
+        self._save_session_log()
         self.image_list = []
         self.image_index = 0
+        self._sampler = None
         self.image_history = []
         self.history_index = -1
+        self.image_view_seconds = {}
+        self.current_image_path = None
+        self.schedule = None
+        if self.decode_pool:
+            self.decode_pool.cancel_pending()
+        self.filter_engine.cancel_pending()
+        self.frame_scaler.cancel_pending()
+        self.canvas.prepare_next(None)
+        self.filmstrip_model.cancel_pending()
+        self.idle_timer.start()
         self._update_image_counter()
+        self._update_filmstrip()
+        self._classroom_state_changed()
 
         self.resize(self.DEFAULT_WIDTH, self.DEFAULT_HEIGHT)
 
+    def _start_timers(self, remaining_ms: int, deadline: Optional[float] = None) -> None:
+        """(Re)start the image timer, with the countdown ticking in step with it.
+
+        Does nothing while paused; resuming starts them.
+
+        Args:
+            remaining_ms: Time until the image timer is due
+            deadline: The time_source time it is due, when known more precisely than to the ms
+        """
+        if self.is_paused:
+            return
+        if self.image_timer:
+            self.image_timer.start(remaining_ms)
+            self._image_deadline = deadline if deadline is not None else self.time_source.monotonic() + remaining_ms / 1000
+        if self.clock_timer:
+            # First tick when the countdown's current second runs out
+            self.clock_timer.start(remaining_ms % self.CLOCK_UPDATE_INTERVAL_MS or self.CLOCK_UPDATE_INTERVAL_MS)
+
+    def _hibernate(self) -> None:
+        """Release image caches and pause non-essential wakeups.
+
+        Used while minimized/hidden or after being left paused or stopped for
+        IDLE_HIBERNATE_MS. Only the current downscaled frame is kept.
+        """
+        if self._hibernating:
+            return
+        self._hibernating = True
+        self.idle_timer.stop()
+        self.resource_governor.clear_caches()
+        self.canvas.hibernate()
+
+        # Nobody can see the countdown; the image timer keeps the session on time
+        if (not self.isVisible() or self.isMinimized()) and self.clock_timer and self.clock_timer.isActive():
+            self.clock_timer.stop()
+            self._clock_suspended = True
+
+    def _wake(self) -> None:
+        """Resume wakeups paused by hibernation."""
+        if not self._hibernating:
+            return
+        self._hibernating = False
+
+        if self._clock_suspended:
+            self._clock_suspended = False
+            if self.is_running and not self.is_paused and self.image_timer and self.clock_timer:
+                # Catch the countdown up with the image timer it mirrors
+                remaining_ms = self.image_timer.remainingTime()
+                self.remaining_seconds = math.ceil(remaining_ms / 1000)
+                self._update_clock_display()
+                self._update_clock_color()
+                self.clock_timer.start(remaining_ms % self.CLOCK_UPDATE_INTERVAL_MS or self.CLOCK_UPDATE_INTERVAL_MS)
+
     def _update_countdown(self) -> None:
         """Update the countdown timer (counts DOWN)."""
+        if self.clock_timer and self.clock_timer.interval() != self.CLOCK_UPDATE_INTERVAL_MS:
+            self.clock_timer.start(self.CLOCK_UPDATE_INTERVAL_MS)  # after a partial first second
         self.remaining_seconds -= 1
         if self.remaining_seconds < 0:
             self.remaining_seconds = self.elapse_time_seconds
@@ -660,14 +1410,10 @@ class FigureDrawingTool(QWidget):
         # Green is set at start and when timer resets
 
     def _set_clock_color(self, color: str) -> None:
-        """Set the LCD clock color."""
-        colors = {
-            "green": "#2ecc71",
-            "yellow": "#f1c40f",
-            "red": "#e74c3c",
-            "default": "rgb(202, 207, 210)"  # Match the default text color from dark.qss
-        }
-        self.clock.setStyleSheet(f"color: {colors.get(color, colors['default'])};")
+        """Set the LCD clock color (green, yellow, red or default, see dark.qss)."""
+        if color not in ("green", "yellow", "red"):
+            color = "default"
+        set_style_state(self.clock, "level", color)
 
     def _update_clock_display(self) -> None:
         """Update the LCD display with remaining time."""
@@ -704,8 +1450,11 @@ class FigureDrawingTool(QWidget):
         """
         image_path = self._get_next_image()
         if image_path:
-            self.current_image_path = image_path
-            self.canvas.set_image(image_path)
+            # Reset countdown for new image, to the interval of its schedule phase
+            self.elapse_time_seconds = self._interval_for(self.image_index - 1)
+            self.remaining_seconds = self.elapse_time_seconds
+            self._show_image(image_path)
+            self.seen_history.record(image_path)
 
             # Add to history
             self.image_history.append(image_path)
@@ -714,44 +1463,151 @@ class FigureDrawingTool(QWidget):
             self.history_index = len(self.image_history) - 1
 
             self._update_image_counter()
+            self._update_filmstrip()
             self._update_prev_button()
             self._update_next_button()
 
-            # Reset countdown for new image
-            self.remaining_seconds = self.elapse_time_seconds
             self._update_clock_display()
             self._set_clock_color("green")  # Reset to green for new image
+
+            # Phases change the interval, and a resume left it short; restarting
+            # also keeps the countdown from ticking at the very moment of the switch
+            if self.image_timer and self.image_timer.isActive():
+                self._start_timers(self.elapse_time_seconds * 1000)
+            self._classroom_state_changed()
         else:
             # No more images - stop the session
             self._stop()
 
+    def _on_image_timeout(self) -> None:
+        """Show the next image when the current one's time is up.
+
+        Timers fire a little late, more so on a busy machine; the next
+        deadline counts from when this one was due, so the delays don't add
+        up over a session (and a classroom's followers can count on it).
+        """
+        due = self._image_deadline
+        self._cycle_images()
+        if due is not None and self.is_running and self.image_timer.isActive():
+            deadline = due + self.elapse_time_seconds
+            self._start_timers(max(0, round((deadline - self.time_source.monotonic()) * 1000)), deadline)
+
+    def _show_image(self, image_path: str, backwards: bool = False) -> None:
+        """Display an image on the canvas and start timing how long it is shown."""
+        self._end_view_span()
+        self._paused_remaining_ms = -1
+        self.current_image_path = image_path
+        local_path = self._resolve_image(image_path)
+        if local_path is None:
+            self.canvas.set_image("", backwards, placeholder="Downloading image\u2026")
+        else:
+            self.canvas.set_image(local_path, backwards)
+        if not self.is_paused:
+            self._view_started = self.time_source.monotonic()
+        self._top_up_sample()
+        self._prepare_upcoming()
+
+    def _prepare_upcoming(self) -> None:
+        """Decode the next few images, and have the one the timer moves on to ready to swap in."""
+        self._prefetch_decodes()
+        next_path = None
+        if self.image_index < min(self._session_length(), len(self.image_list)):
+            next_path = self._cached_local_path(self.image_list[self.image_index])
+        self.canvas.prepare_next(next_path)
+
+    def _end_view_span(self) -> None:
+        """Add the time the current image has been on screen to its total."""
+        if self._view_started is not None and self.current_image_path:
+            elapsed = self.time_source.monotonic() - self._view_started
+            path = self.current_image_path
+            self.image_view_seconds[path] = self.image_view_seconds.get(path, 0.0) + elapsed
+        self._view_started = None
+
+    def _session_entries(self) -> list[tuple[str, Optional[float]]]:
+        """Return (local image path, seconds shown) for the current session history."""
+        return [
+            (self._cached_local_path(path) or "", self.image_view_seconds.get(path))
+            for path in self.image_history
+        ]
+
+    def _save_session_log(self) -> None:
+        """Persist the current session so it can be exported after a reset or headless."""
+        if not self.image_history:
+            return
+        settings = QSettings(self.SETTINGS_ORG, self.SETTINGS_APP)
+        settings.setValue("last_session", json.dumps(self._session_entries()))
+
+    def _export_contact_sheet(self) -> None:
+        """Ask for an output file and save a contact sheet of the session in the background."""
+        if self.is_running or not self.export_button.isEnabled():
+            return  # running, or still saving the last one
+
+        entries = self._session_entries() or load_session_log()
+        if not entries:
+            self._show_warning("Warning!", "There is no session to export yet.")
+            return
+
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Save Contact Sheet", "contact_sheet.png",
+            "PNG Image (*.png);;JPEG Image (*.jpg);;PDF Document (*.pdf)"
+        )
+        if not path:
+            return
+
+        self.export_button.setEnabled(False)
+        threading.Thread(
+            target=self._save_contact_sheet, args=(entries, path), name="contact-sheet", daemon=True
+        ).start()
+
+    def _save_contact_sheet(self, entries: list[tuple[str, Optional[float]]], path: str) -> None:
+        """Export a contact sheet and report back to the GUI thread (runs on a worker thread)."""
+        try:
+            export_contact_sheet(entries, path)
+            error = ""
+        except (OSError, ValueError) as e:
+            error = str(e) or type(e).__name__
+        try:
+            self._contact_sheet_saved.emit(path, error)
+        except RuntimeError:
+            pass  # window already deleted during shutdown
+
+    def _on_contact_sheet_saved(self, path: str, error: str) -> None:
+        self.export_button.setEnabled(not self.is_running)
+        if error:
+            self._show_warning("Warning!", f"Could not save contact sheet:\n{error}")
+
+    def _go_to_history(self, index: int) -> None:
+        """Show an image from the session history, with a fresh countdown."""
+        if not self.is_running or not 0 <= index < len(self.image_history):
+            return
+        backwards = index < self.history_index
+        self.history_index = index
+        self._show_image(self.image_history[self.history_index], backwards)
+        self._update_image_counter()
+        self._update_filmstrip()
+        self._update_prev_button()
+        self._update_next_button()
+
+        # Reset countdown for this image
+        self.remaining_seconds = self.elapse_time_seconds
+        self._update_clock_display()
+        self._set_clock_color("green")  # Reset to green
+
+        # Restart the image timer
+        self._start_timers(self.elapse_time_seconds * 1000)
+        self._classroom_state_changed()
+
     def _next(self) -> None:
         """Skip to the next image."""
         # If we're in history, go forward; otherwise get new image
         if self.history_index < len(self.image_history) - 1:
-            self.history_index += 1
-            image_path = self.image_history[self.history_index]
-            self.current_image_path = image_path
-            self.canvas.set_image(image_path)
-            self._update_image_counter()
-            self._update_prev_button()
-            self._update_next_button()
-            self.remaining_seconds = self.elapse_time_seconds
-            self._update_clock_display()
-            self._set_clock_color("green")  # Reset to green
-
-            # Restart the image timer
-            if self.image_timer:
-                self.image_timer.stop()
-                self.image_timer.start(self.elapse_time_seconds * 1000)
-        elif self.image_index < len(self.image_list):
+            self._go_to_history(self.history_index + 1)
+        elif self.image_index < self._session_length():
             # More images available - cycle to next
             self._cycle_images()
 
             # Restart the image timer
-            if self.image_timer:
-                self.image_timer.stop()
-                self.image_timer.start(self.elapse_time_seconds * 1000)
+            self._start_timers(self.elapse_time_seconds * 1000)
         # else: on last image, do nothing (wait for timer to finish)
 
         self.next_button.setFocus()
@@ -759,23 +1615,7 @@ class FigureDrawingTool(QWidget):
     def _previous(self) -> None:
         """Go back to the previous image in history."""
         if self.history_index > 0:
-            self.history_index -= 1
-            image_path = self.image_history[self.history_index]
-            self.current_image_path = image_path
-            self.canvas.set_image(image_path)
-            self._update_image_counter()
-            self._update_prev_button()
-            self._update_next_button()
-
-            # Reset countdown for this image
-            self.remaining_seconds = self.elapse_time_seconds
-            self._update_clock_display()
-            self._set_clock_color("green")  # Reset to green
-
-            # Restart the image timer
-            if self.image_timer:
-                self.image_timer.stop()
-                self.image_timer.start(self.elapse_time_seconds * 1000)
+            self._go_to_history(self.history_index - 1)
 
         self.prev_button.setFocus()
 
@@ -788,7 +1628,7 @@ class FigureDrawingTool(QWidget):
         # Can go next if: in history and not at end, OR more images available
         can_go_next = (
             self.history_index < len(self.image_history) - 1 or
-            self.image_index < len(self.image_list)
+            self.image_index < self._session_length()
         )
         self.next_button.setEnabled(self.is_running and can_go_next)
 
@@ -796,11 +1636,17 @@ class FigureDrawingTool(QWidget):
         """Update the image counter display."""
         if self.image_list:
             current = self.history_index + 1 if self.history_index >= 0 else 0
-            total = len(self.image_list)
+            total = self._session_length()
             self.image_counter_label.setText(f"{current} / {total}")
         else:
             self.image_counter_label.setText("")
 
+    def _update_filmstrip(self) -> None:
+        """Show the history and upcoming images in the filmstrip, marking the current one."""
+        self.filmstrip_model.set_entries(self.image_history, self._upcoming_images())
+        self.filmstrip.set_current(self.history_index)
+        self.filmstrip.setVisible(bool(self.image_history))
+
     def _setup_shortcuts(self) -> None:
         """Setup keyboard shortcuts."""
         # Space - Start/Stop
@@ -827,6 +1673,18 @@ class FigureDrawingTool(QWidget):
         # G - Grayscale
         QShortcut(QKeySequence(Qt.Key.Key_G), self, self._shortcut_grayscale)
 
+        # A - Auto levels
+        QShortcut(QKeySequence(Qt.Key.Key_A), self, self._shortcut_auto_levels)
+
+        # N - Next value-study filter
+        QShortcut(QKeySequence(Qt.Key.Key_N), self, self._cycle_value_filter)
+
+        # L - Library browser
+        QShortcut(QKeySequence(Qt.Key.Key_L), self, self._show_library_browser)
+
+        # E - Export contact sheet
+        QShortcut(QKeySequence(Qt.Key.Key_E), self, self._export_contact_sheet)
+
         # F11 - Fullscreen toggle
         QShortcut(QKeySequence(Qt.Key.Key_F11), self, self._toggle_fullscreen)
 
@@ -858,15 +1716,26 @@ class FigureDrawingTool(QWidget):
         subfolders = settings.value("subfolders", False, type=bool)
         self.subfolders_checkbox.setChecked(subfolders)
 
+        # How far back shown images are kept behind fresh ones (before loading directory)
+        self.seen_sessions = settings.value("seen_sessions", self.DEFAULT_SEEN_SESSIONS, type=int)
+        self.seen_days = settings.value("seen_days", 0, type=float)
+
+        # Whether sessions shuffle every image or sample the folder tree (before loading directory)
+        self._set_sampling_mode(settings.value("sampling_mode", self.SAMPLE_ALL))
+
+        # Library filter, applied when the directory is loaded
+        self.library_filter = settings.value("library_filter", "")
+
         # Restore last directory
         last_dir = settings.value("last_directory", "")
-        if last_dir and os.path.isdir(last_dir):
+        if last_dir and (is_url(last_dir) or os.path.isdir(last_dir) or is_pack(last_dir)):
             self.image_directory.setText(last_dir)
             self._load_image_list()
 
         # Restore preset selection and time settings
         preset_index = settings.value("preset_index", 2, type=int)  # Default to "1 min"
-        self.preset_combo.setCurrentIndex(preset_index)
+        if 0 <= preset_index < self.preset_combo.count():  # schedules may have been removed
+            self.preset_combo.setCurrentIndex(preset_index)
 
         minutes = settings.value("minutes", 1, type=int)
         seconds = settings.value("seconds", 0, type=int)
@@ -876,6 +1745,21 @@ class FigureDrawingTool(QWidget):
         # Apply initial spinbox styling based on loaded preset
         self._apply_spinbox_styling()
 
+        # Decoder backend chosen per format by earlier benchmarks, and
+        # whether background decoding uses threads or processes
+        self.decoders.load_selection_json(settings.value("decoder_selection", ""))
+        self.decode_mode = settings.value("decode_mode", MODE_THREAD)
+
+        # Whether closing the window keeps the tool running in the tray
+        self.keep_in_tray = settings.value("keep_in_tray", False, type=bool)
+
+        # How images switch
+        self._set_transition(settings.value("transition", TRANSITION_CUT))
+
+        # Image cache memory budget
+        budget_mb = settings.value("cache_budget_mb", self.DEFAULT_CACHE_BUDGET_MB, type=int)
+        self.resource_governor.set_budget(budget_mb * 1024 * 1024)
+
     def _save_settings(self) -> None:
         """Save current settings."""
         settings = QSettings(self.SETTINGS_ORG, self.SETTINGS_APP)
@@ -886,14 +1770,375 @@ class FigureDrawingTool(QWidget):
         # Save last directory
         settings.setValue("last_directory", self.image_directory.text())
 
-        # Save subfolder setting
+        # Save subfolder setting and library filter
         settings.setValue("subfolders", self.subfolders_checkbox.isChecked())
+        settings.setValue("library_filter", self.library_filter)
+        settings.setValue("sampling_mode", self.sampling_mode)
 
         # Save preset selection and time settings
         settings.setValue("preset_index", self.preset_combo.currentIndex())
         settings.setValue("minutes", self.minutes_spinbox.value())
         settings.setValue("seconds", self.seconds_spinbox.value())
 
+        # Save how far back shown images are kept behind fresh ones
+        settings.setValue("seen_sessions", self.seen_sessions)
+        settings.setValue("seen_days", self.seen_days)
+
+        # Save decoder benchmark results and background decode mode
+        settings.setValue("decoder_selection", self.decoders.selection_json())
+        settings.setValue("decode_mode", self.decode_mode)
+
+        # Save whether closing keeps the tool running in the tray
+        settings.setValue("keep_in_tray", self.keep_in_tray)
+
+        # Save how images switch
+        settings.setValue("transition", self.canvas.transition)
+
+        # Save image cache memory budget
+        settings.setValue("cache_budget_mb", self.resource_governor.budget_bytes // (1024 * 1024))
+
+    def set_keep_in_tray(self, enabled: bool) -> None:
+        """Choose whether closing the window keeps the tool running in the tray (off by default, remembered)."""
+        self.keep_in_tray = enabled
+        if enabled and self._tray is None and QSystemTrayIcon.isSystemTrayAvailable():
+            self.stay_in_tray()
+        elif not enabled and self._tray is not None:
+            self._tray.hide()
+            self._tray.deleteLater()
+            self._tray = None
+            QApplication.instance().setQuitOnLastWindowClosed(True)
+
+    def stay_in_tray(self) -> None:
+        """Keep running in the system tray when the window is closed, so reopening is instant."""
+        self._tray = QSystemTrayIcon(QIcon(resource_path("figure_drawing_tool_icon.ico")), self)
+        self._tray.setToolTip("Figure Drawing Tool")
+        menu = QMenu(self)
+        menu.addAction("Show", self.reopen)
+        menu.addAction("Quit", self.quit)
+        self._tray.setContextMenu(menu)
+        self._tray.activated.connect(self._on_tray_activated)
+        self._tray.show()
+        QApplication.instance().setQuitOnLastWindowClosed(False)
+
+    def _on_tray_activated(self, reason: QSystemTrayIcon.ActivationReason) -> None:
+        if reason == QSystemTrayIcon.ActivationReason.Trigger:
+            self.reopen()
+
+    def reopen(self) -> None:
+        """Show the window again, in front."""
+        self.showNormal()
+        self.raise_()
+        self.activateWindow()
+
+    def quit(self) -> None:
+        """Close for real, even when kept in the tray."""
+        self._quitting = True
+        self.close()
+        QApplication.quit()
+
+    def _stow(self) -> None:
+        """Hide to the tray, ending the session and getting the next one ready.
+
+        Hiding hibernates, which releases the finished session's images; then
+        the folder is rescanned and the next session's first image decoded,
+        so reopening shows it without scanning or decoding.
+        """
+        self._save_settings()
+        self.leave_classroom()
+        if self.is_running or self.image_history:
+            self._restart()
+        self.hide()
+        # Once the window has closed, not while closing it
+        QTimer.singleShot(0, self._ready_next_session)
+
+    def _ready_next_session(self) -> None:
+        """Rescan the folder and decode the next session's first image, unless reopened meanwhile."""
+        if self.isVisible() or self.is_running:
+            return
+        self._load_image_list()
+        self._warm_next_session()
+
+    def _warm_next_session(self) -> None:
+        """Decode the first image of the next session in the background."""
+        if self.decode_pool is None or self.image_index >= len(self.image_list):
+            return
+        local_path = self._cached_local_path(self.image_list[self.image_index])
+        if local_path:
+            self._warm_path = local_path
+            self.decode_pool.submit(local_path, self.canvas.decode_size())
+
+    def apply_launch_args(self, args: argparse.Namespace, cwd: Optional[str] = None) -> None:
+        """Use the classroom, directory, order and timing given on a command line, unless a session is running."""
+        if self.is_running:
+            return
+        if args.lead:
+            if not self.lead_classroom(args.lead, args.class_port):
+                print(f"Could not open the classroom port {args.class_port}", file=sys.stderr)
+        elif args.follow:
+            if not self.follow_classroom(args.follow, args.class_port):
+                print(f"Could not open the classroom port {args.class_port}", file=sys.stderr)
+        if args.subfolders and not self.subfolders_checkbox.isChecked():
+            # A directory given too is loaded below; don't load the current one first
+            self.subfolders_checkbox.blockSignals(bool(args.dir))
+            self.subfolders_checkbox.setChecked(True)
+            self.subfolders_checkbox.blockSignals(False)
+        if args.dir:
+            directory = args.dir if is_url(args.dir) else os.path.abspath(os.path.join(cwd or os.getcwd(), args.dir))
+            self.image_directory.setText(directory)
+            self._load_image_list()
+        if args.seed is not None:
+            self._order_by_seed(args.seed)
+        if args.dir or args.seed is not None:
+            self._warm_next_session()
+        if args.schedule:
+            try:
+                self._select_schedule(resolve_schedule(args.schedule))
+            except ValueError as e:
+                print(e, file=sys.stderr)
+        elif args.preset:
+            # Exact name first, then the start of one (e.g. a schedule without its phases)
+            index = self.preset_combo.findText(args.preset, Qt.MatchFlag.MatchFixedString)
+            if index < 0:
+                index = self.preset_combo.findText(args.preset, Qt.MatchFlag.MatchStartsWith)
+            if index >= 0:
+                self.preset_combo.setCurrentIndex(index)
+
+    def _order_by_seed(self, seed: int) -> None:
+        """Order the whole (filtered) library by a seed, the order --plan prints for it."""
+        if self._library_root is None:
+            directory = self.image_directory.text()
+            if not directory or is_url(directory) or not (os.path.isdir(directory) or is_pack(directory)):
+                return
+            self._scan_library(directory)  # sampled so far
+        if self.classroom_controller is not None:
+            self._set_classroom_images(seed)
+            return
+        self._sampler = None
+        self.image_list = [
+            full_path(self._library_root, path) for path in session_order(self._library_relative_matches(), seed)
+        ]
+        self.image_index = 0
+
+    def _select_schedule(self, schedule: Schedule) -> None:
+        """Select a schedule in the time presets, adding it if it isn't one of them."""
+        for index in range(self.preset_combo.count()):
+            data = self.preset_combo.itemData(index)
+            if isinstance(data, Schedule) and data.name == schedule.name and data.phases == schedule.phases:
+                break
+        else:
+            self.preset_combo.addItem(schedule.label(), schedule)
+            index = self.preset_combo.count() - 1
+        self.preset_combo.setCurrentIndex(index)
+
+    def lead_classroom(self, room: str, port: int = DEFAULT_PORT) -> bool:
+        """Drive the instances following a classroom with this one's sessions.
+
+        Returns:
+            False if the network socket couldn't be opened
+        """
+        self.leave_classroom()
+        controller = ClassroomController(room, self.time_source, port=port, parent=self)
+        if not controller.start():
+            controller.deleteLater()
+            return False
+        controller.followers_changed.connect(self._update_classroom_title)
+        self.classroom_controller = controller
+        if not self.is_running and not self.image_history:
+            self._load_image_list()  # reorder by a seed followers can repeat
+        self._update_classroom_title()
+        return True
+
+    def follow_classroom(self, room: str, port: int = DEFAULT_PORT) -> bool:
+        """Show the images of a classroom's controller, switching when it does.
+
+        Returns:
+            False if the network socket couldn't be opened
+        """
+        self.leave_classroom()
+        follower = ClassroomFollower(room, self.time_source, port=port, parent=self)
+        if not follower.start():
+            follower.deleteLater()
+            return False
+        follower.state_received.connect(self._on_classroom_state)
+        self.classroom_follower = follower
+        self._update_classroom_title()
+        return True
+
+    def leave_classroom(self) -> None:
+        """Stop leading or following a classroom; a led session is ended for followers."""
+        if self.classroom_controller is not None:
+            self._classroom_publish_timer.stop()
+            self.classroom_controller.stop()
+            self.classroom_controller.deleteLater()
+            self.classroom_controller = None
+        if self.classroom_follower is not None:
+            self.classroom_follower.stop()
+            self.classroom_follower.deleteLater()
+            self.classroom_follower = None
+        self._classroom_seed = None
+        self._classroom_timing = None
+        self._update_classroom_title()
+
+    def _update_classroom_title(self, followers: int = 0) -> None:
+        title = "Figure Drawing Tool"
+        if self.classroom_controller is not None:
+            title += f" - leading {self.classroom_controller.room}"
+            if followers:
+                title += f" ({followers} following)"
+        elif self.classroom_follower is not None:
+            title += f" - following {self.classroom_follower.room}"
+        self.setWindowTitle(title)
+
+    def _sequence_position(self) -> int:
+        """Position in image_list of the image on screen, -1 before the first."""
+        return self.image_index - len(self.image_history) + self.history_index
+
+    def _classroom_state_changed(self) -> None:
+        """Send the session state to followers once the current change is complete."""
+        if self.classroom_controller is not None:
+            self._classroom_publish_timer.start(0)
+
+    def _publish_classroom_state(self) -> None:
+        """Send followers what they need to show the same image until the same moment."""
+        if self.classroom_controller is None or self._classroom_seed is None:
+            return  # e.g. a session from a manifest URL: followers can't repeat it
+        deadline = remaining_ms = None
+        if self.is_running and self.is_paused:
+            remaining_ms = self._paused_remaining_ms if self._paused_remaining_ms > 0 else self.remaining_seconds * 1000
+        elif self.is_running and self.image_timer and self.image_timer.isActive():
+            deadline = self._image_deadline
+        self.classroom_controller.publish({
+            "seed": self._classroom_seed,
+            "library": self._classroom_library,
+            "filter": self.library_filter,
+            "subfolders": self.subfolders_checkbox.isChecked(),
+            "schedule": self.schedule.spec() if self.schedule else None,
+            "interval": self.elapse_time_seconds,
+            "running": self.is_running,
+            "paused": self.is_paused,
+            "position": self._sequence_position(),
+            "next": self.image_index,
+            "remaining_ms": remaining_ms,
+            "deadline": deadline,
+        })
+
+    def _on_classroom_state(self, state: dict) -> None:
+        """Follow the classroom controller: the same image, switched at the same moment.
+
+        Between messages the session runs on its own timer, aimed at the
+        controller's deadline, so switches don't wait for the network.
+        """
+        try:
+            seed, position = int(state["seed"]), int(state["position"])
+            next_index = int(state.get("next", position + 1))  # the new image the controller shows next
+        except (KeyError, TypeError, ValueError):
+            return
+        if seed == self._classroom_rejected_seed:
+            return
+        if not state.get("running"):
+            if self.is_running:
+                self._stop()
+            elif seed != self._classroom_seed and self._prepare_classroom_session(state):
+                self._warm_next_session()  # the controller's next session: have its first image ready
+            return
+        if (seed != self._classroom_seed or not self.image_list) and not self._prepare_classroom_session(state):
+            return
+        if not 0 <= position < self._session_length():
+            return
+
+        now = self.time_source.monotonic()
+        deadline = state.get("deadline")
+        image_path = self.image_list[position]
+        if not self.is_running:
+            self.image_index = position
+            self._start()
+        elif image_path != self.current_image_path:
+            # Sent just before the controller switched, and we've switched on our own since
+            moved_on = next_index < len(self.image_list) and self.current_image_path == self.image_list[next_index]
+            if moved_on and deadline is not None and deadline <= now + self.CLASSROOM_STALE_MS / 1000:
+                return
+            self._show_position(position)
+        if not self.is_running:
+            return
+        # After a switch of our own raced a step back, the next new image is still the controller's
+        self.image_index = max(position + 1, min(next_index, self._session_length()))
+
+        if bool(state.get("paused")) != self.is_paused:
+            self._toggle_pause()
+        if self.is_paused:
+            self._paused_remaining_ms = int(state.get("remaining_ms") or 0)
+            self.remaining_seconds = math.ceil(self._paused_remaining_ms / 1000)
+            self._update_clock_display()
+            self._update_clock_color()
+        elif deadline is not None and self.image_timer:
+            if self._image_deadline is None or abs(self._image_deadline - deadline) * 1000 > self.CLASSROOM_TOLERANCE_MS:
+                remaining_ms = max(0, round((deadline - now) * 1000))
+                self.remaining_seconds = math.ceil(remaining_ms / 1000)
+                self._update_clock_display()
+                self._update_clock_color()
+                self._start_timers(remaining_ms, deadline)
+
+    def _prepare_classroom_session(self, state: dict) -> bool:
+        """Get the controller's image order and timing ready from its state.
+
+        Returns:
+            False if this machine can't follow the session (the user is told why)
+        """
+        seed = int(state["seed"])
+        directory = self.image_directory.text()
+        if not directory or is_url(directory) or not (os.path.isdir(directory) or is_pack(directory)):
+            self._reject_classroom_session(seed, "Choose the class's image folder to follow the class.")
+            return False
+        try:
+            schedule = Schedule.parse("Class", state["schedule"]) if state.get("schedule") else None
+            interval = schedule.seconds_for(0) if schedule else int(state["interval"])
+        except (KeyError, TypeError, ValueError):
+            self._reject_classroom_session(seed, "The class uses a schedule this version can't read.")
+            return False
+
+        if self.is_running or self.image_history:
+            self._restart()
+        self.library_filter = str(state.get("filter") or "")
+        self.subfolders_checkbox.setChecked(bool(state.get("subfolders")))
+        self._load_image_list()
+        self._set_classroom_images(seed)
+        if self._classroom_library != state.get("library"):
+            self._reject_classroom_session(
+                seed,
+                f"The images in {directory} aren't the ones the class uses. "
+                "Copy the class's folder to this computer and choose it to follow the class."
+            )
+            return False
+        self._classroom_timing = (schedule, interval)
+        return True
+
+    def _reject_classroom_session(self, seed: int, message: str) -> None:
+        """Sit out a classroom session, saying why once rather than on every heartbeat."""
+        self._classroom_rejected_seed = seed
+        self._classroom_seed = None
+        self.image_list = []
+        self._show_warning("Classroom", message)
+
+    def _show_position(self, position: int) -> None:
+        """Show the image at a position of the session, from the history if it was shown already."""
+        image_path = self.image_list[position]
+        for index in range(len(self.image_history) - 1, -1, -1):
+            if self.image_history[index] == image_path:
+                self._go_to_history(index)
+                return
+        self.image_index = position
+        self._cycle_images()
+
+    def _on_launch_message(self, message: dict) -> None:
+        """Handle a later launch of the tool: take its arguments and come to the front."""
+        argv = message.get("argv", [])
+        if isinstance(argv, list):
+            args = _parse_args([str(arg) for arg in argv])
+            if args.tray is not None:
+                self.set_keep_in_tray(args.tray)
+            self.apply_launch_args(args, message.get("cwd"))
+        self.reopen()
+
     def mousePressEvent(self, event: QMouseEvent) -> None:
         """Clear focus from input widgets when clicking on empty areas."""
         focused_widget = QApplication.focusWidget()
@@ -901,85 +2146,362 @@ class FigureDrawingTool(QWidget):
             focused_widget.clearFocus()
         super().mousePressEvent(event)
 
+    def changeEvent(self, event: QEvent) -> None:
+        """Hibernate while minimized."""
+        if event.type() == QEvent.Type.WindowStateChange:
+            if self.isMinimized():
+                self._hibernate()
+            else:
+                self._wake()
+        super().changeEvent(event)
+
+    def hideEvent(self, event: QHideEvent) -> None:
+        """Hibernate while hidden."""
+        self._hibernate()
+        super().hideEvent(event)
+
+    def showEvent(self, event: QShowEvent) -> None:
+        """Wake from hibernation when shown again."""
+        self._wake()
+        super().showEvent(event)
+
     def closeEvent(self, event: QCloseEvent) -> None:
-        """Clean up timers and save settings on close."""
+        """Clean up timers and save settings on close, or stay in the tray."""
+        if self._tray is not None and not self._quitting:
+            event.ignore()
+            self._stow()
+            return
+
         self._save_settings()
+        self._end_view_span()
+        self._save_session_log()
 
         if self.image_timer:
             self.image_timer.stop()
         if self.clock_timer:
             self.clock_timer.stop()
+        self.idle_timer.stop()
+        if self.decode_pool:
+            self.decode_pool.shutdown()
+        self.filter_engine.shutdown()
+        self.frame_scaler.shutdown()
+        self.filmstrip_model.shutdown()
+        self.leave_classroom()
+        if self._http_source:
+            self._http_source.close()
+        self.seen_history.close()
+        if self._tree_counts is not None:
+            self._tree_counts.save()
+        if self._tray is not None:
+            self._tray.hide()
         super().closeEvent(event)
 
 
 class Label(QLabel):
-    """Custom QLabel with aspect-ratio preserving image scaling, caching, flip, and grayscale."""
-
-    def __init__(self, img_path: str) -> None:
+    """Custom QLabel with aspect-ratio preserving image scaling, caching, flip, grayscale and auto levels.
+
+    The frame of the image coming up next is rendered ahead of time on the
+    frame scaler's thread (see prepare_next), and set_image swaps it in and
+    animates the transition to it.
+    """
+
+    def __init__(
+        self,
+        img_path: str,
+        governor: Optional[ResourceGovernor] = None,
+        decoders: Optional[DecoderRegistry] = None,
+    ) -> None:
         super().__init__()
         self.setFrameStyle(QFrame.Shape.StyledPanel)
-        self._source_pixmap: QPixmap = QPixmap(img_path)
-        self._processed_pixmap: Optional[QPixmap] = None
-        self._scaled_pixmap: Optional[QPixmap] = None
+        self._image_path: str = img_path
+        self._placeholder: str = ""  # shown instead of an empty image
+        self._source: Optional[DecodedImage] = None
+        self._processed_image: Optional[QImage] = None
         self._last_size: Optional[QSize] = None
+
+        # Scaled frames in physical pixels, per device pixel ratio, so moving
+        # between screens reuses each screen's frame instead of rescaling
+        self._scaled_frames: dict[float, QImage] = {}
+        self._decode_size: Optional[QSize] = None  # screen size sources were decoded for
+        self._screen_signal_connected: bool = False
         self._flip_h: bool = False
         self._flip_v: bool = False
         self._grayscale: bool = False
+        self._auto_levels: bool = False  # applied to the plain image, not value studies
+        self._value_filter: Optional[str] = None
+        self._filtered_image: Optional[QImage] = None  # owned by the filter engine's cache
+        self._decoders: Optional[DecoderRegistry] = decoders
+        self.decode_pool: Optional[DecodePool] = None
+        self.filter_engine: Optional[FilterEngine] = None
+        self.frame_scaler: Optional[FrameScaler] = None
+
+        # Back buffer: the next image's frame, rendered off the GUI thread
+        self._next_path: Optional[str] = None
+        self._back: Optional[FrameJob] = None
+
+        # Transition from the outgoing frame to the new one
+        self.transition: str = TRANSITION_CUT
+        self._outgoing: Optional[QImage] = None
+        self._backwards: bool = False
+        self._animation = QVariantAnimation(self)
+        self._animation.setStartValue(0.0)
+        self._animation.setEndValue(1.0)
+        self._animation.setDuration(DEFAULT_TRANSITION_MS)
+        self._animation.setEasingCurve(QEasingCurve.Type.OutCubic)
+        self._animation.valueChanged.connect(lambda value: self.update())
+        self._animation.finished.connect(self._end_transition)
+
+        # Recently shown and prefetched sources, so stepping through history
+        # and reaching a prefetched image skip decoding
+        self._source_cache: LruCache[DecodedImage] = LruCache(
+            lambda decoded: decoded.nbytes, governor, name="source"
+        )
+        if governor is not None:
+            governor.register_pinned(self._working_bytes)
 
-    def set_image(self, img_path: str) -> None:
-        """Set a new image (reuses widget instead of recreating)."""
-        self._source_pixmap = QPixmap(img_path)
+    def set_image(self, img_path: str, backwards: bool = False, placeholder: str = "") -> None:
+        """Set a new image (reuses widget instead of recreating).
+
+        A frame prepared for it is swapped in as is; otherwise decoding
+        happens on first paint, so images set while hidden are never decoded.
+
+        Args:
+            img_path: Image to show
+            backwards: Going back in the session; a slide comes in from the left
+            placeholder: Text shown while the image is empty, e.g. while it downloads
+        """
+        dpr = self.devicePixelRatioF()
+        outgoing = self._scaled_frames.get(dpr)
+        back = self._back
+        self._image_path = img_path
+        self._placeholder = placeholder
+        self._source = None
+        self._back = None
         self._invalidate_cache()
+        if back is not None and back.key == self._frame_key(img_path):
+            # Swap: the frame was rendered for this size and these settings
+            self._source = back.source
+            self._scaled_frames[dpr] = back.frame
+            self._last_size = self.size()
+            if self._value_filter is not None and self.filter_engine is not None:
+                self._filtered_image = self.filter_engine.get(img_path, self._value_filter)
+
+        self._animation.stop()
+        self._outgoing = None
+        if self.transition != TRANSITION_CUT and outgoing is not None and self.isVisible():
+            self._outgoing = outgoing
+            self._backwards = backwards
+            self._animation.start()
         self.update()
 
+    def prepare_next(self, img_path: Optional[str]) -> None:
+        """Render the frame of the image shown next ahead of time, once it is decoded."""
+        if img_path != self._next_path:
+            self._next_path = img_path
+            self._back = None
+        self._request_next_frame()
+
+    def _frame_key(self, img_path: str) -> tuple:
+        """What a frame of the image depends on, to tell whether a prepared one still fits."""
+        return (
+            img_path, self.size(), self.devicePixelRatioF(), self._grayscale, self._flip_h, self._flip_v,
+            self._value_filter, self._levels_applied(),
+        )
+
+    def _levels_applied(self) -> bool:
+        """Whether frames get auto levels: value studies set their own tones."""
+        return self._auto_levels and self._value_filter is None
+
+    def _request_next_frame(self) -> None:
+        """Have the frame scaler render the next image's frame, if its pixels are ready."""
+        path = self._next_path
+        if path is None or self.frame_scaler is None or path == self._image_path:
+            return
+        key = self._frame_key(path)
+        if self._back is not None and self._back.key == key:
+            return
+        self._back = None
+        source = self._source_cache.get(path)
+        if source is None or self.width() <= 0 or self.height() <= 0:
+            return  # requested again from preload
+        image = source.image
+        if self._value_filter is not None and self.filter_engine is not None:
+            image = self.filter_engine.get(path, self._value_filter)
+            if image is None:
+                return  # requested again from on_filter_ready
+        dpr = self.devicePixelRatioF()
+        physical_size = QSize(round(self.width() * dpr), round(self.height() * dpr))
+        self.frame_scaler.request(FrameJob(
+            key, path, source, image, physical_size, dpr, self._grayscale, self._flip_h, self._flip_v,
+            self._levels_applied()
+        ))
+
+    def on_frame_ready(self, job: FrameJob) -> None:
+        """Keep a rendered frame as the back buffer, if it still fits the next image."""
+        if job.path == self._next_path and job.key == self._frame_key(job.path):
+            self._back = job
+
+    def _end_transition(self) -> None:
+        self._outgoing = None
+        self.update()
+
+    def preload(self, img_path: str, decoded: DecodedImage) -> None:
+        """Cache an image decoded in the background for a later set_image."""
+        if img_path not in self._source_cache:
+            self._source_cache.put(img_path, decoded)
+        if img_path == self._next_path:
+            self._request_next_frame()
+
+    def hibernate(self) -> None:
+        """Release decoded images, keeping only the current scaled frame."""
+        self._source_cache.clear()
+        self._source = None
+        self._processed_image = None
+        current = self._scaled_frames.get(self.devicePixelRatioF())
+        self._scaled_frames = {self.devicePixelRatioF(): current} if current is not None else {}
+        self._back = None
+        self._animation.stop()
+        self._outgoing = None
+
+    def _working_bytes(self) -> int:
+        """Bytes held by the processed image, scaled frames in use, back buffer and outgoing frame."""
+        processed = self._processed_image
+        if (self._source is not None and processed is self._source.image) or processed is self._filtered_image:
+            processed = None  # Already counted by the source or filter cache
+        back = self._back.frame if self._back is not None else None
+        return (
+            image_bytes(processed) + sum(image_bytes(frame) for frame in self._scaled_frames.values())
+            + image_bytes(back) + image_bytes(self._outgoing)
+        )
+
     def set_flip(self, horizontal: bool, vertical: bool) -> None:
         """Set flip state."""
         if self._flip_h != horizontal or self._flip_v != vertical:
             self._flip_h = horizontal
             self._flip_v = vertical
             self._invalidate_cache()
+            self._request_next_frame()
             self.update()
 
     def set_grayscale(self, enabled: bool) -> None:
         """Set grayscale mode."""
         if self._grayscale != enabled:
             self._grayscale = enabled
+            self._invalidate_cache()
+            self._request_next_frame()
+            self.update()
+
+    def set_auto_levels(self, enabled: bool) -> None:
+        """Stretch each image's tones to full contrast by its levels table."""
+        if self._auto_levels != enabled:
+            self._auto_levels = enabled
+            self._invalidate_cache()
+            self._request_next_frame()
+            self.update()
+
+    def set_value_filter(self, name: Optional[str]) -> None:
+        """Show a value-study filter of the image (a FILTERS name), or None for the image itself."""
+        if self._value_filter != name:
+            self._value_filter = name
+            self._invalidate_cache()
+            self._request_next_frame()
+            self.update()
+            # Compute the other filters in the background so switching between them is instant
+            if name is not None and self.filter_engine is not None and self._source is not None:
+                self.filter_engine.warm(self._image_path, self._source, [f for f in FILTERS if f != name])
+
+    def on_filter_ready(self, img_path: str, name: str) -> None:
+        """Repaint when the filter being waited for has been computed, or render the next frame with it."""
+        if img_path == self._image_path and name == self._value_filter and self._filtered_image is None:
             self._invalidate_cache()
             self.update()
+        elif img_path == self._next_path and name == self._value_filter:
+            self._request_next_frame()
 
     def _invalidate_cache(self) -> None:
-        """Invalidate all cached pixmaps."""
-        self._processed_pixmap = None
-        self._scaled_pixmap = None
-
-    def _get_processed_pixmap(self) -> QPixmap:
-        """Get the processed pixmap (with flip/grayscale applied)."""
-        if self._processed_pixmap is None:
-            pixmap = self._source_pixmap
-
-            # Apply grayscale
-            if self._grayscale:
-                image = pixmap.toImage()
-                gray_image = image.convertToFormat(image.Format.Format_Grayscale8)
-                pixmap = QPixmap.fromImage(gray_image)
-
-            # Apply flip transformations
-            if self._flip_h or self._flip_v:
-                transform = QTransform()
-                if self._flip_h:
-                    transform.scale(-1, 1)
-                if self._flip_v:
-                    transform.scale(1, -1)
-                pixmap = pixmap.transformed(transform)
-
-            self._processed_pixmap = pixmap
-
-        return self._processed_pixmap
+        """Invalidate the processed image and scaled frames."""
+        self._processed_image = None
+        self._filtered_image = None
+        self._scaled_frames.clear()
+
+    def _get_source(self) -> DecodedImage:
+        """Get the decoded source, from the cache, a pending prefetch, or a decode."""
+        if self._source is None:
+            path = self._image_path
+            decoded = self._source_cache.get(path)
+            if decoded is None:
+                if self.decode_pool is not None:
+                    decoded = self.decode_pool.wait(path)
+                if decoded is None:
+                    if self._decoders is not None:
+                        self._decode_size = self.decode_size()
+                        decoded = DecodedImage(self._decoders.decode(path, self._decode_size))
+                    else:
+                        decoded = DecodedImage(QImage(path))
+                self._source_cache.put(path, decoded)
+            self._source = decoded
+        return self._source
+
+    def decode_size(self) -> QSize:
+        """Largest size the canvas can show: its screen, in physical pixels.
+
+        Sources are decoded reduced to this, which lets decoders skip work
+        (e.g. JPEG DCT scaling) and keeps cached sources small.
+        """
+        screen = self.screen()
+        return screen.size() * screen.devicePixelRatio()
+
+    def showEvent(self, event: QShowEvent) -> None:
+        """Start following the screen the window is on."""
+        super().showEvent(event)
+        if self._decode_size is None:
+            self._decode_size = self.decode_size()
+        handle = self.window().windowHandle()
+        if handle is not None and not self._screen_signal_connected:
+            handle.screenChanged.connect(self._on_screen_changed)
+            self._screen_signal_connected = True
+
+    def _on_screen_changed(self, screen: QScreen) -> None:
+        """Re-decode sources if the new screen shows more pixels than they were decoded for.
+
+        Scaled frames need no invalidation: they're kept per device pixel
+        ratio and paintEvent picks the one for the current screen.
+        """
+        new_size = screen.size() * screen.devicePixelRatio()
+        old_size = self._decode_size
+        self._decode_size = new_size
+        if old_size is not None and (new_size.width() > old_size.width() or new_size.height() > old_size.height()):
+            self._source_cache.clear()
+            self._source = None
+            self._invalidate_cache()
+        self._request_next_frame()
+        self.update()
+
+    def _get_processed_image(self) -> QImage:
+        """Get the processed image (with value filter, grayscale and flip applied)."""
+        if self._processed_image is None:
+            # Keep the DecodedImage referenced while its pixels are in use
+            source = self._get_source()
+            image = source.image
+
+            # Apply the value filter; until it's computed, show the image as is
+            if self._value_filter is not None and self.filter_engine is not None:
+                self._filtered_image = self.filter_engine.request(self._image_path, source, self._value_filter)
+                if self._filtered_image is not None:
+                    image = self._filtered_image
+
+            # Apply grayscale and flips (as the frame scaler does for prepared frames)
+            self._processed_image = process_image(image, self._grayscale, self._flip_h, self._flip_v)
+
+        return self._processed_image
 
     def resizeEvent(self, event: QResizeEvent) -> None:
-        """Invalidate scaled pixmap on resize."""
-        self._scaled_pixmap = None
+        """Invalidate scaled frames on resize, and render the next frame for the new size."""
+        self._scaled_frames.clear()
+        self._animation.stop()
+        self._outgoing = None
         super().resizeEvent(event)
+        self._request_next_frame()
 
     def mousePressEvent(self, event: QMouseEvent) -> None:
         """Clear focus from input widgets when clicking on the canvas."""
@@ -989,30 +2511,220 @@ class Label(QLabel):
         super().mousePressEvent(event)
 
     def paintEvent(self, event: QPaintEvent) -> None:
-        """Paint the image centered and scaled to fit."""
+        """Paint the image centered and scaled to fit, sharp at any device pixel ratio."""
+        if not self._image_path:
+            # No image yet, e.g. while it downloads
+            if self._placeholder:
+                QPainter(self).drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, self._placeholder)
+            return
         size = self.size()
-        processed = self._get_processed_pixmap()
-
-        # Only rescale if size changed (caching optimization)
-        if self._scaled_pixmap is None or self._last_size != size:
-            self._scaled_pixmap = processed.scaled(
-                size,
-                Qt.AspectRatioMode.KeepAspectRatio,
-                Qt.TransformationMode.SmoothTransformation
-            )
+        dpr = self.devicePixelRatioF()
+        if self._last_size != size:
+            self._scaled_frames.clear()
             self._last_size = size
+        physical_size = QSize(round(size.width() * dpr), round(size.height() * dpr))
+
+        # Only rescale if size or screen changed (caching optimization)
+        frame = self._scaled_frames.get(dpr)
+        if frame is None:
+            frame = scale_frame(self._get_processed_image(), physical_size, dpr)
+            if self._levels_applied():
+                apply_levels(frame, self._get_source().levels)
+            self._scaled_frames[dpr] = frame
 
         painter = QPainter(self)
-        x = (size.width() - self._scaled_pixmap.width()) // 2
-        y = (size.height() - self._scaled_pixmap.height()) // 2
-        painter.drawPixmap(x, y, self._scaled_pixmap)
+        if self._outgoing is not None:
+            background = self.palette().color(self.backgroundRole())
+            paint_transition(
+                painter, self.transition, self._animation.currentValue(), self._outgoing, frame,
+                physical_size, dpr, background, self._backwards
+            )
+        else:
+            painter.drawImage(frame_origin(frame, physical_size, dpr), frame)
+
+
+def _positive_int(text: str) -> int:
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, not {value}")
+    return value
+
+
+def _parse_args(argv: list[str]) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Figure Drawing Tool")
+    parser.add_argument(
+        "--contact-sheet", metavar="OUTPUT",
+        help="export a contact sheet (.png/.jpg or .pdf) of the last session and exit"
+    )
+    parser.add_argument("--columns", type=_positive_int, default=DEFAULT_COLUMNS, help="contact sheet columns")
+    parser.add_argument("--tile-size", type=_positive_int, default=DEFAULT_TILE_SIZE, help="contact sheet tile size")
+    parser.add_argument("--dir", help="image folder, reference pack or manifest URL to use")
+    parser.add_argument("--subfolders", action="store_true", help="include images in subfolders")
+    parser.add_argument(
+        "--seed", type=int,
+        help="order the images by this seed, as --plan prints it (the window applies its library filter first)"
+    )
+    parser.add_argument("--preset", help='interval preset or schedule name, e.g. "1 min" or "Class"')
+    parser.add_argument("--schedule", help='schedule name or phases, e.g. "Class" or "10x30s, 5x1m"')
+    parser.add_argument("--plan", action="store_true", help="print the ordered session for --dir and exit")
+    parser.add_argument(
+        "--profile-library", action="store_true",
+        help="scan, check and sample-decode --dir, report speed and memory use, and exit"
+    )
+    parser.add_argument(
+        "--screen", type=parse_size, default=QSize(1920, 1080),
+        help="screen size in physical pixels that --profile-library decodes for (default 1920x1080)"
+    )
+    parser.add_argument("--samples", type=_positive_int, default=20, help="files per format --profile-library decodes")
+    parser.add_argument(
+        "--tray", action=argparse.BooleanOptionalAction,
+        help="keep running in the system tray when the window is closed, so reopening is instant (remembered)"
+    )
+    parser.add_argument(
+        "--new-instance", action="store_true",
+        help="start a separate instance instead of handing over to a running one"
+    )
+    parser.add_argument("--lead", metavar="ROOM", help="drive the instances following ROOM on the local network")
+    parser.add_argument("--follow", metavar="ROOM", help="show the images of ROOM's leading instance")
+    parser.add_argument("--class-port", type=int, default=DEFAULT_PORT, help="UDP port of the classroom")
+    args, _ = parser.parse_known_args(argv)  # leave Qt's own arguments alone
+    return args
+
+
+def _export_last_session(args: argparse.Namespace) -> int:
+    """Export a contact sheet of the last session without opening a window."""
+    entries = load_session_log()
+    if not entries:
+        print("No saved session to export.", file=sys.stderr)
+        return 1
+    try:
+        export_contact_sheet(entries, args.contact_sheet, columns=args.columns, tile_size=args.tile_size)
+    except (OSError, ValueError) as e:
+        print(f"Could not save contact sheet: {e}", file=sys.stderr)
+        return 1
+    print(args.contact_sheet)
+    return 0
+
+
+def _headless_library(args: argparse.Namespace) -> Optional[tuple[str, set[str]]]:
+    """The local folder or pack given by --dir and the image extensions the decoders read, None if unusable."""
+    if not args.dir or is_url(args.dir):
+        print("Give a local image folder or reference pack with --dir.", file=sys.stderr)
+        return None
+    directory = os.path.abspath(args.dir)
+    if not (os.path.isdir(directory) or is_pack(directory)):
+        print(f"{directory} is not a folder or reference pack.", file=sys.stderr)
+        return None
+    return directory, DecoderRegistry.with_available_backends().extensions()
+
+
+def _plan_session(args: argparse.Namespace) -> int:
+    """Print the images of a session in order, with when each is shown, without opening a window.
+
+    The order is the seed's shuffle of the library, as --seed gives in the
+    window and as a classroom shows it.
+    """
+    library = _headless_library(args)
+    if library is None:
+        return 1
+    directory, extensions = library
+
+    schedule, interval = None, 60  # the window's default preset
+    try:
+        if args.schedule:
+            schedule = resolve_schedule(args.schedule)
+        elif args.preset:
+            presets = {label.casefold(): minutes * 60 + seconds for label, (minutes, seconds) in
+                       FigureDrawingTool.INTERVAL_PRESETS}
+            interval = presets.get(args.preset.strip().casefold())
+            if interval is None:
+                schedule = resolve_schedule(args.preset)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    try:
+        relative_paths = list_images(directory, extensions, args.subfolders)
+    except (OSError, PackError) as e:
+        print(f"Could not open reference pack: {e}", file=sys.stderr)
+        return 1
+    if not relative_paths:
+        print(f"No supported images found in {directory}.", file=sys.stderr)
+        return 1
+
+    seed = args.seed if args.seed is not None else random.getrandbits(32)
+    order = session_order(relative_paths, seed)
+    timing = schedule.label() if schedule is not None else f"{format_seconds(interval)} per image"
+    print(f"# {directory}: {len(relative_paths)} images, seed {seed}, {timing}")
+    if schedule is not None:
+        if schedule.total_images > len(order):
+            print(f"# the schedule has {schedule.total_images} images; the session ends after {len(order)}")
+        order = order[:schedule.total_images]
+    start = 0
+    for index, relative_path in enumerate(order):
+        seconds = schedule.seconds_for(index) if schedule is not None else interval
+        print(f"{index + 1}\t{format_duration(start)}\t{format_seconds(seconds)}\t{full_path(directory, relative_path)}")
+        start += seconds
+    return 0
+
+
+def _profile_library(args: argparse.Namespace) -> int:
+    """Report how fast a library scans and decodes and the memory it needs, without opening a window."""
+    library = _headless_library(args)
+    if library is None:
+        return 1
+    directory, extensions = library
+
+    # The decoder selection and cache budget the window would use
+    settings = QSettings(FigureDrawingTool.SETTINGS_ORG, FigureDrawingTool.SETTINGS_APP)
+    registry = DecoderRegistry.with_available_backends()
+    registry.load_selection_json(settings.value("decoder_selection", ""))
+    budget_mb = settings.value("cache_budget_mb", FigureDrawingTool.DEFAULT_CACHE_BUDGET_MB, type=int)
+    try:
+        profile = profile_library(
+            directory, extensions, registry, args.screen, recursive=args.subfolders,
+            samples_per_format=args.samples, cache_budget_bytes=budget_mb * 1024 * 1024,
+            rng=random.Random(args.seed)
+        )
+    except (OSError, PackError) as e:
+        print(f"Could not open reference pack: {e}", file=sys.stderr)
+        return 1
+    print(profile.report())
+    return 0
 
 
 def main() -> None:
+    args = _parse_args(sys.argv[1:])
+    if args.contact_sheet or args.profile_library or args.plan:
+        # Commands that don't open a window
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        app = QGuiApplication(sys.argv[:1])  # needed for fonts and image plugins
+        if args.contact_sheet:
+            status = _export_last_session(args)
+        elif args.profile_library:
+            status = _profile_library(args)
+        else:
+            status = _plan_session(args)
+        del app
+        sys.exit(status)
+
+    # A running instance takes over this launch, which skips starting Qt,
+    # building the window and rescanning the library
+    if not args.new_instance and send_to_running_instance({"argv": sys.argv[1:], "cwd": os.getcwd()}):
+        sys.exit(0)
+
     app = QApplication(sys.argv)
     tool = FigureDrawingTool()
+    if not args.new_instance:
+        server = InstanceServer(parent=tool)
+        if server.listen():
+            server.message_received.connect(tool._on_launch_message)
+            tool.set_keep_in_tray(tool.keep_in_tray if args.tray is None else args.tray)
+    tool.apply_launch_args(args)
     sys.exit(app.exec())
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # process-pool decoding in frozen builds
     main()
@@ -8,11 +8,13 @@ a = Analysis(['figure_drawing_tool.py'],
              datas=[
                  ('start_image.jpg', '.'),
                  ('dark.qss', '.'),
+                 ('figure_drawing_tool_icon.ico', '.'),
              ],
              hiddenimports=[
                  'PySide6.QtCore',
                  'PySide6.QtGui',
                  'PySide6.QtWidgets',
+                 'PySide6.QtNetwork',
              ],
              hookspath=[],
              runtime_hooks=[],
@@ -0,0 +1,223 @@
+"""
+Session filmstrip for the Figure Drawing Tool.
+
+A horizontal QListView of the images shown so far plus the next few coming
+up. FilmstripModel is lazy: a thumbnail is decoded only when the view asks
+for a row it is painting, on a small worker pool, at thumbnail resolution.
+Decodes for rows scrolled past are dropped before they start, so sweeping
+through hundreds of entries neither blocks the GUI thread nor queues work
+for rows that are no longer visible.
+"""
+
+from __future__ import annotations
+import os
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from PySide6.QtCore import QAbstractListModel, QModelIndex, QSize, Qt, Signal
+from PySide6.QtGui import QImage, QPixmap, QShowEvent
+from PySide6.QtWidgets import QAbstractItemView, QListView, QWidget
+
+from decoders import DecoderRegistry
+from resource_governor import LruCache, ResourceGovernor, image_bytes
+
+THUMBNAIL_SIZE = 72
+THUMBNAIL_WORKERS = 2
+# Queued decodes beyond this are dropped, oldest (least recently painted) first
+MAX_PENDING_THUMBNAILS = 24
+
+
+class FilmstripModel(QAbstractListModel):
+    """Session history followed by upcoming images, with thumbnails loaded on demand.
+
+    Args:
+        decoders: Decoder registry used to decode reduced thumbnails
+        local_path: Maps an entry to a readable file, or None if it isn't
+            available yet (e.g. a download in progress); must not block
+        governor: Memory governor the thumbnail cache registers with
+        parent: Qt parent object
+    """
+
+    PathRole = Qt.ItemDataRole.UserRole + 1
+    UpcomingRole = Qt.ItemDataRole.UserRole + 2
+
+    _loaded = Signal(str, int, object)  # local path, pixel size, QImage; delivered to the GUI thread
+
+    def __init__(
+        self,
+        decoders: DecoderRegistry,
+        local_path: Callable[[str], Optional[str]] = lambda path: path,
+        governor: Optional[ResourceGovernor] = None,
+        parent: Optional[QWidget] = None,
+    ) -> None:
+        super().__init__(parent)
+        self._decoders = decoders
+        self._local_path = local_path
+        self._entries: list[tuple[str, bool]] = []  # (path, upcoming)
+        self._thumbnails: LruCache[QPixmap] = LruCache(image_bytes, governor, name="thumbnails")
+        self._failed: set[str] = set()
+        self._pending: OrderedDict[tuple[str, int], Future] = OrderedDict()
+        self._executor = ThreadPoolExecutor(max_workers=THUMBNAIL_WORKERS, thread_name_prefix="filmstrip")
+        self.thumbnail_size = THUMBNAIL_SIZE
+        self.pixel_ratio = 1.0
+        self._loaded.connect(self._store)
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._entries)
+
+    def flags(self, index: QModelIndex) -> Qt.ItemFlag:
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        if self._entries[index.row()][1]:
+            # Upcoming images can be seen but not jumped to
+            return Qt.ItemFlag.NoItemFlags
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        path, upcoming = self._entries[index.row()]
+        if role == Qt.ItemDataRole.DecorationRole:
+            return self._thumbnail(path)
+        if role == Qt.ItemDataRole.ToolTipRole:
+            name = os.path.basename(path.rstrip("/"))
+            return f"{name} (up next)" if upcoming else f"#{index.row() + 1}  {name}"
+        if role == Qt.ItemDataRole.SizeHintRole:
+            return QSize(self.thumbnail_size, self.thumbnail_size)
+        if role == self.PathRole:
+            return path
+        if role == self.UpcomingRole:
+            return upcoming
+        return None
+
+    def set_entries(self, history: list[str], upcoming: list[str]) -> None:
+        """Show history then upcoming images, updating only the rows that changed.
+
+        Sessions mostly append one image and shift the upcoming ones, so the
+        view keeps its scroll position and repaints little.
+        """
+        old = self._entries
+        new = [(path, False) for path in history] + [(path, True) for path in upcoming]
+        prefix = 0
+        while prefix < min(len(old), len(new)) and old[prefix] == new[prefix]:
+            prefix += 1
+        suffix = 0
+        while suffix < min(len(old), len(new)) - prefix and old[-1 - suffix] == new[-1 - suffix]:
+            suffix += 1
+        old_changed, new_changed = len(old) - prefix - suffix, len(new) - prefix - suffix
+
+        # Rows replaced one for one are changes; the rest are removals or insertions
+        common = min(old_changed, new_changed)
+        self._entries = old[:prefix] + new[prefix:prefix + common] + old[prefix + common:]
+        if common:
+            self.dataChanged.emit(self.index(prefix), self.index(prefix + common - 1))
+        start = prefix + common
+        if old_changed > common:
+            self.beginRemoveRows(QModelIndex(), start, prefix + old_changed - 1)
+            del self._entries[start:prefix + old_changed]
+            self.endRemoveRows()
+        elif new_changed > common:
+            self.beginInsertRows(QModelIndex(), start, prefix + new_changed - 1)
+            self._entries[start:start] = new[start:prefix + new_changed]
+            self.endInsertRows()
+
+    def _pixel_size(self) -> int:
+        return round(self.thumbnail_size * self.pixel_ratio)
+
+    def _thumbnail(self, path: str) -> Optional[QPixmap]:
+        """Cached thumbnail, or None after starting to load it."""
+        local = self._local_path(path)
+        if not local or local in self._failed:
+            return None
+        key = (local, self._pixel_size())
+        pixmap = self._thumbnails.get(key)
+        if pixmap is not None:
+            return pixmap
+
+        if key in self._pending:
+            self._pending.move_to_end(key)  # still wanted: keep it from being dropped
+            return None
+        self._pending[key] = self._executor.submit(self._decode, *key)
+        while len(self._pending) > MAX_PENDING_THUMBNAILS:
+            # Scrolled past: drop it unless a worker already has it
+            _, future = self._pending.popitem(last=False)
+            future.cancel()
+        return None
+
+    def _decode(self, path: str, pixel_size: int) -> None:
+        """Decode a thumbnail (worker thread)."""
+        image = self._decoders.decode(path, QSize(pixel_size, pixel_size))
+        try:
+            self._loaded.emit(path, pixel_size, image)
+        except RuntimeError:
+            pass  # model deleted during shutdown
+
+    def _store(self, path: str, pixel_size: int, image: QImage) -> None:
+        """Cache a decoded thumbnail (GUI thread) and repaint."""
+        self._pending.pop((path, pixel_size), None)
+        if image.isNull():
+            self._failed.add(path)
+        elif pixel_size == self._pixel_size():
+            pixmap = QPixmap.fromImage(image)
+            pixmap.setDevicePixelRatio(self.pixel_ratio)
+            self._thumbnails.put((path, pixel_size), pixmap)
+        # The view only repaints what's visible, and coalesces repaints, so
+        # this is cheaper than finding the rows that show the image
+        if self._entries:
+            self.dataChanged.emit(self.index(0), self.index(len(self._entries) - 1), [Qt.ItemDataRole.DecorationRole])
+
+    def cancel_pending(self) -> None:
+        """Drop thumbnail decodes that haven't started."""
+        for future in self._pending.values():
+            future.cancel()
+        self._pending.clear()
+
+    def shutdown(self) -> None:
+        """Stop the worker pool without waiting for running decodes."""
+        self.cancel_pending()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class Filmstrip(QListView):
+    """Horizontal, virtualized strip of session thumbnails.
+
+    Emits history_selected with the history index of a clicked thumbnail.
+    """
+
+    history_selected = Signal(int)
+
+    def __init__(self, model: FilmstripModel, parent: Optional[QWidget] = None) -> None:
+        super().__init__(parent)
+        self.setModel(model)
+        self.setFlow(QListView.Flow.LeftToRight)
+        self.setWrapping(False)
+        # Every row is the same size, so only visible rows are ever asked for data
+        self.setUniformItemSizes(True)
+        self.setLayoutMode(QListView.LayoutMode.Batched)
+        self.setIconSize(QSize(model.thumbnail_size, model.thumbnail_size))
+        self.setSpacing(2)
+        self.setHorizontalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.setFixedHeight(model.thumbnail_size + 2 * self.spacing() + self.horizontalScrollBar().sizeHint().height() + 4)
+        self.clicked.connect(self._on_clicked)
+
+    def showEvent(self, event: QShowEvent) -> None:
+        """Load thumbnails at the screen's pixel density."""
+        super().showEvent(event)
+        self.model().pixel_ratio = self.devicePixelRatioF()
+
+    def set_current(self, history_index: int) -> None:
+        """Highlight the image on screen and scroll it into view."""
+        if history_index < 0:
+            self.clearSelection()
+            return
+        index = self.model().index(history_index)
+        self.setCurrentIndex(index)
+        self.scrollTo(index, QAbstractItemView.ScrollHint.PositionAtCenter)
+
+    def _on_clicked(self, index: QModelIndex) -> None:
+        if not index.data(FilmstripModel.UpcomingRole):
+            self.history_selected.emit(index.row())
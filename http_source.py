@@ -0,0 +1,327 @@
+"""
+HTTP image source for the Figure Drawing Tool.
+
+Reads an image manifest from an HTTP file server and fetches images through a
+pooled keep-alive client into a local, ETag-aware cache. Fetched files are
+plain local paths, so they go through the normal decode path.
+"""
+
+from __future__ import annotations
+import hashlib
+import http.client
+import json
+import os
+import queue
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import PurePosixPath
+from typing import Callable, Iterable, Optional
+from urllib.parse import unquote, urljoin, urlsplit
+
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), "figure_drawing_tool_cache")
+# Extensions kept on cache file names, so decoders can tell the format
+_CACHE_EXTENSION = re.compile(r"\.[A-Za-z0-9]{1,5}")
+
+
+class HttpSourceError(Exception):
+    """Raised when a manifest or image cannot be fetched."""
+
+
+def is_url(text: str) -> bool:
+    """Return True if the text looks like an http(s) URL."""
+    return text.lower().startswith(("http://", "https://"))
+
+
+class ConnectionPool:
+    """Thread-safe pool of keep-alive HTTP connections, keyed by host."""
+
+    def __init__(self, max_per_host: int = 4, timeout: float = 10.0) -> None:
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self._pools: dict[tuple[str, str, int], queue.LifoQueue] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, url: str) -> tuple[str, str, int]:
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        port = parts.port or (443 if scheme == "https" else 80)
+        return scheme, parts.hostname or "", port
+
+    def acquire(self, url: str) -> http.client.HTTPConnection:
+        """Get an idle connection for the URL's host, or open a new one."""
+        key = self._key(url)
+        with self._lock:
+            pool = self._pools.setdefault(key, queue.LifoQueue(self.max_per_host))
+        try:
+            return pool.get_nowait()
+        except queue.Empty:
+            scheme, host, port = key
+            if scheme == "https":
+                return http.client.HTTPSConnection(host, port, timeout=self.timeout)
+            return http.client.HTTPConnection(host, port, timeout=self.timeout)
+
+    def release(self, url: str, conn: http.client.HTTPConnection, reusable: bool = True) -> None:
+        """Return a connection to the pool, closing it if it can't be reused."""
+        if not reusable:
+            conn.close()
+            return
+        with self._lock:
+            pool = self._pools.get(self._key(url))
+        try:
+            if pool is None:
+                raise queue.Full
+            pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def close(self) -> None:
+        """Close all idle connections."""
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+        for pool in pools:
+            while True:
+                try:
+                    pool.get_nowait().close()
+                except queue.Empty:
+                    break
+
+
+class HttpImageSource:
+    """URL-backed image source with bounded-concurrency prefetch.
+
+    The manifest is either JSON (a list of paths/URLs, a list of objects with a
+    "url" or "path" key, or an object with an "images" list) or plain text with
+    one entry per line. Relative entries are resolved against the manifest URL.
+
+    Args:
+        manifest_url: URL of the manifest
+        cache_dir: Folder downloads are cached in
+        max_workers: Concurrent downloads, and pooled connections per host
+        retries: Attempts after the first for a failed request
+        timeout: Socket timeout in seconds
+        on_fetched: Called with (url, local path, or None on failure) when a
+            download finishes, on the download thread
+    """
+
+    USER_AGENT = "FigureDrawingTool"
+    RETRY_BACKOFF_S = 0.25
+
+    def __init__(
+        self,
+        manifest_url: str,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        max_workers: int = 4,
+        retries: int = 3,
+        timeout: float = 10.0,
+        on_fetched: Optional[Callable[[str, Optional[str]], None]] = None,
+    ) -> None:
+        self.manifest_url = manifest_url
+        self.cache_dir = cache_dir
+        self.retries = retries
+        self.on_fetched = on_fetched
+        self._pool = ConnectionPool(max_per_host=max_workers, timeout=timeout)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="http-fetch")
+        self._pending: dict[str, Future] = {}
+        self._resolved: dict[str, str] = {}
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def load_manifest(self, extensions: Optional[set[str]] = None) -> list[str]:
+        """Fetch the manifest and return absolute image URLs.
+
+        Args:
+            extensions: If given, only keep entries whose suffix is in this set
+
+        Returns:
+            List of image URLs in manifest order
+
+        Raises:
+            HttpSourceError: If the manifest can't be fetched
+            ValueError: If the manifest is malformed JSON
+        """
+        status, _, body = self._request("GET", self.manifest_url)
+        if status != 200:
+            raise HttpSourceError(f"Manifest request failed with HTTP {status}")
+
+        urls = []
+        for entry in self._parse_manifest(body.decode("utf-8-sig")):
+            url = urljoin(self.manifest_url, entry)
+            if extensions is not None:
+                ext = PurePosixPath(unquote(urlsplit(url).path)).suffix.lower().lstrip(".")
+                if ext not in extensions:
+                    continue
+            urls.append(url)
+        return urls
+
+    def load_manifest_async(self, extensions: Optional[set[str]] = None) -> Future:
+        """Fetch the manifest on a download thread; a future of load_manifest's result."""
+        return self._executor.submit(self.load_manifest, extensions)
+
+    @staticmethod
+    def _parse_manifest(text: str) -> list[str]:
+        """Parse JSON or line-based manifest text into entries."""
+        stripped = text.strip()
+        if stripped.startswith(("[", "{")):
+            data = json.loads(stripped)
+            if isinstance(data, dict):
+                data = data.get("images", [])
+            entries = []
+            for item in data:
+                if isinstance(item, dict):
+                    item = item.get("url") or item.get("path")
+                if item:
+                    entries.append(str(item))
+            return entries
+        return [
+            line.strip() for line in text.splitlines()
+            if line.strip() and not line.lstrip().startswith("#")
+        ]
+
+    def prefetch(self, urls: Iterable[str]) -> None:
+        """Start background downloads for the given URLs."""
+        for url in urls:
+            self._submit(url)
+
+    def fetch(self, url: str) -> str:
+        """Return a local path for the URL, downloading it if needed.
+
+        Blocks until the download (or an already running prefetch) finishes.
+        """
+        with self._lock:
+            if url in self._resolved:
+                return self._resolved[url]
+        return self._submit(url).result()
+
+    def fetch_async(self, url: str) -> Future:
+        """Start downloading a URL (once) and return a future of its local path, without blocking."""
+        with self._lock:
+            if url in self._resolved:
+                future = Future()
+                future.set_result(self._resolved[url])
+                return future
+        return self._submit(url)
+
+    def cached_path(self, url: str) -> Optional[str]:
+        """Local path of a URL already downloaded this session, without blocking."""
+        with self._lock:
+            return self._resolved.get(url)
+
+    def _submit(self, url: str) -> Future:
+        with self._lock:
+            future = self._pending.get(url)
+            if future is not None:
+                return future
+            future = self._executor.submit(self._download, url)
+            self._pending[url] = future
+        # Outside the lock: a future that is already done runs the callback inline
+        future.add_done_callback(lambda f, u=url: self._on_done(u, f))
+        return future
+
+    def _on_done(self, url: str, future: Future) -> None:
+        if future.cancelled():
+            return
+        path = future.result() if future.exception() is None else None
+        with self._lock:
+            if self._pending.get(url) is future:
+                del self._pending[url]
+            if path is not None:
+                self._resolved[url] = path
+        if self.on_fetched is not None:
+            self.on_fetched(url, path)
+
+    def _cache_paths(self, url: str) -> tuple[str, str]:
+        """Return (data path, validator path) for a URL's cache entry.
+
+        Named by a hash of the URL and a plain extension only: the URL's own
+        file name may hold separators or characters the file system rejects.
+        """
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+        suffix = PurePosixPath(unquote(urlsplit(url).path)).suffix
+        ext = suffix.lower() if _CACHE_EXTENSION.fullmatch(suffix) else ""
+        data_path = os.path.join(self.cache_dir, key + ext)
+        return data_path, data_path + ".etag"
+
+    def _download(self, url: str) -> str:
+        """Download a URL into the cache, revalidating with ETag/Last-Modified.
+
+        Raises:
+            HttpSourceError: If the download fails or the cache can't be read or written
+        """
+        try:
+            return self._download_to_cache(url)
+        except (OSError, ValueError) as e:  # json.JSONDecodeError is a ValueError
+            raise HttpSourceError(f"Could not cache {url} in {self.cache_dir}: {e}") from e
+
+    def _download_to_cache(self, url: str) -> str:
+        data_path, meta_path = self._cache_paths(url)
+        headers = {}
+        if os.path.exists(data_path) and os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        status, response_headers, body = self._request("GET", url, headers)
+        if status == 304:
+            return data_path
+        if status != 200:
+            raise HttpSourceError(f"GET {url} failed with HTTP {status}")
+
+        # Write atomically so a half-written file is never served from cache
+        tmp_path = f"{data_path}.{threading.get_ident()}.part"
+        with open(tmp_path, "wb") as f:
+            f.write(body)
+        os.replace(tmp_path, data_path)
+
+        meta = {
+            "etag": response_headers.get("ETag"),
+            "last_modified": response_headers.get("Last-Modified"),
+        }
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        return data_path
+
+    def _request(
+        self, method: str, url: str, headers: Optional[dict[str, str]] = None
+    ) -> tuple[int, http.client.HTTPMessage, bytes]:
+        """Issue a request on a pooled connection, retrying transient failures."""
+        parts = urlsplit(url)
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+        request_headers = {"User-Agent": self.USER_AGENT, "Connection": "keep-alive"}
+        request_headers.update(headers or {})
+
+        last_error: Optional[Exception] = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(self.RETRY_BACKOFF_S * (2 ** (attempt - 1)))
+            conn = self._pool.acquire(url)
+            try:
+                conn.request(method, target, headers=request_headers)
+                response = conn.getresponse()
+                body = response.read()
+            except (OSError, http.client.HTTPException) as e:
+                # Stale keep-alive sockets land here too; retry on a fresh one
+                self._pool.release(url, conn, reusable=False)
+                last_error = e
+                continue
+
+            self._pool.release(url, conn, reusable=not response.will_close)
+            if response.status >= 500:
+                last_error = HttpSourceError(f"{method} {url} failed with HTTP {response.status}")
+                continue
+            return response.status, response.headers, body
+
+        raise HttpSourceError(f"{method} {url} failed after {self.retries + 1} attempts: {last_error}")
+
+    def close(self) -> None:
+        """Cancel pending downloads and close pooled connections."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._pool.close()
@@ -0,0 +1,114 @@
+"""
+Library browser panel for the Figure Drawing Tool.
+
+Lists the scanned image library and filters it as you type, using a
+LibraryIndex for substring and glob matching. The list is a QListView over
+a model that holds only the matching path ids, so a row's text is looked up
+when the view paints it and hundreds of thousands of matches cost no more
+than a screenful. The filter result becomes the session's image set.
+"""
+
+from __future__ import annotations
+from typing import Any, Optional
+
+import numpy as np
+from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt, QTimer, Signal
+from PySide6.QtWidgets import QLabel, QLineEdit, QListView, QVBoxLayout, QWidget
+
+from library_index import LibraryIndex, full_path
+
+# Quiet time after a keystroke before the filter runs
+FILTER_DELAY_MS = 150
+
+
+class LibraryModel(QAbstractListModel):
+    """Relative paths of the library images that match the filter, looked up per visible row."""
+
+    def __init__(self, parent: Optional[QWidget] = None) -> None:
+        super().__init__(parent)
+        self._index: Optional[LibraryIndex] = None
+        self._ids = np.empty(0, dtype=np.uint32)
+
+    def set_matches(self, index: Optional[LibraryIndex], ids: np.ndarray) -> None:
+        self.beginResetModel()
+        self._index = index
+        self._ids = ids
+        self.endResetModel()
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._ids)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid() or self._index is None:
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._index.relative_path(int(self._ids[index.row()]))
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return full_path(self._index.root, self._index.relative_path(int(self._ids[index.row()])))
+        return None
+
+
+class LibraryBrowser(QWidget):
+    """Filterable list of the library's images, in its own window.
+
+    Emits filter_changed with the query and the matching path ids after
+    the list has been filtered.
+    """
+
+    filter_changed = Signal(str, object)
+
+    def __init__(self, parent: Optional[QWidget] = None) -> None:
+        super().__init__(parent, Qt.WindowType.Window)
+        self.setWindowTitle("Library")
+        self.resize(480, 600)
+        self._index: Optional[LibraryIndex] = None
+        self.matches = np.empty(0, dtype=np.uint32)
+
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("Filter, e.g.  anna standing  or  */gestures/*.jpg")
+        self.filter_edit.setClearButtonEnabled(True)
+        self.filter_edit.setToolTip(
+            "Words match anywhere in the path; words with * ? [ ] are glob patterns "
+            "over the whole path. Only matching images are used in the session."
+        )
+        self.count_label = QLabel()
+
+        self.model = LibraryModel(self)
+        self.list_view = QListView()
+        self.list_view.setModel(self.model)
+        self.list_view.setUniformItemSizes(True)  # only visible rows are asked for data
+        self.list_view.setLayoutMode(QListView.LayoutMode.Batched)
+        self.list_view.setSelectionMode(QListView.SelectionMode.NoSelection)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.filter_edit)
+        layout.addWidget(self.count_label)
+        layout.addWidget(self.list_view)
+
+        self._filter_timer = QTimer(self)
+        self._filter_timer.setSingleShot(True)
+        self._filter_timer.setInterval(FILTER_DELAY_MS)
+        self._filter_timer.timeout.connect(self._apply_filter)
+        self.filter_edit.textEdited.connect(lambda _text: self._filter_timer.start())
+
+    def set_library(self, index: Optional[LibraryIndex], query: str) -> None:
+        """Show a library with a filter already applied, without emitting filter_changed."""
+        self._index = index
+        self.filter_edit.setText(query)
+        self._filter(query)
+
+    def query(self) -> str:
+        return self.filter_edit.text().strip()
+
+    def _filter(self, query: str) -> None:
+        if self._index is None:
+            self.matches = np.empty(0, dtype=np.uint32)
+            self.count_label.setText("No library folder loaded")
+        else:
+            self.matches = self._index.search(query)
+            self.count_label.setText(f"{len(self.matches):,} of {len(self._index):,} images")
+        self.model.set_matches(self._index, self.matches)
+
+    def _apply_filter(self) -> None:
+        self._filter(self.query())
+        self.filter_changed.emit(self.query(), self.matches)
@@ -0,0 +1,238 @@
+"""
+Image library scanning and filename search for the Figure Drawing Tool.
+
+scan_library lists the images under a folder with os.scandir, which reads
+file types from directory entries instead of calling stat() per file.
+LibraryIndex is a trigram index over the images' relative paths: every run
+of three characters maps to the sorted ids of the paths containing it, so a
+substring or glob query only checks the paths that contain all of its
+literal trigrams. The index is built with NumPy in a few array passes rather
+than a Python loop per trigram, so hundreds of thousands of paths index in
+under a second and filter at interactive speed.
+
+:to use:
+    index = LibraryIndex(root, scan_library(root, {"jpg", "png"}))
+    paths = index.paths_for(index.search("female *standing*"))
+"""
+
+from __future__ import annotations
+import fnmatch
+import os
+import re
+import sys
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+
+# Characters that make a query term a glob pattern instead of a substring
+GLOB_CHARS = frozenset("*?[")
+
+
+def scan_library(directory: str, extensions: Iterable[str], recursive: bool = True) -> list[str]:
+    """Relative paths ("/"-separated, sorted) of the images under a directory.
+
+    Symlinked folders aren't descended into, so links can't make the scan loop.
+    """
+    extensions = set(extensions)
+    found: list[str] = []
+    pending = [""]
+    while pending:
+        relative_dir = pending.pop()
+        try:
+            with os.scandir(os.path.join(directory, relative_dir)) as entries:
+                for entry in entries:
+                    relative = f"{relative_dir}/{entry.name}" if relative_dir else entry.name
+                    try:
+                        if recursive and entry.is_dir(follow_symlinks=False):
+                            pending.append(relative)
+                        elif entry.is_file():
+                            ext = os.path.splitext(entry.name)[1].lower().lstrip(".")
+                            if ext in extensions:
+                                found.append(relative)
+                    except OSError:
+                        continue  # entry vanished or can't be read
+        except OSError:
+            continue  # unreadable folder
+    found.sort()
+    return found
+
+
+def full_path(root: str, relative_path: str) -> str:
+    """Native path of a "/"-separated path below root."""
+    return os.path.join(root, relative_path if os.sep == "/" else relative_path.replace("/", os.sep))
+
+
+def _code_points(text: str) -> np.ndarray:
+    return np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+
+
+class LibraryIndex:
+    """Trigram index over an image library's relative paths.
+
+    Matching is case-insensitive. Paths are kept in the order given; search
+    results are sorted path ids.
+
+    Args:
+        root: Folder the paths are relative to
+        relative_paths: "/"-separated paths below root
+    """
+
+    def __init__(self, root: str, relative_paths: list[str]) -> None:
+        self.root = root
+        self.relative_paths = relative_paths
+        self._folded = [path.casefold() for path in relative_paths]
+        self._build()
+
+    def __len__(self) -> int:
+        return len(self.relative_paths)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the index, including its path strings."""
+        strings = sum(sys.getsizeof(path) for path in self.relative_paths) + sum(map(sys.getsizeof, self._folded))
+        arrays = self._rank.nbytes + self._keys.nbytes + self._postings.nbytes + self._starts.nbytes
+        return strings + arrays
+
+    def _build(self) -> None:
+        """Build sorted unique trigram keys and a posting list of path ids for each."""
+        # All paths as one code point array, "\n"-separated so no trigram spans two paths
+        codes = _code_points("\n".join(self._folded) + "\n")
+        lengths = np.fromiter((len(p) + 1 for p in self._folded), dtype=np.int64, count=len(self._folded))
+        owner = np.repeat(np.arange(len(self._folded), dtype=np.uint64), lengths)
+
+        # Number the characters that occur, so a trigram key is small enough to
+        # share a uint64 with a path id and one in-place sort orders both
+        present = np.zeros(int(codes.max()) + 1, dtype=bool)
+        present[codes] = True
+        self._rank = np.where(present, np.cumsum(present) - 1, -1)
+        self._alphabet = int(present.sum())
+        ranks = self._rank[codes].astype(np.uint64)
+        keys = self._keys_of(ranks)
+        separator = codes == ord("\n")
+        valid = ~(separator[:-2] | separator[1:-1] | separator[2:])
+        if self._alphabet ** 3 < 2**32:
+            pairs = (keys[valid] << np.uint64(32)) | owner[:-2][valid]
+            pairs.sort()
+            keys, ids = pairs >> np.uint64(32), pairs & np.uint64(0xFFFFFFFF)
+        else:
+            # Too many distinct characters to pack: sort the pairs the slow way
+            keys, ids = keys[valid], owner[:-2][valid]
+            order = np.lexsort((ids, keys))
+            keys, ids = keys[order], ids[order]
+
+        # Drop trigrams repeated within a path, then cut the ids into one posting list per key
+        distinct = np.ones(len(keys), dtype=bool)
+        distinct[1:] = (keys[1:] != keys[:-1]) | (ids[1:] != ids[:-1])
+        keys, self._postings = keys[distinct], ids[distinct].astype(np.uint32)
+        boundaries = np.flatnonzero(keys[1:] != keys[:-1]) + 1
+        self._keys = keys[np.concatenate(([0], boundaries))] if len(keys) else keys
+        self._starts = np.concatenate(([0], boundaries, [len(keys)]))
+
+    def _keys_of(self, ranks: np.ndarray) -> np.ndarray:
+        """Keys of every three-character window of an array of character ranks."""
+        size = np.uint64(self._alphabet)
+        return (ranks[:-2] * size + ranks[1:-1]) * size + ranks[2:]
+
+    def _ranks_of(self, literal: str) -> Optional[np.ndarray]:
+        """Character ranks of a literal, None if it has a character no path contains."""
+        codes = _code_points(literal).astype(np.int64)
+        if (codes >= len(self._rank)).any():
+            return None
+        ranks = self._rank[codes]
+        return None if (ranks < 0).any() else ranks.astype(np.uint64)
+
+    def _posting(self, position: int) -> np.ndarray:
+        return self._postings[self._starts[position]:self._starts[position + 1]]
+
+    def _containing_trigrams(self, literal: str) -> np.ndarray:
+        """Ids of paths containing every trigram of a literal (3 or more characters)."""
+        ranks = self._ranks_of(literal)
+        if ranks is None:
+            return np.empty(0, dtype=np.uint32)
+        keys = np.unique(self._keys_of(ranks))
+        positions = np.searchsorted(self._keys, keys)
+        if (positions == len(self._keys)).any() or (self._keys[positions] != keys).any():
+            return np.empty(0, dtype=np.uint32)
+        return self._intersect([self._posting(p) for p in positions.tolist()])
+
+    def _intersect(self, id_arrays: list[np.ndarray]) -> np.ndarray:
+        """Ids in every one of several sorted id arrays.
+
+        Starts from the smallest and filters it through a membership table per
+        array, which is linear where sorting intersections would not be.
+        """
+        id_arrays = sorted(id_arrays, key=len)
+        result = id_arrays[0]
+        member = np.zeros(len(self), dtype=bool)
+        for ids in id_arrays[1:]:
+            if not len(result):
+                break
+            member[ids] = True
+            result = result[member[result]]
+            member[ids] = False
+        return result
+
+    def _containing_short(self, literal: str) -> np.ndarray:
+        """Ids of paths containing a literal of 1 or 2 characters.
+
+        Every such occurrence lies inside some trigram (paths have extensions,
+        so they are longer than two characters): exact, no verification needed.
+        """
+        ranks = self._ranks_of(literal)
+        if ranks is None:
+            return np.empty(0, dtype=np.uint32)
+        size = np.uint64(self._alphabet)
+        first, middle, last = self._keys // (size * size), self._keys // size % size, self._keys % size
+        if len(ranks) == 1:
+            match = (first == ranks[0]) | (middle == ranks[0]) | (last == ranks[0])
+        else:
+            match = ((first == ranks[0]) & (middle == ranks[1])) | ((middle == ranks[0]) & (last == ranks[1]))
+        hits = np.zeros(len(self), dtype=bool)
+        for position in np.flatnonzero(match).tolist():
+            hits[self._posting(position)] = True
+        return np.flatnonzero(hits).astype(np.uint32)
+
+    def search(self, query: str) -> np.ndarray:
+        """Ids of the paths matching every whitespace-separated term of the query.
+
+        A term containing *, ? or [ is a glob matched against the whole
+        relative path (* also matches across folders); any other term
+        matches as a substring. An empty query matches everything.
+        """
+        narrowed: list[np.ndarray] = []
+        substrings: list[str] = []  # to check in full: having all trigrams doesn't mean in order
+        glob_matches: list[Callable[[str], object]] = []
+        for term in query.casefold().split():
+            if GLOB_CHARS & set(term):
+                # The glob's literal runs narrow the candidates like substrings do
+                for run in re.split(r"[*?]|\[[^\]]*\]?", term):
+                    if len(run) >= 3:
+                        narrowed.append(self._containing_trigrams(run))
+                if set(term) != {"*"}:
+                    glob_matches.append(re.compile(fnmatch.translate(term)).match)
+            elif len(term) <= 2:
+                narrowed.append(self._containing_short(term))
+            else:
+                narrowed.append(self._containing_trigrams(term))
+                if len(term) > 3:
+                    substrings.append(term)
+
+        ids = self._intersect(narrowed) if narrowed else np.arange(len(self), dtype=np.uint32)
+        if not substrings and not glob_matches:
+            return ids
+
+        folded = self._folded
+        kept = ids.tolist()
+        for term in substrings:
+            kept = [i for i in kept if term in folded[i]]
+        for matches in glob_matches:
+            kept = [i for i in kept if matches(folded[i])]
+        return np.array(kept, dtype=np.uint32)
+
+    def relative_path(self, path_id: int) -> str:
+        return self.relative_paths[path_id]
+
+    def paths_for(self, ids: np.ndarray) -> list[str]:
+        """Full paths of the given ids."""
+        root, relative_paths = self.root, self.relative_paths
+        return [full_path(root, relative_paths[i]) for i in ids.tolist()]
@@ -0,0 +1,203 @@
+"""
+Library profiling for the Figure Drawing Tool, without opening a window.
+
+Runs a folder (or reference pack) through the tool's own code: the scan that
+lists it, a header check of every file by the decoder backend the registry
+selects for it, and decodes of a random sample per format by the registry at
+the size the canvas decodes to. The report gives files per second for the scan and the check,
+decode-time percentiles per format, and the memory the tool will hold for
+that library: decoded images kept ahead of the session, the canvas frames,
+how many images fit in the cache budget and the size of the filename index.
+
+:to use:
+    python figure_drawing_tool.py --profile-library --dir /path/to/library [--screen 3840x2160]
+"""
+
+from __future__ import annotations
+import random
+import time
+from collections import defaultdict
+from typing import Optional
+
+import numpy as np
+from PySide6.QtCore import QSize
+
+from decode_pool import to_display_format
+from decoders import DecoderRegistry, file_extension
+from library_index import LibraryIndex, full_path
+from reference_pack import is_pack, list_images
+from resource_governor import image_bytes
+from schedule import MAX_PREFETCH_DEPTH
+
+# Frames the canvas holds at screen size: the current one, the next one
+# prepared ahead, and the outgoing one during a transition
+CANVAS_FRAMES = 3
+PERCENTILES = (50, 90, 99)
+MAX_LISTED_UNREADABLE = 5
+
+
+class FormatProfile:
+    """Counts and decode measurements for one file format.
+
+    Args:
+        extension: Lowercase file extension
+    """
+
+    def __init__(self, extension: str) -> None:
+        self.extension = extension
+        self.files = 0
+        self.unreadable: list[str] = []
+        self.decode_ms: list[float] = []
+        self.decoded_bytes: list[int] = []
+        self.failed_decodes = 0
+
+
+class LibraryProfile:
+    """Measurements of a library, filled in by profile_library.
+
+    Args:
+        directory: Folder or pack profiled
+        target_size: Size images were decoded to
+    """
+
+    def __init__(self, directory: str, target_size: QSize) -> None:
+        self.directory = directory
+        self.target_size = target_size
+        self.files = 0
+        self.scan_seconds = 0.0
+        self.check_seconds = 0.0
+        self.formats: dict[str, FormatProfile] = {}
+        self.index_bytes = 0
+        self.cache_budget_bytes = 0
+
+    def decoded_bytes(self) -> Optional[tuple[float, float]]:
+        """Median and 95th percentile bytes of a decoded image, None if nothing decoded.
+
+        Each sample is weighted by its format's share of the library.
+        """
+        sizes, weights = [], []
+        for profile in self.formats.values():
+            if not profile.decoded_bytes:
+                continue
+            sizes.extend(profile.decoded_bytes)
+            weights.extend([profile.files / len(profile.decoded_bytes)] * len(profile.decoded_bytes))
+        if not sizes:
+            return None
+        order = np.argsort(sizes)
+        sizes, weights = np.array(sizes)[order], np.array(weights)[order]
+        cumulative = np.cumsum(weights) / weights.sum()
+        median, p95 = (float(sizes[min(np.searchsorted(cumulative, q), len(sizes) - 1)]) for q in (0.5, 0.95))
+        return median, p95
+
+    def report(self) -> str:
+        """Plain-text report of the measurements."""
+        size = f"{self.target_size.width()}x{self.target_size.height()}"
+        unreadable = sum(len(p.unreadable) for p in self.formats.values())
+        lines = [
+            f"{self.directory}: {self.files:,} images",
+            f"scan        {self.files:>10,} files in {self.scan_seconds:7.2f} s  {_rate(self.files, self.scan_seconds)}",
+            f"check       {self.files:>10,} files in {self.check_seconds:7.2f} s  "
+            f"{_rate(self.files, self.check_seconds)}  {unreadable:,} unreadable",
+        ]
+        for profile in self.formats.values():
+            for path in profile.unreadable[:MAX_LISTED_UNREADABLE]:
+                lines.append(f"  unreadable: {path}")
+
+        lines.append(f"decode to {size}, ms:")
+        for extension, profile in sorted(self.formats.items(), key=lambda item: -item[1].files):
+            line = f"  {extension:<6} {profile.files:>10,} files"
+            if profile.decode_ms:
+                percentiles = np.percentile(profile.decode_ms, PERCENTILES)
+                line += "  " + "  ".join(f"p{p} {value:7.1f}" for p, value in zip(PERCENTILES, percentiles))
+                line += f"  max {max(profile.decode_ms):7.1f}  ({len(profile.decode_ms)} sampled"
+                line += f", {profile.failed_decodes} failed)" if profile.failed_decodes else ")"
+            elif profile.failed_decodes:
+                line += f"  all {profile.failed_decodes} sampled decodes failed"
+            lines.append(line)
+
+        decoded = self.decoded_bytes()
+        frame_bytes = self.target_size.width() * self.target_size.height() * 4
+        lines.append("memory:")
+        if decoded is not None:
+            typical, large = decoded
+            working = (MAX_PREFETCH_DEPTH + 1) * large + CANVAS_FRAMES * frame_bytes
+            lines += [
+                f"  decoded image   median {_mb(typical)}   p95 {_mb(large)}",
+                f"  working set     {_mb(working)}   ({MAX_PREFETCH_DEPTH + 1} decoded images at p95 "
+                f"+ {CANVAS_FRAMES} canvas frames)",
+                f"  cache budget    {_mb(self.cache_budget_bytes)} holds about "
+                f"{int(self.cache_budget_bytes // typical):,} decoded images",
+            ]
+        lines.append(f"  library index   {_mb(self.index_bytes)}")
+        return "\n".join(lines)
+
+
+def _rate(count: int, seconds: float) -> str:
+    return f"{count / seconds:>10,.0f} files/s" if seconds > 0 else f"{'-':>10} files/s"
+
+
+def _mb(nbytes: float) -> str:
+    return f"{nbytes / 2**20:7.1f} MB"
+
+
+def profile_library(
+    directory: str, extensions: set[str], registry: DecoderRegistry, target_size: QSize,
+    recursive: bool = True, samples_per_format: int = 20, cache_budget_bytes: int = 0,
+    rng: Optional[random.Random] = None,
+) -> LibraryProfile:
+    """Scan, check and sample-decode a library with the tool's own scanner and decoders.
+
+    Args:
+        directory: Folder or reference pack
+        extensions: Image extensions to include
+        registry: Decoders, as the tool selects them
+        target_size: Size to decode to, normally the screen's in physical pixels
+        recursive: Include subfolders
+        samples_per_format: Files decoded per format
+        cache_budget_bytes: Image cache budget, to report how many images it holds
+        rng: Random source for the samples
+
+    Raises:
+        OSError: If a pack can't be read
+        PackError: If a pack is malformed
+    """
+    rng = rng or random.Random()
+    profile = LibraryProfile(directory, target_size)
+    profile.cache_budget_bytes = cache_budget_bytes
+
+    start = time.perf_counter()
+    relative_paths = list_images(directory, extensions, recursive)
+    profile.scan_seconds = time.perf_counter() - start
+    profile.files = len(relative_paths)
+
+    # Pack images were checked when the pack was built; its index is the check
+    by_format: dict[str, list[str]] = defaultdict(list)
+    start = time.perf_counter()
+    packed = is_pack(directory)
+    for relative_path in relative_paths:
+        path = full_path(directory, relative_path)
+        extension = file_extension(path)
+        format_profile = profile.formats.get(extension) or profile.formats.setdefault(
+            extension, FormatProfile(extension)
+        )
+        format_profile.files += 1
+        if not packed and not registry.readable(path):
+            format_profile.unreadable.append(path)
+            continue
+        by_format[extension].append(path)
+    profile.check_seconds = time.perf_counter() - start
+
+    for extension, paths in by_format.items():
+        format_profile = profile.formats[extension]
+        for path in rng.sample(paths, min(samples_per_format, len(paths))):
+            start = time.perf_counter()
+            image = registry.decode(path, target_size)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if image.isNull():
+                format_profile.failed_decodes += 1
+                continue
+            format_profile.decode_ms.append(elapsed_ms)
+            format_profile.decoded_bytes.append(image_bytes(to_display_format(image)))
+
+    profile.index_bytes = LibraryIndex(directory, relative_paths).nbytes if relative_paths else 0
+    return profile
@@ -0,0 +1,453 @@
+"""
+Reference packs: a curated image set in one file, pre-resized for the canvas.
+
+A pack holds every image encoded at a few canvas-ready resolutions, so
+showing one reads a single contiguous slice and decodes an image already
+about the size of the screen, instead of opening a loose file and decoding
+it at full resolution. The header points to NumPy record tables (per image:
+stable id, original size, relative path and the offset, length and size of
+each rendition) that are used straight from a memory map. Opening a pack
+reads the fixed-size header and nothing else, however many images it holds.
+
+Images in a pack have paths below the pack file, "poses.fdtpack/anna/01.jpg",
+so the rest of the tool treats a pack like a folder: DecoderRegistry.decode
+and the contact sheet read members through decode_member.
+
+Layout (little-endian): header, rendition data, then the image table, the
+rendition table, the id order, the path strings and a JSON metadata blob,
+each 8-byte aligned.
+
+:to use:
+    python reference_pack.py build /path/to/folder poses.fdtpack [--title "Poses"]
+    python reference_pack.py info poses.fdtpack
+
+    pack = open_pack("poses.fdtpack")
+    image = pack.decode(pack.index_of_path("anna/01.jpg"), QSize(1920, 1080))
+"""
+
+from __future__ import annotations
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import re
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, Optional
+
+import numpy as np
+from PySide6.QtCore import QBuffer, QByteArray, QIODevice, QSize, Qt
+from PySide6.QtGui import QImage, QImageReader
+
+PACK_EXTENSION = "fdtpack"
+MAGIC = b"FDTPACK\x00"
+VERSION = 1
+# Boxes each image is fitted into (never enlarged): 4K and HD screens, a
+# small window, and thumbnails for the filmstrip and contact sheets
+DEFAULT_LEVELS = [(3840, 2160), (1920, 1080), (1280, 720), (320, 320)]
+DEFAULT_QUALITY = 90
+FORMATS = ["jpg", "png"]  # index is the table's format code; png keeps alpha
+
+HEADER_DTYPE = np.dtype([
+    ("magic", "S8"), ("version", "<u4"), ("count", "<u4"), ("levels", "<u4"), ("reserved", "<u4"),
+    ("images_offset", "<u8"), ("renditions_offset", "<u8"), ("order_offset", "<u8"),
+    ("strings_offset", "<u8"), ("strings_length", "<u8"), ("meta_offset", "<u8"), ("meta_length", "<u8"),
+])
+IMAGE_DTYPE = np.dtype([
+    ("id", "<u8"), ("width", "<u4"), ("height", "<u4"),
+    ("path_offset", "<u4"), ("path_length", "<u4"), ("format", "<u4"), ("reserved", "<u4"),
+])
+# Sorted largest first; a level an image is too small for repeats the one before
+RENDITION_DTYPE = np.dtype([("offset", "<u8"), ("length", "<u4"), ("width", "<u2"), ("height", "<u2")])
+
+_MEMBER_PATTERN = re.compile(r"^(.+?\." + PACK_EXTENSION + r")[\\/](.+)$", re.IGNORECASE)
+
+
+class PackError(Exception):
+    """A file that isn't a readable reference pack."""
+
+
+def is_pack(path: str) -> bool:
+    return path.lower().endswith("." + PACK_EXTENSION) and os.path.isfile(path)
+
+
+def is_pack_member(path: str) -> bool:
+    return split_member_path(path) is not None
+
+
+def split_member_path(path: str) -> Optional[tuple[str, str]]:
+    """(pack file, "/"-separated relative path) of an image inside a pack, None for other paths."""
+    match = _MEMBER_PATTERN.match(path)
+    if match is None or os.path.isdir(match.group(1)):
+        return None
+    return match.group(1), match.group(2).replace("\\", "/")
+
+
+def list_images(directory: str, extensions: set[str], recursive: bool = True) -> list[str]:
+    """Relative paths ("/"-separated, sorted) of the images in a folder or a pack.
+
+    Raises:
+        OSError: If a pack can't be read
+        PackError: If a pack is malformed
+    """
+    from library_index import scan_library
+
+    if not is_pack(directory):
+        return scan_library(directory, extensions, recursive)
+    relative_paths = open_pack(directory).relative_paths()
+    return relative_paths if recursive else [path for path in relative_paths if "/" not in path]
+
+
+def _fit(width: int, height: int, box: QSize) -> QSize:
+    """Size of an image fitted into a box, never enlarged."""
+    if width <= box.width() and height <= box.height():
+        return QSize(width, height)
+    return QSize(width, height).scaled(box, Qt.AspectRatioMode.KeepAspectRatio)
+
+
+class ReferencePack:
+    """Random access to the images of a pack through a read-only memory map.
+
+    Args:
+        path: Pack file
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            header = np.frombuffer(self._map, HEADER_DTYPE, count=1)[0]
+            if bytes(header["magic"]) != MAGIC.rstrip(b"\x00") or int(header["version"]) != VERSION:
+                raise PackError(f"{path} is not a version {VERSION} reference pack")
+            count, levels = int(header["count"]), int(header["levels"])
+            self.images = np.frombuffer(self._map, IMAGE_DTYPE, count, int(header["images_offset"]))
+            self.renditions = np.frombuffer(
+                self._map, RENDITION_DTYPE, count * levels, int(header["renditions_offset"])
+            ).reshape(count, levels)
+            self._order = np.frombuffer(self._map, "<u4", count, int(header["order_offset"]))
+            self._strings = (int(header["strings_offset"]), int(header["strings_length"]))
+            self._meta = (int(header["meta_offset"]), int(header["meta_length"]))
+        except (ValueError, IndexError, TypeError, OSError) as e:
+            self.close()
+            raise PackError(f"{path} is not a readable reference pack: {e}") from e
+        except PackError:
+            self.close()
+            raise
+        self._path_index: Optional[dict[str, int]] = None
+
+    def __len__(self) -> int:
+        return len(self.images)
+
+    def close(self) -> None:
+        """Unmap the pack; arrays taken from it must not be used afterwards."""
+        self.images = self.renditions = self._order = None
+        if getattr(self, "_map", None) is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                pass  # a caller still holds a view; unmapped when it's collected
+            self._map = None
+        self._file.close()
+
+    @property
+    def metadata(self) -> dict:
+        """Title, levels, build time and the like, as written by the builder."""
+        offset, length = self._meta
+        return json.loads(bytes(self._map[offset:offset + length]))
+
+    def relative_path(self, index: int) -> str:
+        offset, length = int(self.images[index]["path_offset"]), int(self.images[index]["path_length"])
+        start = self._strings[0] + offset
+        return bytes(self._map[start:start + length]).decode("utf-8")
+
+    def relative_paths(self) -> list[str]:
+        """Relative paths of all images, in pack order (sorted)."""
+        start, length = self._strings
+        strings = bytes(self._map[start:start + length])
+        offsets, lengths = self.images["path_offset"].tolist(), self.images["path_length"].tolist()
+        return [strings[offset:offset + n].decode("utf-8") for offset, n in zip(offsets, lengths)]
+
+    def member_path(self, index: int) -> str:
+        return os.path.join(self.path, self.relative_path(index))
+
+    def index_of_path(self, relative_path: str) -> int:
+        """Index of an image by relative path; KeyError if the pack doesn't hold it."""
+        if self._path_index is None:
+            self._path_index = {path: i for i, path in enumerate(self.relative_paths())}
+        return self._path_index[relative_path]
+
+    def index_of_id(self, image_id: int) -> int:
+        """Index of an image by stable id, by binary search; KeyError if absent."""
+        ids = self.images["id"]
+        position = int(np.searchsorted(ids[self._order], np.uint64(image_id)))
+        if position < len(ids) and int(ids[self._order[position]]) == image_id:
+            return int(self._order[position])
+        raise KeyError(image_id)
+
+    def level_for(self, index: int, target_size: Optional[QSize]) -> int:
+        """Smallest rendition that shows the image at target_size without upscaling."""
+        renditions = self.renditions[index]
+        if target_size is None:
+            return 0
+        image = self.images[index]
+        needed = _fit(int(image["width"]), int(image["height"]), target_size)
+        for level in range(len(renditions) - 1, -1, -1):
+            # Rounding may make a rendition a pixel short of the exact fit
+            if renditions[level]["width"] + 1 >= needed.width() and renditions[level]["height"] + 1 >= needed.height():
+                return level
+        return 0
+
+    def read(self, index: int, level: int = 0) -> memoryview:
+        """Encoded bytes of one rendition: a single slice of the map, not copied."""
+        rendition = self.renditions[index][level]
+        offset = int(rendition["offset"])
+        return memoryview(self._map)[offset:offset + int(rendition["length"])]
+
+    def decode(self, index: int, target_size: Optional[QSize] = None) -> QImage:
+        """Decode an image from the smallest rendition that covers target_size, reduced to fit it."""
+        level = self.level_for(index, target_size)
+        data = self.read(index, level)
+        buffer = QBuffer()
+        buffer.setData(QByteArray(data.tobytes()))
+        data.release()
+        buffer.open(QIODevice.OpenModeFlag.ReadOnly)
+        reader = QImageReader(buffer, FORMATS[int(self.images[index]["format"])].encode())
+        if target_size is not None:
+            size = reader.size()
+            if size.isValid() and (size.width() > target_size.width() or size.height() > target_size.height()):
+                reader.setScaledSize(size.scaled(target_size, Qt.AspectRatioMode.KeepAspectRatio))
+        return reader.read()
+
+
+_open_packs: dict[str, tuple[tuple[int, int], ReferencePack]] = {}
+_open_packs_lock = threading.Lock()
+
+
+def open_pack(path: str) -> ReferencePack:
+    """Shared reader for a pack file, reopened if the file has been rebuilt since."""
+    key = os.path.normcase(os.path.abspath(path))
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    with _open_packs_lock:
+        cached = _open_packs.get(key)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        pack = ReferencePack(path)
+        _open_packs[key] = (signature, pack)
+        return pack  # a replaced reader is unmapped once nothing uses it
+
+
+def decode_member(path: str, target_size: Optional[QSize] = None) -> QImage:
+    """Decode an image inside a pack by its member path; a null QImage if it can't be read."""
+    member = split_member_path(path)
+    if member is None:
+        return QImage()
+    try:
+        pack = open_pack(member[0])
+        return pack.decode(pack.index_of_path(member[1]), target_size)
+    except (OSError, PackError, KeyError):
+        return QImage()
+
+
+def _encode(image: QImage, fmt: str, quality: int) -> bytes:
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+    if not image.save(buffer, fmt.upper(), quality if fmt == "jpg" else -1):
+        raise PackError(f"could not encode a {image.width()}x{image.height()} image as {fmt}")
+    return bytes(data.data())
+
+
+def _render(path: str, levels: list[QSize], quality: int) -> Optional[tuple[int, QSize, str, list[tuple[QSize, bytes]]]]:
+    """(stable id, original size, format, [(size, encoded bytes)] per level) of one image, None if unreadable."""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    buffer = QBuffer()
+    buffer.setData(QByteArray(data))
+    buffer.open(QIODevice.OpenModeFlag.ReadOnly)
+    reader = QImageReader(buffer)
+    reader.setAutoTransform(True)
+    image = reader.read()
+    if image.isNull():
+        return None
+    # The id follows the pixels, not the file name, so rebuilding or renaming keeps it
+    image_id = int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+    original = image.size()
+    fmt = "png" if image.hasAlphaChannel() else "jpg"
+
+    renditions: list[tuple[QSize, bytes]] = []
+    for box in levels:
+        size = _fit(original.width(), original.height(), box)
+        if renditions and size == renditions[-1][0]:
+            renditions.append(renditions[-1])  # too small for this level
+            continue
+        # Each level is scaled from the one above, which is cheaper and as sharp
+        image = image.scaled(size, Qt.AspectRatioMode.IgnoreAspectRatio, Qt.TransformationMode.SmoothTransformation)
+        renditions.append((size, _encode(image, fmt, quality)))
+    return image_id, original, fmt, renditions
+
+
+def _ordered(executor: ThreadPoolExecutor, fn, items: list, window: int) -> Iterator:
+    """Results of fn over items in order, with at most `window` in flight."""
+    pending: deque = deque()
+    for item in items:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _pad(f, alignment: int = 8) -> int:
+    """Pad the file to an aligned offset and return it."""
+    offset = f.tell()
+    if offset % alignment:
+        f.write(b"\x00" * (alignment - offset % alignment))
+    return f.tell()
+
+
+def build_pack(
+    directory: str, output: str, extensions: set[str], levels: Optional[list[QSize]] = None,
+    quality: int = DEFAULT_QUALITY, title: str = "", workers: Optional[int] = None, progress=None,
+) -> int:
+    """Write a pack of the images under a directory.
+
+    Args:
+        directory: Folder to pack, with its subfolders
+        output: Pack file to write (replaced only once complete)
+        extensions: Image extensions to include
+        levels: Boxes to fit the renditions into, largest first
+        quality: JPEG quality of the renditions
+        title: Title stored in the metadata
+        workers: Encoding threads (defaults to the CPU count)
+        progress: Called with (images done, images total)
+
+    Returns:
+        Number of images packed
+    """
+    from library_index import full_path, scan_library
+
+    levels = sorted(levels or [QSize(w, h) for w, h in DEFAULT_LEVELS], key=lambda s: -s.width() * s.height())
+    relative_paths = scan_library(directory, extensions)
+    workers = workers or os.cpu_count() or 1
+    temp_path = output + ".tmp"
+    images: list[tuple] = []
+    renditions: list[list[tuple[int, int, int, int]]] = []
+    packed_paths: list[str] = []
+
+    with open(temp_path, "wb") as f:
+        f.write(b"\x00" * HEADER_DTYPE.itemsize)  # filled in at the end
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pack") as executor:
+            rendered = _ordered(
+                executor, lambda rel: _render(full_path(directory, rel), levels, quality), relative_paths, workers * 2
+            )
+            for done, (relative_path, result) in enumerate(zip(relative_paths, rendered), 1):
+                if progress is not None:
+                    progress(done, len(relative_paths))
+                if result is None:
+                    continue
+                image_id, original, fmt, image_renditions = result
+                entries = []
+                written: dict[int, tuple[int, int]] = {}
+                for size, data in image_renditions:
+                    if id(data) not in written:  # a repeated level shares the bytes
+                        written[id(data)] = (f.tell(), len(data))
+                        f.write(data)
+                    offset, length = written[id(data)]
+                    entries.append((offset, length, size.width(), size.height()))
+                images.append((image_id, original.width(), original.height(), FORMATS.index(fmt)))
+                renditions.append(entries)
+                packed_paths.append(relative_path)
+
+        strings = bytearray()
+        image_table = np.zeros(len(images), IMAGE_DTYPE)
+        for i, ((image_id, width, height, fmt), path) in enumerate(zip(images, packed_paths)):
+            encoded = path.encode("utf-8")
+            if i:
+                strings += b"\n"
+            image_table[i] = (image_id, width, height, len(strings), len(encoded), fmt, 0)
+            strings += encoded
+        rendition_table = np.array([tuple(e) for entries in renditions for e in entries], RENDITION_DTYPE)
+        order = np.argsort(image_table["id"], kind="stable").astype("<u4")
+        meta = json.dumps({
+            "title": title or os.path.basename(os.path.normpath(directory)), "created": time.time(),
+            "levels": [[s.width(), s.height()] for s in levels], "quality": quality, "count": len(images),
+        }).encode("utf-8")
+
+        header = np.zeros(1, HEADER_DTYPE)
+        header["magic"] = MAGIC
+        header["version"] = VERSION
+        header["count"] = len(images)
+        header["levels"] = len(levels)
+        header["images_offset"] = _pad(f)
+        f.write(image_table.tobytes())
+        header["renditions_offset"] = _pad(f)
+        f.write(rendition_table.tobytes())
+        header["order_offset"] = _pad(f)
+        f.write(order.tobytes())
+        header["strings_offset"] = _pad(f)
+        header["strings_length"] = len(strings)
+        f.write(strings)
+        header["meta_offset"] = _pad(f)
+        header["meta_length"] = len(meta)
+        f.write(meta)
+        f.seek(0)
+        f.write(header.tobytes())
+    os.replace(temp_path, output)
+    return len(images)
+
+
+def main() -> None:
+    from decoders import parse_size  # decoders imports this module
+
+    parser = argparse.ArgumentParser(description="Build or inspect reference packs")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="pack the images under a folder into one file")
+    build.add_argument("directory")
+    build.add_argument("output", help=f"pack file to write (.{PACK_EXTENSION})")
+    build.add_argument("--title", default="", help="title stored in the pack (default: the folder name)")
+    build.add_argument("--levels", type=lambda text: [parse_size(s) for s in text.split(",")],
+                       help="rendition boxes, e.g. 3840x2160,1920x1080,320x320")
+    build.add_argument("--quality", type=int, default=DEFAULT_QUALITY, help="JPEG quality")
+    info = commands.add_parser("info", help="show a pack's metadata and size")
+    info.add_argument("pack")
+    args = parser.parse_args()
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtGui import QGuiApplication
+    app = QGuiApplication(sys.argv[:1])  # for the image plugins
+
+    if args.command == "build":
+        output = args.output if args.output.lower().endswith("." + PACK_EXTENSION) else f"{args.output}.{PACK_EXTENSION}"
+        extensions = {bytes(fmt).decode().lower() for fmt in QImageReader.supportedImageFormats()}
+        start = time.perf_counter()
+
+        def report(done: int, total: int) -> None:
+            print(f"\r{done}/{total}", end="", file=sys.stderr, flush=True)
+
+        count = build_pack(args.directory, output, extensions, args.levels, args.quality, args.title, progress=report)
+        print(file=sys.stderr)
+        print(f"{count} images packed into {output} ({os.path.getsize(output) / 2**20:.1f} MB) "
+              f"in {time.perf_counter() - start:.1f} s")
+    else:
+        try:
+            pack = ReferencePack(args.pack)
+        except (OSError, PackError) as e:
+            sys.exit(str(e))
+        meta = pack.metadata
+        print(f"{meta.get('title', '')}: {len(pack)} images, {os.path.getsize(args.pack) / 2**20:.1f} MB")
+        print("levels: " + ", ".join(f"{w}x{h}" for w, h in meta.get("levels", [])))
+        pack.close()
+    del app
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Memory governor for the Figure Drawing Tool's image caches.
+
+Caches register with a ResourceGovernor, which keeps the total number of bytes
+they hold under a configurable budget by evicting the least recently used
+entries across all caches.
+"""
+
+from __future__ import annotations
+import itertools
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Optional, TypeVar
+
+from PySide6.QtGui import QImage, QPixmap
+
+T = TypeVar("T")
+
+# Shared use counter so LRU order can be compared between caches
+_use_counter = itertools.count()
+
+
+def image_bytes(image: Optional[QPixmap | QImage]) -> int:
+    """Approximate memory held by a pixmap or image."""
+    if image is None or image.isNull():
+        return 0
+    return image.width() * image.height() * max(image.depth(), 8) // 8
+
+
+class LruCache(Generic[T]):
+    """LRU cache whose entries are sized in bytes and trimmed by a governor.
+
+    Args:
+        sizeof: Returns the number of bytes an entry holds
+        governor: Governor to register with; the cache is unbounded without one
+        name: Label used in governor stats
+    """
+
+    def __init__(
+        self,
+        sizeof: Callable[[T], int],
+        governor: Optional[ResourceGovernor] = None,
+        name: str = "cache",
+    ) -> None:
+        self.name = name
+        self._sizeof = sizeof
+        self._entries: OrderedDict[Hashable, tuple[T, int, int]] = OrderedDict()
+        self._nbytes = 0
+        self._governor = governor
+        if governor is not None:
+            governor.register(self)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        """Total bytes held by cached entries."""
+        return self._nbytes
+
+    def get(self, key: Hashable) -> Optional[T]:
+        """Return a cached entry and mark it as most recently used."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, size, _ = entry
+        self._entries[key] = (value, size, next(_use_counter))
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value: T) -> None:
+        """Insert an entry, then let the governor trim to budget."""
+        self.discard(key)
+        size = self._sizeof(value)
+        self._entries[key] = (value, size, next(_use_counter))
+        self._nbytes += size
+        if self._governor is not None:
+            self._governor.enforce(protect=(self, key))
+
+    def discard(self, key: Hashable) -> None:
+        """Remove an entry if present."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._nbytes -= entry[1]
+
+    def oldest_use(self) -> Optional[int]:
+        """Use stamp of the least recently used entry, or None when empty."""
+        if not self._entries:
+            return None
+        return next(iter(self._entries.values()))[2]
+
+    def oldest_key(self) -> Optional[Hashable]:
+        """Key of the least recently used entry, or None when empty."""
+        return next(iter(self._entries), None)
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._entries.clear()
+        self._nbytes = 0
+
+
+class ResourceGovernor:
+    """Keeps registered caches within a shared byte budget.
+
+    Besides LRU caches, callers can register "pinned" byte counters for
+    memory that can't be evicted (such as the frame on screen); it counts
+    toward the budget so caches shrink to make room for it.
+    """
+
+    def __init__(self, budget_bytes: int) -> None:
+        self.budget_bytes = budget_bytes
+        self._caches: list[LruCache] = []
+        self._pinned: list[Callable[[], int]] = []
+
+    def register(self, cache: LruCache) -> None:
+        """Put a cache under this governor's budget."""
+        self._caches.append(cache)
+
+    def register_pinned(self, counter: Callable[[], int]) -> None:
+        """Count non-evictable bytes reported by counter toward the budget."""
+        self._pinned.append(counter)
+
+    def set_budget(self, budget_bytes: int) -> None:
+        """Change the budget and trim immediately if now over it."""
+        self.budget_bytes = budget_bytes
+        self.enforce()
+
+    def cache_bytes(self) -> int:
+        """Bytes held by evictable cache entries."""
+        return sum(cache.nbytes for cache in self._caches)
+
+    def total_bytes(self) -> int:
+        """Bytes held by caches plus pinned memory."""
+        return self.cache_bytes() + sum(counter() for counter in self._pinned)
+
+    def enforce(self, protect: Optional[tuple[LruCache, Hashable]] = None) -> int:
+        """Evict least recently used entries across caches until within budget.
+
+        Args:
+            protect: (cache, key) of an entry that must survive, typically the
+                one just inserted
+
+        Returns:
+            Number of bytes freed
+        """
+        freed = 0
+        total = self.total_bytes()
+        while total > self.budget_bytes:
+            candidates = [
+                cache for cache in self._caches
+                if cache.oldest_use() is not None
+                and (protect is None or (cache, cache.oldest_key()) != protect)
+            ]
+            if not candidates:
+                break
+            victim = min(candidates, key=lambda cache: cache.oldest_use())
+            before = victim.nbytes
+            victim.discard(victim.oldest_key())
+            freed += before - victim.nbytes
+            total -= before - victim.nbytes
+        return freed
+
+    def clear_caches(self) -> int:
+        """Drop every evictable entry, returning the number of bytes freed."""
+        freed = self.cache_bytes()
+        for cache in self._caches:
+            cache.clear()
+        return freed
+
+    def stats(self) -> dict[str, int]:
+        """Bytes held per cache, plus pinned and total, for diagnostics."""
+        stats = {cache.name: cache.nbytes for cache in self._caches}
+        stats["pinned"] = sum(counter() for counter in self._pinned)
+        stats["total"] = self.cache_bytes() + stats["pinned"]
+        return stats
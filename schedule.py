@@ -0,0 +1,159 @@
+"""
+Timed sequence schedules for the Figure Drawing Tool.
+
+A schedule is a list of phases, each showing a number of images for a fixed
+time, like a figure class warming up with gestures before longer poses:
+"10x30s, 5x1m, 2x5m, 1x20m".
+
+Schedules are read from a JSON file mapping names to phase lists, either as
+spec strings or as [count, seconds] pairs:
+
+    {
+        "Class": "10x30s, 5x1m, 2x5m, 1x20m",
+        "Gestures": [[20, 30], [10, 60]]
+    }
+"""
+
+from __future__ import annotations
+import json
+import re
+from typing import Callable, Optional
+
+# Images due within this many seconds are decoded ahead of time
+PREFETCH_HORIZON_SECONDS = 90
+# Time an upcoming image must have to finish decoding, in measured decode times
+DECODE_SAFETY_FACTOR = 4
+MAX_PREFETCH_DEPTH = 6
+
+_PHASE_PATTERN = re.compile(r"^\s*(\d+)\s*[x×*]\s*(\d+(?:\.\d+)?)\s*(s|sec|m|min|h)?\s*$", re.IGNORECASE)
+_UNIT_SECONDS = {"s": 1, "sec": 1, "m": 60, "min": 60, "h": 3600}
+
+
+def format_seconds(seconds: int) -> str:
+    """Short duration label such as 30s, 5m or 90s, in the spec syntax."""
+    return f"{seconds // 60}m" if seconds >= 60 and seconds % 60 == 0 else f"{seconds}s"
+
+
+class Schedule:
+    """An ordered list of (image count, seconds per image) phases.
+
+    Args:
+        name: Name shown in the time preset dropdown
+        phases: (count, seconds) pairs, both positive
+    """
+
+    def __init__(self, name: str, phases: list[tuple[int, int]]) -> None:
+        if not phases:
+            raise ValueError(f"Schedule {name!r} has no phases")
+        for count, seconds in phases:
+            if count < 1 or seconds < 1:
+                raise ValueError(f"Schedule {name!r} has an empty phase: {count}x{seconds}s")
+        self.name = name
+        self.phases = phases
+
+    @classmethod
+    def parse(cls, name: str, spec: str) -> Schedule:
+        """Create a schedule from a spec string like "10x30s, 5x1m, 1x20m".
+
+        Seconds are assumed when a phase has no unit.
+        """
+        phases = []
+        for part in spec.split(","):
+            match = _PHASE_PATTERN.match(part)
+            if match is None:
+                raise ValueError(f"Bad schedule phase {part.strip()!r} in {name!r}, expected e.g. 10x30s")
+            count, value, unit = match.groups()
+            phases.append((int(count), round(float(value) * _UNIT_SECONDS[(unit or "s").lower()])))
+        return cls(name, phases)
+
+    @property
+    def total_images(self) -> int:
+        """Number of images in the whole sequence."""
+        return sum(count for count, _ in self.phases)
+
+    @property
+    def total_seconds(self) -> int:
+        """Length of the whole sequence in seconds."""
+        return sum(count * seconds for count, seconds in self.phases)
+
+    def seconds_for(self, index: int) -> Optional[int]:
+        """Seconds the image at a 0-based position is shown, None past the end."""
+        for count, seconds in self.phases:
+            if index < count:
+                return seconds
+            index -= count
+        return None
+
+    def spec(self) -> str:
+        """Spec string the schedule can be parsed back from."""
+        return ", ".join(f"{count}x{format_seconds(seconds)}" for count, seconds in self.phases)
+
+    def label(self) -> str:
+        """Name plus spec, for the time preset dropdown."""
+        return f"{self.name} ({self.spec()})"
+
+
+DEFAULT_SCHEDULES = [
+    Schedule.parse("Class", "10x30s, 5x1m, 2x5m, 1x20m"),
+    Schedule.parse("Gestures", "20x30s, 10x1m"),
+]
+
+
+def load_schedules(path: str) -> list[Schedule]:
+    """Read schedules from a JSON file (see module docstring).
+
+    Raises:
+        OSError: If the file can't be read
+        ValueError: If the file or a schedule in it is malformed
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError("Schedule file must map schedule names to phases")
+
+    schedules = []
+    for name, phases in data.items():
+        if isinstance(phases, str):
+            schedules.append(Schedule.parse(name, phases))
+        elif isinstance(phases, list):
+            try:
+                schedules.append(Schedule(name, [(int(count), int(seconds)) for count, seconds in phases]))
+            except (TypeError, ValueError) as e:
+                raise ValueError(f"Bad phases for {name!r}, expected [count, seconds] pairs") from e
+        else:
+            raise ValueError(f"Bad phases for {name!r}")
+    return schedules
+
+
+def prefetch_depth(
+    seconds_for: Callable[[int], Optional[int]], position: int, remaining_seconds: float, decode_seconds: float
+) -> int:
+    """How many upcoming images to keep decoded ahead of the one on screen.
+
+    Takes every image due within PREFETCH_HORIZON_SECONDS, which goes deep
+    through short gesture phases and stays shallow during long poses. When
+    decodes are slow compared with the intervals, it goes further: the j-th
+    image ahead waits behind j queued decodes, so it is included while it is
+    due within DECODE_SAFETY_FACTOR times that decode backlog.
+
+    Args:
+        seconds_for: Seconds the image at a 0-based position is shown, None past the end
+        position: Position of the next image in the sequence
+        remaining_seconds: Time left on the image on screen
+        decode_seconds: Measured time to decode one image
+
+    Returns:
+        Number of images to prefetch, 1 to MAX_PREFETCH_DEPTH (0 at the end)
+    """
+    depth = 0
+    due = remaining_seconds
+    while depth < MAX_PREFETCH_DEPTH:
+        seconds = seconds_for(position + depth)
+        if seconds is None:
+            break
+        horizon = max(PREFETCH_HORIZON_SECONDS, DECODE_SAFETY_FACTOR * decode_seconds * (depth + 1))
+        if depth and due > horizon:
+            break
+        depth += 1
+        due += seconds
+    return depth
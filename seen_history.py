@@ -0,0 +1,176 @@
+"""
+Cross-session record of which images have been shown.
+
+SeenHistory appends one fixed-size record per shown image (timestamp, session
+number, 64-bit image id) to a binary log. Records are appended in time order,
+so "shown in the last N sessions or days" is a suffix of the log, located by
+binary search over a memory map. The suffix's ids go straight from the map
+into a NumPy Bloom filter, without creating Python objects per record.
+"""
+
+from __future__ import annotations
+import hashlib
+import math
+import os
+import time
+from typing import Optional
+
+import numpy as np
+
+RECORD_DTYPE = np.dtype([("time", "<u4"), ("session", "<u4"), ("id", "<u8")])
+BLOOM_BITS_PER_ENTRY = 10  # about 1% false positives with BLOOM_HASHES hashes
+BLOOM_HASHES = 7
+# Beyond this the log is compacted to its newest half (64 MB of records)
+MAX_RECORDS = 4_000_000
+
+
+def _id_digest(path: str) -> bytes:
+    """8-byte hash of a normalized path or URL."""
+    if "://" not in path:
+        path = os.path.normcase(path if os.path.isabs(path) else os.path.abspath(path))
+    return hashlib.blake2b(path.encode("utf-8"), digest_size=8).digest()
+
+
+def image_id(path: str) -> int:
+    """Stable 64-bit id for an image path or URL."""
+    return int.from_bytes(_id_digest(path), "little")
+
+
+def image_ids(paths: list[str]) -> np.ndarray:
+    """Ids of many paths as a uint64 array."""
+    return np.frombuffer(b"".join(map(_id_digest, paths)), dtype="<u8").astype(np.uint64)
+
+
+class BloomFilter:
+    """Set membership test over 64-bit ids, with no false negatives.
+
+    Args:
+        ids: uint64 ids to add
+    """
+
+    def __init__(self, ids: np.ndarray) -> None:
+        self.count = len(ids)
+        # Power of two so positions can be masked instead of divided
+        self.num_bits = 1 << max(6, math.ceil(math.log2(max(self.count, 1) * BLOOM_BITS_PER_ENTRY)))
+        bits = np.zeros(self.num_bits, dtype=bool)
+        bits[self._positions(ids)] = True
+        self._bits = np.packbits(bits, bitorder="little")
+
+    def _positions(self, ids: np.ndarray) -> np.ndarray:
+        """Bit positions of each id, shape (len(ids), BLOOM_HASHES), by double hashing."""
+        ids = np.asarray(ids, dtype=np.uint64)
+        h1 = (ids & np.uint64(0xFFFFFFFF))[:, None]
+        h2 = ((ids >> np.uint64(32)) | np.uint64(1))[:, None]
+        k = np.arange(BLOOM_HASHES, dtype=np.uint64)
+        return ((h1 + k * h2) & np.uint64(self.num_bits - 1)).astype(np.intp)
+
+    def contains(self, ids: np.ndarray) -> np.ndarray:
+        """Boolean array: True where an id was (probably) added."""
+        positions = self._positions(ids)
+        hits = (self._bits[positions >> 3] >> (positions & 7).astype(np.uint8)) & 1
+        return hits.all(axis=1)
+
+
+class SeenHistory:
+    """Append-only log of shown images, persisted across runs.
+
+    Args:
+        path: Log file location; created on the first record
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.session: Optional[int] = None
+        self._file = None
+
+    def _read(self) -> np.ndarray:
+        """Memory-map the log's complete records (empty if there is no log)."""
+        try:
+            count = os.path.getsize(self.path) // RECORD_DTYPE.itemsize
+        except OSError:
+            count = 0
+        if count == 0:
+            return np.empty(0, dtype=RECORD_DTYPE)
+        return np.memmap(self.path, dtype=RECORD_DTYPE, mode="r", shape=(count,))
+
+    @staticmethod
+    def _first_at_least(records: np.ndarray, field: str, value: int) -> int:
+        """Index of the first record whose field is >= value (binary search)."""
+        low, high = 0, len(records)
+        while low < high:
+            middle = (low + high) // 2
+            if records[middle][field] < value:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def begin_session(self) -> int:
+        """Start numbering records for a new session, compacting the log if needed."""
+        self.close()
+        records = self._read()
+        self.session = int(records[-1]["session"]) + 1 if len(records) else 1
+        if len(records) > MAX_RECORDS:
+            keep = np.array(records[-(MAX_RECORDS // 2):])  # copy out of the map
+            del records  # the file can't be replaced while mapped on Windows
+            self._compact(keep)
+        return self.session
+
+    def _compact(self, keep: np.ndarray) -> None:
+        """Rewrite the log with only the given records."""
+        temp_path = self.path + ".tmp"
+        try:
+            keep.tofile(temp_path)
+            os.replace(temp_path, self.path)
+        except OSError:
+            pass  # keep the long log rather than lose it
+
+    def record(self, image_path: str, when: Optional[float] = None) -> None:
+        """Append one shown image to the log; write errors are ignored."""
+        if self.session is None:
+            self.begin_session()
+        record = np.array(
+            [(int(time.time() if when is None else when), self.session, image_id(image_path))],
+            dtype=RECORD_DTYPE
+        )
+        try:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._file = open(self.path, "ab")
+                # Drop a partial record left by a crash so the rest stay aligned
+                size = self._file.tell()
+                if size % RECORD_DTYPE.itemsize:
+                    self._file.truncate(size - size % RECORD_DTYPE.itemsize)
+            self._file.write(record.tobytes())
+            self._file.flush()
+        except OSError:
+            self.close()
+            self.session = None
+
+    def recent_filter(self, sessions: int = 0, days: float = 0, now: Optional[float] = None) -> BloomFilter:
+        """Bloom filter of images shown in the last `sessions` sessions or `days` days."""
+        records = self._read()
+        start = len(records)
+        if len(records) and sessions > 0:
+            last_session = int(records[-1]["session"])
+            start = min(start, self._first_at_least(records, "session", last_session - sessions + 1))
+        if len(records) and days > 0:
+            cutoff = (time.time() if now is None else now) - days * 86400
+            start = min(start, self._first_at_least(records, "time", max(0, int(cutoff))))
+        return BloomFilter(records["id"][start:])
+
+    def order_unseen_first(self, paths: list[str], sessions: int = 0, days: float = 0) -> list[str]:
+        """Stable-partition paths so images not shown recently come first."""
+        if not paths or (sessions <= 0 and days <= 0):
+            return paths
+        recent = self.recent_filter(sessions, days)
+        if recent.count == 0:
+            return paths
+        seen = recent.contains(image_ids(paths))
+        return [p for p, s in zip(paths, seen) if not s] + [p for p, s in zip(paths, seen) if s]
+
+    def close(self) -> None:
+        """Close the log file; the next record reopens it."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,145 @@
+"""
+Single-instance support for the Figure Drawing Tool.
+
+The first instance listens on a per-user local socket (a named pipe on
+Windows). A later launch connects, forwards its command line and working
+directory as one JSON line and exits, without creating a QApplication or
+building any UI.
+
+:to use:
+    if send_to_running_instance({"argv": sys.argv[1:], "cwd": os.getcwd()}):
+        sys.exit(0)
+    server = InstanceServer()
+    server.message_received.connect(handle_message)
+    server.listen()
+"""
+
+from __future__ import annotations
+import hashlib
+import json
+import os
+from typing import Optional
+
+from PySide6.QtCore import QObject, QStandardPaths, Signal
+from PySide6.QtNetwork import QAbstractSocket, QLocalServer, QLocalSocket
+
+CONNECT_TIMEOUT_MS = 300
+REPLY_TIMEOUT_MS = 1000
+MAX_MESSAGE_BYTES = 1 << 20
+ACK = b"ok\n"
+
+
+def instance_name() -> str:
+    """Local socket name, one per user so users don't share instances.
+
+    On Unix the socket lives in the user's private runtime folder where
+    there is one, so other users can't connect to it.
+    """
+    home = hashlib.blake2b(os.path.expanduser("~").encode("utf-8"), digest_size=6).hexdigest()
+    name = f"figure-drawing-tool-{home}"
+    if os.name == "posix":
+        runtime_dir = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.RuntimeLocation)
+        if runtime_dir:
+            return os.path.join(runtime_dir, name)
+    return name
+
+
+def send_to_running_instance(message: dict, name: Optional[str] = None) -> bool:
+    """Deliver a message to a running instance.
+
+    An instance that is busy (e.g. scanning a library) still accepts the
+    connection; it reads the message when its event loop gets to it.
+
+    Returns:
+        True if an instance is running and the message was sent to it
+    """
+    socket = QLocalSocket()
+    socket.connectToServer(name or instance_name())
+    if not socket.waitForConnected(CONNECT_TIMEOUT_MS):
+        return False
+    socket.write(json.dumps(message).encode("utf-8") + b"\n")
+    if not socket.waitForBytesWritten(REPLY_TIMEOUT_MS):
+        return False
+    # Give a responsive instance the chance to confirm before hanging up
+    received = b""
+    while not received.endswith(b"\n") and socket.waitForReadyRead(REPLY_TIMEOUT_MS):
+        received += bytes(socket.readAll().data())
+    socket.disconnectFromServer()
+    return True
+
+
+def _is_listening(name: str) -> bool:
+    """Whether some process accepts connections on the socket name."""
+    socket = QLocalSocket()
+    socket.connectToServer(name)
+    connected = socket.waitForConnected(CONNECT_TIMEOUT_MS)
+    socket.abort()
+    return connected
+
+
+class InstanceServer(QObject):
+    """Receives messages from later launches.
+
+    Args:
+        name: Socket name; defaults to instance_name()
+        parent: Qt parent object
+    """
+
+    message_received = Signal(object)  # dict sent by send_to_running_instance
+
+    def __init__(self, name: Optional[str] = None, parent: Optional[QObject] = None) -> None:
+        super().__init__(parent)
+        self.name = name or instance_name()
+        # No socket options: with any set, Qt replaces an existing socket
+        # instead of failing, which would hide a running instance
+        self._server = QLocalServer(self)
+        self._server.newConnection.connect(self._on_new_connection)
+        self._buffers: dict[QLocalSocket, bytes] = {}
+
+    def listen(self) -> bool:
+        """Start listening, taking over a socket left behind by a crashed instance.
+
+        Returns:
+            False if another instance is listening already
+        """
+        if self._server.listen(self.name):
+            return True
+        if self._server.serverError() != QAbstractSocket.SocketError.AddressInUseError:
+            return False
+        if _is_listening(self.name):
+            return False
+        QLocalServer.removeServer(self.name)
+        return self._server.listen(self.name)
+
+    def close(self) -> None:
+        self._server.close()
+
+    def _on_new_connection(self) -> None:
+        while self._server.hasPendingConnections():
+            socket = self._server.nextPendingConnection()
+            self._buffers[socket] = b""
+            socket.readyRead.connect(lambda socket=socket: self._on_ready_read(socket))
+            socket.disconnected.connect(lambda socket=socket: self._forget(socket))
+
+    def _on_ready_read(self, socket: QLocalSocket) -> None:
+        data = self._buffers.get(socket, b"") + bytes(socket.readAll().data())
+        if len(data) > MAX_MESSAGE_BYTES:
+            socket.abort()
+            return
+        if not data.endswith(b"\n"):
+            self._buffers[socket] = data
+            return
+        self._buffers[socket] = b""
+        try:
+            message = json.loads(data)
+        except ValueError:
+            socket.abort()
+            return
+        socket.write(ACK)
+        socket.flush()
+        if isinstance(message, dict):
+            self.message_received.emit(message)
+
+    def _forget(self, socket: QLocalSocket) -> None:
+        self._buffers.pop(socket, None)
+        socket.deleteLater()
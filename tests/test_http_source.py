@@ -0,0 +1,156 @@
+"""
+Tests for http_source against a local http.server standing in for an image server.
+
+:to use:
+    python -m pytest tests/test_http_source.py
+"""
+
+from __future__ import annotations
+import functools
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from concurrent.futures import Future
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from http_source import HttpImageSource, HttpSourceError  # noqa: E402
+
+
+class _Handler(SimpleHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, as the connection pool expects
+
+    def log_message(self, format: str, *args) -> None:
+        self.server.requests.append((self.command, self.path, self.headers.get("If-Modified-Since")))
+
+
+class HttpImageSourceTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.root = tempfile.mkdtemp(prefix="fdt_http_")
+        self.served = os.path.join(self.root, "served")
+        self.cache = os.path.join(self.root, "cache")
+        os.makedirs(os.path.join(self.served, "poses"))
+        for name in ["poses/a.jpg", "poses/b.png", "notes.txt"]:
+            with open(os.path.join(self.served, name), "wb") as f:
+                f.write(name.encode("utf-8") * 100)
+        with open(os.path.join(self.served, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump({"images": [{"path": "poses/a.jpg"}, "poses/b.png", "notes.txt", "poses/missing.jpg"]}, f)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(_Handler, directory=self.served))
+        self.server.daemon_threads = True
+        self.server.requests = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}/"
+        self.sources: list[HttpImageSource] = []
+
+    def tearDown(self) -> None:
+        for source in self.sources:
+            source.close()
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _source(self, **kwargs) -> HttpImageSource:
+        kwargs.setdefault("retries", 0)
+        source = HttpImageSource(self.base + "manifest.json", cache_dir=self.cache, **kwargs)
+        self.sources.append(source)
+        return source
+
+    def test_manifest_resolves_relative_entries_and_filters_extensions(self) -> None:
+        urls = self._source().load_manifest({"jpg", "png"})
+        self.assertEqual(urls, [self.base + "poses/a.jpg", self.base + "poses/b.png", self.base + "poses/missing.jpg"])
+
+    def test_manifest_loads_on_a_download_thread(self) -> None:
+        future = self._source().load_manifest_async({"png"})
+        self.assertEqual(future.result(timeout=10), [self.base + "poses/b.png"])
+
+    def test_fetch_caches_and_revalidates(self) -> None:
+        url = self.base + "poses/a.jpg"
+        path = self._source().fetch(url)
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), b"poses/a.jpg" * 100)
+
+        # A new session revalidates the cached copy instead of downloading it again
+        self.assertEqual(self._source().fetch(url), path)
+        conditional = [r for r in self.server.requests if r[1] == "/poses/a.jpg"]
+        self.assertEqual(len(conditional), 2)
+        self.assertIsNone(conditional[0][2])
+        self.assertIsNotNone(conditional[1][2])
+
+    def test_fetch_async_reports_downloads_without_blocking(self) -> None:
+        fetched = []
+        done = threading.Event()
+
+        def on_fetched(url: str, path: str) -> None:
+            fetched.append((url, path))
+            if len(fetched) == 2:
+                done.set()
+
+        source = self._source(on_fetched=on_fetched)
+        source.fetch_async(self.base + "poses/b.png")
+        source.fetch_async(self.base + "poses/missing.jpg")
+        self.assertTrue(done.wait(10))
+        results = dict(fetched)
+        self.assertTrue(os.path.isfile(results[self.base + "poses/b.png"]))
+        self.assertIsNone(results[self.base + "poses/missing.jpg"])
+
+        # Already downloaded: a finished future, and no second download
+        future = source.fetch_async(self.base + "poses/b.png")
+        self.assertTrue(future.done())
+        self.assertEqual(future.result(), results[self.base + "poses/b.png"])
+
+    def test_callback_of_a_finished_download_does_not_deadlock(self) -> None:
+        class InlineExecutor:
+            """Runs downloads as they're submitted, so their callbacks run inline."""
+
+            def submit(self, fn, *args) -> Future:
+                future = Future()
+                future.set_result(fn(*args))
+                return future
+
+            def shutdown(self, **kwargs) -> None:
+                pass
+
+        source = self._source()
+        source._executor = InlineExecutor()
+        result = []
+        worker = threading.Thread(target=lambda: result.append(source.fetch(self.base + "poses/a.jpg")), daemon=True)
+        worker.start()
+        worker.join(10)
+        self.assertFalse(worker.is_alive())
+        self.assertTrue(os.path.isfile(result[0]))
+
+    def test_cache_names_stay_in_the_cache_folder(self) -> None:
+        source = self._source()
+        for url, ext in [
+            (self.base + "poses/A.JPG", ".jpg"),
+            (self.base + "x/..%5C..%5Cescape.png", ".png"),
+            (self.base + "poses/a%3Ab%2A.jpeg%22", ""),
+        ]:
+            data_path, _ = source._cache_paths(url)
+            self.assertEqual(os.path.dirname(data_path), self.cache)
+            self.assertRegex(os.path.basename(data_path), r"^[0-9a-f]{16}" + ext.replace(".", r"\.") + "$")
+
+    def test_missing_image_raises(self) -> None:
+        with self.assertRaises(HttpSourceError):
+            self._source().fetch(self.base + "poses/missing.jpg")
+
+    def test_corrupt_cache_metadata_raises_source_error(self) -> None:
+        source = self._source()
+        url = self.base + "poses/a.jpg"
+        source.fetch(url)
+        _, meta_path = source._cache_paths(url)
+        with open(meta_path, "w", encoding="utf-8") as f:
+            f.write("{not json")
+        with self.assertRaises(HttpSourceError):
+            self._source().fetch(url)
+
+
+if __name__ == "__main__":
+    unittest.main()
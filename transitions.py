@@ -0,0 +1,191 @@
+"""
+Image transitions for the canvas, with the incoming frame prepared off-thread.
+
+FrameScaler renders the next image's frame on a worker thread while the
+current one is on screen: grayscale and flip, the smooth scale to the
+canvas's physical size, conversion to a format QPainter blits as is, and
+auto levels.
+When the image is due the canvas swaps the prepared frame in, so the switch
+and every frame of the transition only draw finished images; nothing is
+decoded or scaled on the GUI thread. A crossfade or slide is painted from
+the outgoing and incoming frames as the animation advances, at the
+display's refresh rate.
+
+:to use:
+    scaler = FrameScaler()
+    scaler.ready.connect(canvas.on_frame_ready)
+    scaler.request(FrameJob(key, path, decoded, image, size, dpr, grayscale, flip_h, flip_v, auto_levels))
+"""
+
+from __future__ import annotations
+import threading
+from typing import Optional
+
+from PySide6.QtCore import QObject, QPointF, QRectF, QSize, Qt, Signal
+from PySide6.QtGui import QColor, QImage, QPainter, QPainterPath, QTransform
+
+from auto_levels import apply_levels
+from decode_pool import DecodedImage, to_display_format
+
+TRANSITION_CUT = "cut"
+TRANSITION_CROSSFADE = "crossfade"
+TRANSITION_SLIDE = "slide"
+TRANSITIONS = [(TRANSITION_CUT, "Cut"), (TRANSITION_CROSSFADE, "Crossfade"), (TRANSITION_SLIDE, "Slide")]
+DEFAULT_TRANSITION_MS = 250
+
+
+def process_image(image: QImage, grayscale: bool, flip_h: bool, flip_v: bool) -> QImage:
+    """The image with grayscale and flips applied (the input itself when there are none)."""
+    if grayscale:
+        image = image.convertToFormat(QImage.Format.Format_Grayscale8)
+    if flip_h or flip_v:
+        transform = QTransform()
+        if flip_h:
+            transform.scale(-1, 1)
+        if flip_v:
+            transform.scale(1, -1)
+        image = image.transformed(transform)
+    return image
+
+
+def scale_frame(image: QImage, physical_size: QSize, dpr: float) -> QImage:
+    """A frame of the image fitted to a canvas size in physical pixels, ready to draw.
+
+    The frame never shares pixels with the input, which may live in shared
+    memory that is released with its DecodedImage.
+    """
+    scaled = image.scaled(physical_size, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+    frame = to_display_format(scaled)
+    if frame.cacheKey() == image.cacheKey():
+        frame = frame.copy()  # same size returns a shallow copy
+    frame.setDevicePixelRatio(dpr)
+    return frame
+
+
+def frame_origin(frame: QImage, physical_size: QSize, dpr: float) -> QPointF:
+    """Top left of a frame centred on whole device pixels, so it isn't resampled when drawn."""
+    x = (physical_size.width() - frame.width()) // 2 / dpr
+    y = (physical_size.height() - frame.height()) // 2 / dpr
+    return QPointF(x, y)
+
+
+def paint_transition(
+    painter: QPainter, kind: str, progress: float, outgoing: QImage, incoming: QImage,
+    physical_size: QSize, dpr: float, background: QColor, backwards: bool = False
+) -> None:
+    """Paint a transition between two frames, progress running from 0 to 1.
+
+    The crossfade blends the overlap of the frames and fades whatever of
+    the outgoing frame the incoming one doesn't cover into the background.
+    """
+    old_origin = frame_origin(outgoing, physical_size, dpr)
+    new_origin = frame_origin(incoming, physical_size, dpr)
+    if kind == TRANSITION_SLIDE:
+        width = physical_size.width() / dpr
+        shift = -width * progress if not backwards else width * progress
+        painter.drawImage(old_origin + QPointF(shift, 0), outgoing)
+        painter.drawImage(new_origin + QPointF(shift + (width if not backwards else -width), 0), incoming)
+        return
+
+    painter.drawImage(old_origin, outgoing)
+    painter.setOpacity(progress)
+    uncovered = QPainterPath()
+    uncovered.addRect(QRectF(old_origin, outgoing.deviceIndependentSize()))
+    covered = QPainterPath()
+    covered.addRect(QRectF(new_origin, incoming.deviceIndependentSize()))
+    painter.fillPath(uncovered.subtracted(covered), background)
+    painter.drawImage(new_origin, incoming)
+    painter.setOpacity(1.0)
+
+
+class FrameJob:
+    """A frame for the canvas to render ahead of time.
+
+    Args:
+        key: What the frame depends on; the canvas compares it with its state at the swap
+        path: Image path
+        source: Decoded image, held so its pixels stay mapped while rendering
+        image: Pixels to render: the source's, or its value-filtered version
+        physical_size: Canvas size in physical pixels
+        dpr: Device pixel ratio of the canvas's screen
+        grayscale: Convert to grayscale
+        flip_h: Mirror horizontally
+        flip_v: Mirror vertically
+        auto_levels: Stretch the frame's tones by the source's levels table
+    """
+
+    def __init__(
+        self, key: tuple, path: str, source: DecodedImage, image: QImage, physical_size: QSize, dpr: float,
+        grayscale: bool, flip_h: bool, flip_v: bool, auto_levels: bool = False
+    ) -> None:
+        self.key = key
+        self.path = path
+        self.source = source
+        self.image = image
+        self.physical_size = physical_size
+        self.dpr = dpr
+        self.grayscale = grayscale
+        self.flip_h = flip_h
+        self.flip_v = flip_v
+        self.auto_levels = auto_levels
+        self.frame: Optional[QImage] = None  # set by the scaler
+
+
+class FrameScaler(QObject):
+    """Renders frames on a worker thread, one at a time.
+
+    Only the newest request is kept: the canvas has one back buffer, and a
+    request made while resizing supersedes the ones before it.
+
+    Args:
+        parent: Qt parent object
+    """
+
+    ready = Signal(object)  # FrameJob with its frame
+
+    def __init__(self, parent: Optional[QObject] = None) -> None:
+        super().__init__(parent)
+        self._pending: Optional[FrameJob] = None
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._work, name="frame-scaler", daemon=True)
+        self._thread.start()
+
+    def request(self, job: FrameJob) -> None:
+        """Render a frame, replacing any request not started yet."""
+        with self._condition:
+            self._pending = job
+            self._condition.notify()
+
+    def cancel_pending(self) -> None:
+        """Drop the request not started yet; a frame being rendered still arrives."""
+        with self._condition:
+            self._pending = None
+
+    def _work(self) -> None:
+        while True:
+            with self._condition:
+                while self._pending is None and not self._stopped:
+                    self._condition.wait()
+                if self._stopped:
+                    return
+                job, self._pending = self._pending, None
+            try:
+                image = process_image(job.image, job.grayscale, job.flip_h, job.flip_v)
+                job.frame = scale_frame(image, job.physical_size, job.dpr)
+                if job.auto_levels:
+                    apply_levels(job.frame, job.source.levels)
+            except MemoryError:
+                continue
+            job.image = None  # the frame is all the canvas needs
+            try:
+                self.ready.emit(job)
+            except RuntimeError:
+                return  # scaler deleted during shutdown
+
+    def shutdown(self) -> None:
+        """Stop the worker thread after its current frame."""
+        with self._condition:
+            self._stopped = True
+            self._pending = None
+            self._condition.notify()
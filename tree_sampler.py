@@ -0,0 +1,364 @@
+"""
+Random sampling of images from a folder tree without listing all of it.
+
+DirectoryCounts keeps the number of images directly in each folder and the
+folder's subfolder names, saved between runs and checked against a folder's
+modification time when it is visited. TreeSampler draws an image by walking
+down from the root: at each folder it picks the folder's own images or one
+of its subfolders, in proportion to the images under each, and only the
+folder it ends in is listed. A short session from a huge archive touches a
+few folders per image instead of every file, and a big subfolder is drawn
+from as often as its size says, not more. Subfolders not counted yet weigh
+as much as their counted siblings on average; count_all fills in the rest
+in the background for later sessions.
+
+Balanced sampling gives each top-level subfolder (say, one model's photos)
+the same weight and draws from every one before drawing from any again.
+
+:to use:
+    counts = DirectoryCounts(root, {"jpg", "png"}, cache_path)
+    sampler = TreeSampler(counts, balanced=True)
+    session = sampler.sample(10)
+    counts.save()
+"""
+
+from __future__ import annotations
+import json
+import os
+import random
+import threading
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+
+from library_index import full_path
+
+CACHE_VERSION = 1
+
+
+def _join(relative_dir: str, name: str) -> str:
+    return f"{relative_dir}/{name}" if relative_dir else name
+
+
+def _ancestors(relative_dir: str) -> list[str]:
+    """The folder and every folder above it, up to the root ("")."""
+    folders = [relative_dir]
+    while relative_dir:
+        relative_dir = relative_dir.rpartition("/")[0]
+        folders.append(relative_dir)
+    return folders
+
+
+class DirectoryCounts:
+    """Image counts per folder of a tree, persisted and revalidated lazily.
+
+    A folder's modification time changes when entries are added to it or
+    removed from it, so a visited folder costs a stat() while unchanged and
+    is listed again only when it has changed. Changes deeper down are picked
+    up when those folders are visited.
+
+    Args:
+        root: Folder the tree starts at
+        extensions: Lowercase image extensions without the dot
+        cache_path: JSON file the counts are kept in, None to keep them in memory
+    """
+
+    def __init__(self, root: str, extensions: Iterable[str], cache_path: Optional[str] = None) -> None:
+        self.root = root
+        self.extensions = set(extensions)
+        self.cache_path = cache_path
+        self.complete = False  # every folder counted by count_all
+        self.counting = False  # count_all running
+        self.folders_listed = 0  # os.scandir calls, to see what a session touched
+        # folder -> (mtime_ns, images directly in it, subfolder names)
+        self._entries: dict[str, tuple[int, int, list[str]]] = {}
+        self._checked: set[str] = set()  # folders validated this run
+        self._names: dict[str, list[str]] = {}  # image names of folders listed this run
+        self._totals: dict[str, float] = {}  # images under a folder, memoized
+        self._changed = False
+        # Guards changes to the tables, which count_all swaps and saves on its thread
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        if self.cache_path is None:
+            return
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                data = json.load(f)
+            if (data.get("version") != CACHE_VERSION or data.get("root") != self.root
+                    or set(data.get("extensions", [])) != self.extensions):
+                return
+            self._entries = {
+                folder: (int(mtime), int(count), list(subfolders))
+                for folder, (mtime, count, subfolders) in data["folders"].items()
+            }
+            self.complete = bool(data.get("complete"))
+        except (OSError, ValueError, TypeError, KeyError, AttributeError):
+            self._entries = {}  # missing or unreadable: count afresh
+
+    def save(self) -> None:
+        """Write the counts if they changed since loading or the last save."""
+        if self.cache_path is None or not self._changed:
+            return
+        with self._save_lock:
+            with self._lock:
+                self._changed = False
+                entries = dict(self._entries)
+            data = {
+                "version": CACHE_VERSION, "root": self.root, "extensions": sorted(self.extensions),
+                "complete": self.complete,
+                "folders": {folder: [*entry[:2], entry[2]] for folder, entry in entries.items()},
+            }
+            temp_path = self.cache_path + ".tmp"
+            try:
+                os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f, separators=(",", ":"))
+                os.replace(temp_path, self.cache_path)
+            except OSError:
+                pass  # counted again next time
+
+    def _scan(self, folder: str) -> Optional[tuple[int, list[str], list[str]]]:
+        """(mtime_ns, image names, subfolder names) of a folder, None if it can't be read.
+
+        Symlinked folders aren't followed, as in scan_library.
+        """
+        path = full_path(self.root, folder)
+        images: list[str] = []
+        subfolders: list[str] = []
+        try:
+            # Taken before listing, so a change during the listing is seen next time
+            mtime = os.stat(path).st_mtime_ns
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subfolders.append(entry.name)
+                        elif entry.is_file():
+                            ext = os.path.splitext(entry.name)[1].lower().lstrip(".")
+                            if ext in self.extensions:
+                                images.append(entry.name)
+                    except OSError:
+                        continue
+        except OSError:
+            return None
+        images.sort()
+        subfolders.sort()
+        return mtime, images, subfolders
+
+    def _set(self, folder: str, entry: Optional[tuple[int, int, list[str]]]) -> None:
+        with self._lock:
+            old = self._entries.get(folder)
+            if entry is None:
+                self._entries.pop(folder, None)
+            else:
+                self._entries[folder] = entry
+            if old is None or entry is None or old[1:] != entry[1:]:
+                for ancestor in _ancestors(folder):
+                    self._totals.pop(ancestor, None)
+            self._changed = True
+
+    def entry(self, folder: str) -> Optional[tuple[int, list[str]]]:
+        """(image count, subfolder names) of a folder, listing it if it changed; None if gone."""
+        if folder not in self._checked:
+            self._checked.add(folder)
+            cached = self._entries.get(folder)
+            try:
+                unchanged = cached is not None and os.stat(full_path(self.root, folder)).st_mtime_ns == cached[0]
+            except OSError:
+                self._set(folder, None)
+                return None
+            if not unchanged:
+                self.list_images(folder)
+        cached = self._entries.get(folder)
+        return None if cached is None else cached[1:]
+
+    def list_images(self, folder: str) -> list[str]:
+        """Names of the images directly in a folder, listed once per run."""
+        names = self._names.get(folder)
+        if names is None:
+            scanned = self._scan(folder)
+            self.folders_listed += 1
+            self._checked.add(folder)
+            if scanned is None:
+                self._set(folder, None)
+                return []
+            mtime, names, subfolders = scanned
+            self._names[folder] = names
+            self._set(folder, (mtime, len(names), subfolders))
+        return names
+
+    def total(self, folder: str) -> Optional[float]:
+        """Images under a folder as far as counted, None if the folder isn't counted."""
+        totals = self._totals  # memoized in the table count_all may swap out meanwhile
+        total = totals.get(folder)
+        if total is None:
+            cached = self._entries.get(folder)
+            if cached is None:
+                return None
+            total = cached[1] + sum(self.subfolder_totals(folder, cached[2]))
+            totals[folder] = total
+        return total
+
+    def subfolder_totals(self, folder: str, subfolders: list[str]) -> list[float]:
+        """Images under each subfolder, estimating those not counted yet.
+
+        An uncounted subfolder is taken to hold the average of its counted
+        siblings, or as many as the folder itself when none are counted.
+        """
+        totals = [self.total(_join(folder, name)) for name in subfolders]
+        counted = [t for t in totals if t is not None]
+        if counted:
+            estimate = sum(counted) / len(counted)
+        else:
+            cached = self._entries.get(folder)
+            estimate = max(cached[1] if cached else 0, 1)
+        return [estimate if t is None else t for t in totals]
+
+    def count_all(self) -> None:
+        """Count every folder in the tree and save; meant for a background thread.
+
+        The finished table replaces the current one in a single assignment,
+        so the sampler can keep using the old one meanwhile; save writes a
+        copy taken under the lock, so the sampler's changes can't break it.
+        """
+        self.counting = True
+        try:
+            entries: dict[str, tuple[int, int, list[str]]] = {}
+            pending = [""]
+            while pending:
+                folder = pending.pop()
+                scanned = self._scan(folder)
+                if scanned is None:
+                    continue
+                mtime, names, subfolders = scanned
+                entries[folder] = (mtime, len(names), subfolders)
+                pending.extend(_join(folder, name) for name in subfolders)
+            with self._lock:
+                self._entries = entries
+                self._totals = {}
+                self._checked = set(entries)
+                self.complete = True
+                self._changed = True
+            self.save()
+        finally:
+            self.counting = False
+
+
+class TreeSampler:
+    """Draws images from a counted folder tree at random, without repeats.
+
+    Args:
+        counts: Counts of the tree to draw from
+        balanced: Give every top-level subfolder the same share, one image each per round
+        recursive: Draw from subfolders at all
+        rng: Random source, for repeatable draws
+        seen: Given full paths, a boolean array of those shown recently; a
+            folder's other images are drawn first
+    """
+
+    def __init__(
+        self, counts: DirectoryCounts, balanced: bool = False, recursive: bool = True,
+        rng: Optional[random.Random] = None, seen: Optional[Callable[[list[str]], np.ndarray]] = None
+    ) -> None:
+        self.counts = counts
+        self.balanced = balanced
+        self.recursive = recursive
+        self.rng = rng or random.Random()
+        self.seen = seen
+        self._drawn: set[str] = set()  # relative paths drawn
+        self._drawn_under: dict[str, int] = {}  # folder -> images drawn in or below it
+        self._drawn_in: dict[str, int] = {}  # folder -> images drawn directly from it
+        self._exhausted: set[str] = set()  # folders with nothing left to draw
+        self._emptied: set[str] = set()  # folders whose own images are all drawn
+        self._fresh: dict[str, set[str]] = {}  # folder -> image names not shown recently
+        self._round: set[str] = set()  # balanced: top-level groups drawn from this round
+
+    def sample(self, count: int) -> list[str]:
+        """Full paths of up to count more images; fewer when the tree runs out."""
+        drawn = []
+        for _ in range(count):
+            image_path = self.draw()
+            if image_path is None:
+                break
+            drawn.append(image_path)
+        return drawn
+
+    def draw(self) -> Optional[str]:
+        """Full path of one more image, None when every image has been drawn."""
+        # Counts can be stale or estimated; every miss rules out a folder, so this ends
+        while "" not in self._exhausted:
+            folder = self._descend()
+            if folder is None:
+                continue
+            name = self._pick(folder)
+            if name is None:
+                continue
+            relative = _join(folder, name)
+            self._drawn.add(relative)
+            self._drawn_in[folder] = self._drawn_in.get(folder, 0) + 1
+            for ancestor in _ancestors(folder):
+                self._drawn_under[ancestor] = self._drawn_under.get(ancestor, 0) + 1
+            if self.balanced:
+                self._round.add(folder.partition("/")[0] if folder else "")
+            return full_path(self.counts.root, relative)
+        return None
+
+    def _own_left(self, folder: str, count: int) -> float:
+        if folder in self._emptied:
+            return 0.0
+        return max(count - self._drawn_in.get(folder, 0), 0)
+
+    def _descend(self) -> Optional[str]:
+        """Folder to draw the next image from, None after ruling out a folder on the way."""
+        folder = ""
+        while True:
+            entry = self.counts.entry(folder)
+            if entry is None:
+                self._exhausted.add(folder)
+                return None
+            count, subfolders = entry
+            if not self.recursive:
+                subfolders = []
+            # Option 0 is the folder's own images, the rest its subfolders
+            children = [_join(folder, name) for name in subfolders]
+            totals = self.counts.subfolder_totals(folder, subfolders)
+            weights = [self._own_left(folder, count)] + [
+                0.0 if child in self._exhausted else max(total - self._drawn_under.get(child, 0), 0)
+                for child, total in zip(children, totals)
+            ]
+            if folder == "" and self.balanced:
+                weights = self._balance(weights, [""] + children)
+            if not any(weights):
+                self._exhausted.add(folder)
+                return None
+            choice = self.rng.choices(range(len(weights)), weights)[0]
+            if choice == 0:
+                return folder
+            folder = children[choice - 1]
+
+    def _balance(self, weights: list[float], groups: list[str]) -> list[float]:
+        """Equal weights for the top-level groups left in this round."""
+        available = [bool(w) for w in weights]
+        if all(group in self._round for group, ok in zip(groups, available) if ok):
+            self._round.clear()  # every group has had a turn
+        return [1.0 if ok and group not in self._round else 0.0 for group, ok in zip(groups, available)]
+
+    def _pick(self, folder: str) -> Optional[str]:
+        """An undrawn image in the folder, preferring ones not shown recently."""
+        names = self.counts.list_images(folder)
+        left = [name for name in names if _join(folder, name) not in self._drawn]
+        if not left:
+            self._emptied.add(folder)  # the count was stale
+            return None
+        if self.seen is not None:
+            fresh = self._fresh.get(folder)
+            if fresh is None:
+                seen = self.seen([full_path(self.counts.root, _join(folder, name)) for name in names])
+                fresh = self._fresh[folder] = {name for name, s in zip(names, seen) if not s}
+            unseen = [name for name in left if name in fresh]
+            if unseen:
+                left = unseen
+        return self.rng.choice(left)
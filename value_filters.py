@@ -0,0 +1,264 @@
+"""
+Value-study filters for the Figure Drawing Tool.
+
+Notan (2, 3 or 5 values), posterize, squint and edge views, computed with
+vectorized NumPy directly on QImage pixel buffers. FilterEngine runs them on
+a worker thread and caches the results per image and filter parameters, so
+switching between filters during a pose is a cache lookup.
+"""
+
+from __future__ import annotations
+import sys
+import threading
+from collections import deque
+from typing import Callable, Optional
+
+import numpy as np
+from PySide6.QtCore import QObject, Signal
+from PySide6.QtGui import QImage
+
+from decode_pool import DecodedImage
+from resource_governor import LruCache, ResourceGovernor, image_bytes
+
+# Byte offsets of the colour channels inside a 32-bit pixel in memory
+_B, _G, _R, _A = (0, 1, 2, 3) if sys.byteorder == "little" else (3, 2, 1, 0)
+
+# Long side the squint view is reduced to before the canvas scales it back up
+SQUINT_SIZE = 48
+# Edges are found at no more than this long side, which also suppresses noise
+EDGE_MAX_SIZE = 1600
+# Gradient percentile drawn as full black in the edge view
+EDGE_PERCENTILE = 98
+
+
+def _rgb32(image: QImage) -> QImage:
+    """The image in a 32-bit format the filters can read."""
+    if image.format() in (QImage.Format.Format_RGB32, QImage.Format.Format_ARGB32_Premultiplied):
+        return image
+    return image.convertToFormat(QImage.Format.Format_RGB32)
+
+
+def pixel_array(image: QImage) -> np.ndarray:
+    """Zero-copy (height, width, channels) uint8 view of a Grayscale8 or 32-bit image.
+
+    The view points into the image's pixels: keep the image alive while using it.
+    """
+    bits = np.frombuffer(image.constBits(), dtype=np.uint8, count=image.sizeInBytes())
+    rows = bits.reshape(image.height(), image.bytesPerLine())
+    if image.format() == QImage.Format.Format_Grayscale8:
+        return rows[:, :image.width(), None]
+    return rows[:, :image.width() * 4].reshape(image.height(), image.width(), 4)
+
+
+def luminance(image: QImage) -> np.ndarray:
+    """(height, width) uint8 luma (Rec. 601 weights) of an image."""
+    if image.format() == QImage.Format.Format_Grayscale8:
+        return pixel_array(image)[:, :, 0]
+    pixels = pixel_array(_rgb32(image))
+    # Weights sum to 256, so the uint16 sum can't overflow
+    luma = pixels[:, :, _R].astype(np.uint16) * 77
+    luma += pixels[:, :, _G].astype(np.uint16) * 150
+    luma += pixels[:, :, _B].astype(np.uint16) * 29
+    return (luma >> 8).astype(np.uint8)
+
+
+def to_qimage(array: np.ndarray) -> QImage:
+    """Copy a (h, w) uint8 array into a Grayscale8 QImage, or (h, w, 4) into RGB32."""
+    array = np.ascontiguousarray(array)
+    height, width = array.shape[:2]
+    fmt = QImage.Format.Format_Grayscale8 if array.ndim == 2 else QImage.Format.Format_RGB32
+    return QImage(array.data, width, height, array.strides[0], fmt).copy()
+
+
+def _block_mean(array: np.ndarray, factor: int) -> np.ndarray:
+    """Reduce (h, w, ...) by an integer factor, averaging each factor x factor block."""
+    if factor <= 1:
+        return array
+    height, width = (array.shape[0] // factor) * factor, (array.shape[1] // factor) * factor
+    blocks = array[:height, :width].reshape(height // factor, factor, width // factor, factor, *array.shape[2:])
+    return blocks.mean(axis=(1, 3), dtype=np.float32)
+
+
+def notan(image: QImage, values: int) -> QImage:
+    """Reduce to `values` flat tones, split at equal-area luminance thresholds.
+
+    Equal-area thresholds adapt to dark and light references alike: a
+    2-value notan splits at the median.
+    """
+    luma = luminance(image)
+    cdf = np.cumsum(np.bincount(luma.ravel(), minlength=256)) / luma.size
+    thresholds = np.searchsorted(cdf, np.arange(1, values) / values, side="right")
+    tones = np.linspace(0, 255, values).round().astype(np.uint8)
+    lut = tones[np.searchsorted(thresholds, np.arange(256), side="right")]
+    return to_qimage(lut[luma])
+
+
+def posterize(image: QImage, levels: int) -> QImage:
+    """Quantize each colour channel to `levels` levels."""
+    lut = ((np.arange(256) * levels // 256) * 255 // (levels - 1)).astype(np.uint8)
+    if image.format() == QImage.Format.Format_Grayscale8:
+        return to_qimage(lut[luminance(image)])
+    result = lut[pixel_array(_rgb32(image))]
+    result[:, :, _A] = 255
+    return to_qimage(result)
+
+
+def squint(image: QImage, size: int = SQUINT_SIZE) -> QImage:
+    """Average away detail, as squinting does; the canvas smooths it back up."""
+    factor = max(1, max(image.width(), image.height()) // size)
+    if image.format() == QImage.Format.Format_Grayscale8:
+        return to_qimage(_block_mean(luminance(image), factor).round().astype(np.uint8))
+    result = _block_mean(pixel_array(_rgb32(image)), factor).round().astype(np.uint8)
+    result[:, :, _A] = 255
+    return to_qimage(result)
+
+
+def edges(image: QImage, max_size: int = EDGE_MAX_SIZE) -> QImage:
+    """Dark lines on white where luminance changes sharply (Sobel magnitude)."""
+    luma = luminance(image)
+    factor = -(-max(luma.shape) // max_size)  # ceiling division
+    luma = _block_mean(luma, factor).astype(np.float32, copy=False)
+
+    # 3x3 Sobel operator from shifted views
+    top, middle, bottom = luma[:-2], luma[1:-1], luma[2:]
+    gx = (top[:, 2:] + 2 * middle[:, 2:] + bottom[:, 2:]) - (top[:, :-2] + 2 * middle[:, :-2] + bottom[:, :-2])
+    gy = (bottom[:, :-2] + 2 * bottom[:, 1:-1] + bottom[:, 2:]) - (top[:, :-2] + 2 * top[:, 1:-1] + top[:, 2:])
+    magnitude = np.hypot(gx, gy)
+
+    scale = np.percentile(magnitude, EDGE_PERCENTILE) if magnitude.size else 0
+    shade = 255 - np.clip(magnitude * (255 / max(scale, 1e-6)), 0, 255)
+    return to_qimage(np.pad(shade.astype(np.uint8), 1, constant_values=255))
+
+
+class ValueFilter:
+    """A named filter with fixed parameters.
+
+    Args:
+        name: Identifier, unique per parameter set
+        label: Menu text
+        function: Filter function taking the image and the parameters
+        params: Keyword arguments for the function
+    """
+
+    def __init__(self, name: str, label: str, function: Callable[..., QImage], **params) -> None:
+        self.name = name
+        self.label = label
+        self.function = function
+        self.params = params
+
+    @property
+    def cache_key(self) -> tuple:
+        """Name plus parameters, so changed parameters never hit stale results."""
+        return (self.name, *sorted(self.params.items()))
+
+    def apply(self, image: QImage) -> QImage:
+        return self.function(image, **self.params)
+
+
+FILTERS: dict[str, ValueFilter] = {f.name: f for f in [
+    ValueFilter("notan2", "Notan, 2 values", notan, values=2),
+    ValueFilter("notan3", "Notan, 3 values", notan, values=3),
+    ValueFilter("notan5", "Notan, 5 values", notan, values=5),
+    ValueFilter("posterize", "Posterize", posterize, levels=5),
+    ValueFilter("squint", "Squint", squint, size=SQUINT_SIZE),
+    ValueFilter("edges", "Edges", edges, max_size=EDGE_MAX_SIZE),
+]}
+
+
+class FilterEngine(QObject):
+    """Computes value filters on a worker thread and caches the results.
+
+    Requested filters jump ahead of background warm-ups, so the filter being
+    looked at is always computed first.
+
+    Args:
+        governor: Memory governor the result cache registers with
+        parent: Qt parent object
+    """
+
+    ready = Signal(str, str)  # image path, filter name
+    _computed = Signal(str, str, object)  # delivered to the GUI thread
+
+    def __init__(self, governor: Optional[ResourceGovernor] = None, parent: Optional[QObject] = None) -> None:
+        super().__init__(parent)
+        self._cache: LruCache[QImage] = LruCache(image_bytes, governor, name="filters")
+        self._queue: deque[tuple[str, DecodedImage, ValueFilter]] = deque()
+        self._queued: set[tuple[str, tuple]] = set()
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._computed.connect(self._store)
+        self._thread = threading.Thread(target=self._work, name="value-filters", daemon=True)
+        self._thread.start()
+
+    def get(self, path: str, name: str) -> Optional[QImage]:
+        """Cached result of a filter on an image, if computed."""
+        return self._cache.get((path, FILTERS[name].cache_key))
+
+    def request(self, path: str, source: DecodedImage, name: str) -> Optional[QImage]:
+        """Return a cached result, or start computing it ahead of warm-ups and return None."""
+        result = self.get(path, name)
+        if result is None:
+            self._enqueue(path, source, FILTERS[name], urgent=True)
+        return result
+
+    def warm(self, path: str, source: DecodedImage, names: list[str]) -> None:
+        """Compute filters in the background so switching to them is instant."""
+        for name in names:
+            if self.get(path, name) is None:
+                self._enqueue(path, source, FILTERS[name], urgent=False)
+
+    def _enqueue(self, path: str, source: DecodedImage, value_filter: ValueFilter, urgent: bool) -> None:
+        key = (path, value_filter.cache_key)
+        with self._condition:
+            if key in self._queued:
+                if not urgent:
+                    return
+                # Already waiting behind warm-ups: move it to the front
+                self._queue = deque(job for job in self._queue if (job[0], job[2].cache_key) != key)
+            self._queued.add(key)
+            job = (path, source, value_filter)
+            if urgent:
+                self._queue.appendleft(job)
+            else:
+                self._queue.append(job)
+            self._condition.notify()
+
+    def _work(self) -> None:
+        while True:
+            with self._condition:
+                while not self._queue and not self._stopped:
+                    self._condition.wait()
+                if self._stopped:
+                    return
+                path, source, value_filter = self._queue.popleft()
+            # The job holds the DecodedImage, so shared pixels stay mapped meanwhile
+            try:
+                result = value_filter.apply(source.image)
+            except (ValueError, MemoryError):
+                result = None
+            with self._condition:
+                self._queued.discard((path, value_filter.cache_key))
+            if result is not None and not result.isNull():
+                try:
+                    self._computed.emit(path, value_filter.name, result)
+                except RuntimeError:
+                    return  # engine deleted during shutdown
+
+    def _store(self, path: str, name: str, result: QImage) -> None:
+        """Cache a finished result (GUI thread) and announce it."""
+        self._cache.put((path, FILTERS[name].cache_key), result)
+        self.ready.emit(path, name)
+
+    def cancel_pending(self) -> None:
+        """Drop queued work; a filter already running still finishes."""
+        with self._condition:
+            self._queue.clear()
+            self._queued.clear()
+
+    def shutdown(self) -> None:
+        """Stop the worker thread after its current filter."""
+        with self._condition:
+            self._stopped = True
+            self._queue.clear()
+            self._queued.clear()
+            self._condition.notify()